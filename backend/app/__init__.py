@@ -1,6 +1,8 @@
 from flask import Flask
 from .config import Config        
-from .extensions import db, migrate
+from .extensions import db, migrate, token_verifier, token_cache, known_users, job_queue, compressor, resource_versions, stats_buffer
+from .uploads import SpooledUploadRequest
+from .json_provider import FastJSONProvider
 import logging
 from .routes.users import users_bp
 from .routes.campaigns import campaigns_bp
@@ -10,12 +12,24 @@ from .routes.achievements import achievements_bp
 from .routes.characters import characters_bp
 from .routes.auth import auth_bp
 
-def create_app():
+def create_app(test_config=None):
     app = Flask(__name__)
+    app.request_class = SpooledUploadRequest
     app.config.from_object(Config)
+    # Applied before the extensions are set up, so e.g. TESTING keeps the job workers from starting
+    if test_config:
+        app.config.update(test_config)
+    app.json = FastJSONProvider(app)
 
     db.init_app(app)
     migrate.init_app(app, db)
+    token_verifier.init_app(app)
+    token_cache.init_app(app)
+    known_users.init_app(app)
+    job_queue.init_app(app)
+    compressor.init_app(app)
+    resource_versions.init_app(app, db)
+    stats_buffer.init_app(app, db)
 
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
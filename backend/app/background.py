@@ -0,0 +1,57 @@
+import os
+import sqlite3
+import threading
+
+def connect_sqlite(path, synchronous=None):
+    """Opens a WAL-mode connection to a local SQLite file shared by every worker process."""
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    if synchronous:
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+    return conn
+
+class BackgroundThreads:
+    """
+    Daemon threads running target, restarted in each process that uses them.
+
+    Threads do not survive a fork, so a gunicorn worker forked from a
+    preloaded app has none even though the parent started them. Owners hook
+    ensure_started() into before_request; it compares the process ID and
+    starts a fresh set in a new process. target should return once stopping
+    is set.
+    """
+
+    def __init__(self, name, target):
+        self.name = name
+        self.target = target
+        self.threads = []
+        self.stopping = threading.Event()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self, count=1):
+        # Cheap per-request check that also covers workers forked from a preloaded app
+        if self._pid != os.getpid():
+            self.start(count)
+
+    def start(self, count=1):
+        if count <= 0:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and any(thread.is_alive() for thread in self.threads):
+                return
+            self._pid = os.getpid()
+            self.stopping.clear()
+            self.threads = [
+                threading.Thread(target=self.target, name=self.name if count == 1 else f"{self.name}-{i}", daemon=True)
+                for i in range(count)
+            ]
+            for thread in self.threads:
+                thread.start()
+
+    def stop(self, timeout=5):
+        self.stopping.set()
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+        self.threads = []
@@ -0,0 +1,116 @@
+import gzip
+import itertools
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    # Optional; gzip is always available
+    brotli = None
+
+DEFAULT_MIMETYPES = ("application/json", "application/msgpack", "text/plain", "text/html", "text/csv")
+
+class Compressor:
+    """
+    Compresses responses with brotli or gzip, whichever the client accepts.
+
+    Registered as an after_request hook so every blueprint is covered. Only
+    allow-listed content types are touched, and bodies smaller than min_size
+    are sent as they are, since below roughly one packet the CPU spent buys
+    nothing. Streamed responses are compressed chunk by chunk as they are
+    sent, once their first min_size bytes are in; a stream that ends short of
+    that (or declares a smaller Content-Length) goes out uncompressed. Brotli
+    is preferred when it is installed and the client offers it.
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=4, mimetypes=DEFAULT_MIMETYPES):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = set(mimetypes)
+
+    def init_app(self, app):
+        self.min_size = app.config.get("COMPRESSION_MIN_SIZE", self.min_size)
+        self.gzip_level = app.config.get("COMPRESSION_GZIP_LEVEL", self.gzip_level)
+        self.brotli_quality = app.config.get("COMPRESSION_BROTLI_QUALITY", self.brotli_quality)
+        self.mimetypes = set(app.config.get("COMPRESSION_MIMETYPES", self.mimetypes))
+        app.after_request(self.compress_response)
+        app.extensions["compressor"] = self
+
+    @property
+    def encodings(self):
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def choose_encoding(self):
+        encoding = request.accept_encodings.best_match(self.encodings)
+        return encoding if encoding in self.encodings else None
+
+    def compress(self, data, encoding):
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        # mtime=0 keeps the output identical for identical bodies
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_stream(self, chunks, encoding):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            process, finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            process, finish = compressor.compress, compressor.flush
+        for chunk in chunks:
+            data = process(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            if data:
+                yield data
+        yield finish()
+
+    def read_head(self, chunks):
+        """Reads chunks until min_size bytes are buffered; returns (head, size, rest of the iterator)."""
+        rest = iter(chunks)
+        head, size = [], 0
+        for chunk in rest:
+            chunk = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            head.append(chunk)
+            size += len(chunk)
+            if size >= self.min_size:
+                break
+        return head, size, rest
+
+    def compress_response(self, response):
+        response.vary.add("Accept-Encoding")
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in self.mimetypes
+        ):
+            return response
+
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            if response.content_length is not None and response.content_length < self.min_size:
+                return response
+            head, size, rest = self.read_head(response.response)
+            if size < self.min_size:
+                # The whole body is already in hand, so it is sent as a plain one
+                response.set_data(b"".join(head))
+                return response
+            response.response = self.compress_stream(itertools.chain(head, rest), encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(self.compress(data, encoding))
+
+        response.headers["Content-Encoding"] = encoding
+        # A strong ETag names exact bytes, so the compressed body gets its own (see app/versions.py)
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f"{etag}-{encoding}")
+        return response
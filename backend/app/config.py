@@ -7,3 +7,45 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv("SECRET_KEY")
+    # When set, ID tokens are verified in-process against cached Google signing keys
+    FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID")
+    # Verified tokens are cached per worker until their exp claim
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+    # Upper bound on how long other workers keep honouring a deleted user's cached tokens
+    TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", "60"))
+    KNOWN_USER_CACHE_SIZE = int(os.getenv("KNOWN_USER_CACHE_SIZE", "4096"))
+    # Registered users are re-checked against the database after this many seconds
+    KNOWN_USER_CACHE_TTL = int(os.getenv("KNOWN_USER_CACHE_TTL", "30"))
+    # Background question generation (see app/jobs.py); the queue file defaults to the instance folder
+    JOB_DB_PATH = os.getenv("JOB_DB_PATH")
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_MAX_RUNNING = int(os.getenv("JOB_MAX_RUNNING", "4"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "5"))
+    JOB_MAX_ACTIVE_PER_USER = int(os.getenv("JOB_MAX_ACTIVE_PER_USER", "3"))
+    # Uploaded PDFs up to this size are parsed from memory; larger ones spill to a temp file
+    UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(8 * 1024 * 1024)))
+    # Keyset pagination for list routes (?after=<cursor>&limit=<n>)
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+    # "orjson" (used when installed) or "stdlib" for Flask's built-in encoder
+    JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson")
+    # Rows fetched per round trip while streaming a list response
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "100"))
+    # Write-behind buffer for player_stats (see app/stats_buffer.py), off unless enabled.
+    # The path is required when enabled and must survive redeploys (not a temp dir)
+    STATS_BUFFER_ENABLED = os.getenv("STATS_BUFFER_ENABLED", "0").lower() in ("1", "true", "yes")
+    STATS_BUFFER_PATH = os.getenv("STATS_BUFFER_PATH")
+    STATS_BUFFER_FLUSH_INTERVAL = float(os.getenv("STATS_BUFFER_FLUSH_INTERVAL", "30"))
+    STATS_BUFFER_IDLE_SECONDS = float(os.getenv("STATS_BUFFER_IDLE_SECONDS", "600"))
+    # Threads per worker running the queries of GET /campaigns/<campaignID>/snapshot concurrently
+    SNAPSHOT_WORKERS = int(os.getenv("SNAPSHOT_WORKERS", "4"))
+    # Largest batch POST /campaigns/<campaignID>/events accepts
+    GAMEPLAY_MAX_EVENTS = int(os.getenv("GAMEPLAY_MAX_EVENTS", "500"))
+    # Response compression (see app/compression.py); bodies under the minimum are sent as is
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    COMPRESSION_MIMETYPES = os.getenv(
+        "COMPRESSION_MIMETYPES", "application/json,application/msgpack,text/plain,text/html,text/csv"
+    ).split(",")
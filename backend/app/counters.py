@@ -0,0 +1,35 @@
+from sqlalchemy import update, inspect
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+from app.extensions import db
+
+class least(GenericFunction):
+    """LEAST(a, b, ...); SQLite spells it as the multi-argument min()."""
+    name = "least"
+    inherit_cache = True
+
+@compiles(least, "sqlite")
+def compile_least_sqlite(element, compiler, **kw):
+    return f"min({compiler.process(element.clauses, **kw)})"
+
+def update_returning(model, key, values, *returning):
+    """
+    Applies values to the row of model whose primary key is key, in one UPDATE ... RETURNING.
+
+    values may refer to the row's own columns (Question.wrongAttempts + 1),
+    so the new value is worked out by the database while it holds the row
+    lock and concurrent writers cannot overwrite each other's changes.
+    Returns the returning columns of the updated row, or None when there is
+    no such row. The caller commits.
+    """
+    primary_key = inspect(model).primary_key[0]
+    statement = update(model).where(primary_key == key).values(values).returning(*returning)
+    return db.session.execute(statement, execution_options={"synchronize_session": False}).first()
+
+def increment(column, key, amount=1, maximum=None):
+    """Adds amount to a counter column of one row, capped at maximum; returns the new value or None."""
+    value = column + amount
+    if maximum is not None:
+        value = least(value, maximum)
+    row = update_returning(column.class_, key, {column.key: value}, column)
+    return None if row is None else row[0]
@@ -4,6 +4,12 @@ import firebase_admin
 from firebase_admin import auth, credentials
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from app.token_verifier import TokenVerifier
+from app.token_cache import TokenCache, KnownUserCache
+from app.jobs import JobQueue
+from app.compression import Compressor
+from app.versions import ResourceVersions
+from app.stats_buffer import StatsBuffer
 
 firebase_creds_json = os.environ.get("FIREBASE_ADMIN_CREDENTIALS")
 if not firebase_creds_json:
@@ -16,3 +22,10 @@ firebase_admin.initialize_app(cred)
 
 db = SQLAlchemy()
 migrate = Migrate()
+token_verifier = TokenVerifier()
+token_cache = TokenCache()
+known_users = KnownUserCache()
+job_queue = JobQueue()
+compressor = Compressor()
+resource_versions = ResourceVersions()
+stats_buffer = StatsBuffer()
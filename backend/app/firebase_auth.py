@@ -2,10 +2,30 @@ import functools
 from flask import request, jsonify
 from firebase_admin import auth
 from app.models import User
+from app.extensions import token_verifier, token_cache, known_users
+from app.principal import Principal
 import logging
 
 logger = logging.getLogger(__name__)
 
+def decode_token(token):
+    if token_verifier.enabled:
+        return token_verifier.verify(token)
+    return auth.verify_id_token(token)
+
+def resolve_principal(user_id):
+    screen_name = known_users.get(user_id)
+    if screen_name is not None:
+        return Principal(user_id, screen_name)
+
+    # Only the two columns the principal carries; no ORM instance is built
+    row = User.query.with_entities(User.userID, User.screenName).filter_by(userID=user_id).first()
+    if not row:
+        return None
+
+    known_users.add(row.userID, row.screenName)
+    return Principal(row.userID, row.screenName)
+
 def verify_firebase_token(f):
     @functools.wraps(f)
     def decorated_function(*args, **kwargs):
@@ -18,18 +38,24 @@ def verify_firebase_token(f):
         token = auth_header.split("Bearer ")[-1]  # Extract token
 
         try:
-            # Verify the token with Firebase
-            decoded_token = auth.verify_id_token(token)
+            cached = token_cache.get(token)
+            if cached:
+                _, principal = cached
+                return f(principal, *args, **kwargs)
+
+            # Verify the token locally when configured, otherwise with Firebase
+            decoded_token = decode_token(token)
             user_id = decoded_token["uid"]
             logger.info(f"Token verified for user: {user_id}")
 
-            # Check if the user exists in PostgreSQL
-            user = User.query.filter_by(userID=user_id).first()
-            if not user:
+            # Check if the user exists, consulting the known-user cache before PostgreSQL
+            principal = resolve_principal(user_id)
+            if not principal:
                 logger.warning(f"User {user_id} not found in database")
                 return jsonify({"error": "User not registered"}), 403
 
-            return f(user, *args, **kwargs)
+            token_cache.put(token, decoded_token, principal)
+            return f(principal, *args, **kwargs)
         except Exception as e:
             logger.error(f"Token verification failed: {str(e)}")
             return jsonify({"error": "Invalid token", "message": str(e)}), 403
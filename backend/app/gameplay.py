@@ -0,0 +1,138 @@
+from sqlalchemy import update, case
+from app.counters import least
+from app.extensions import db
+from app.models import Question, PlayerStats
+
+MANA_MAX = 100
+AFFINITIES = {"fire", "earth", "water", "air"}
+QUESTION_EVENTS = {"answer", "wrongAttempt"}
+STATS_EVENTS = {"replenishMana", "updateStats"}
+
+class GameplayEventError(ValueError):
+    pass
+
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def validate_event(event):
+    # Checked as a string first: an unhashable type such as a list would make the set lookup raise TypeError
+    kind = event.get("type") if isinstance(event, dict) else None
+    if not isinstance(kind, str) or kind not in QUESTION_EVENTS | STATS_EVENTS:
+        raise GameplayEventError(f"Unknown event type: {kind if isinstance(event, dict) else event!r}")
+
+    if kind in QUESTION_EVENTS and not is_int(event.get("questionID")):
+        raise GameplayEventError(f"{kind} events need an integer questionID")
+    if kind == "answer" and not isinstance(event.get("gotCorrect"), bool):
+        raise GameplayEventError("answer events need a boolean gotCorrect")
+    if kind == "replenishMana" and not (is_int(event.get("manaAmount")) and event["manaAmount"] >= 0):
+        raise GameplayEventError("replenishMana events need a non-negative integer manaAmount")
+    if kind == "updateStats":
+        validate_stats(event)
+
+def validate_stats(fields):
+    attack = fields.get("attack")
+    if "attack" in fields and not (isinstance(attack, (int, float)) and not isinstance(attack, bool) and 1 <= attack <= 5):
+        raise GameplayEventError("attack must be a number from 1 to 5")
+    if any(field in fields and not is_int(fields[field]) for field in ("hp", "mana")):
+        raise GameplayEventError("hp and mana must be integers")
+    affinity = fields.get("affinity")
+    if "affinity" in fields and not (isinstance(affinity, str) and affinity in AFFINITIES):
+        raise GameplayEventError(f"affinity must be one of {', '.join(sorted(AFFINITIES))}")
+
+def fold_events(events):
+    """
+    Reduces an ordered event list to one set of column values per table.
+
+    Question events commute, so they become per-question wrong-attempt counts
+    and a set of correctly answered questions. Stats events do not (a later
+    updateStats overwrites earlier replenishes), so they are folded in order
+    into one expression per column. Replenishing by a then b, each capped at
+    MANA_MAX, equals replenishing by a + b once when both are non-negative.
+    """
+    wrong_attempts = {}
+    answered = set()
+    stats = {}
+    mana_base, mana_added = PlayerStats.mana, 0
+
+    for event in events:
+        validate_event(event)
+        kind = event["type"]
+        if kind == "answer" and event["gotCorrect"]:
+            answered.add(event["questionID"])
+        elif kind in QUESTION_EVENTS:
+            wrong_attempts[event["questionID"]] = wrong_attempts.get(event["questionID"], 0) + 1
+        elif kind == "replenishMana":
+            mana_added += event["manaAmount"]
+            stats["mana"] = None
+        else:
+            for field in ("attack", "hp", "affinity"):
+                if field in event:
+                    stats[field] = event[field]
+            if "mana" in event:
+                mana_base, mana_added = event["mana"], 0
+                stats["mana"] = None
+
+    if "mana" in stats:
+        if not mana_added:
+            stats["mana"] = mana_base
+        elif is_int(mana_base):
+            stats["mana"] = min(mana_base + mana_added, MANA_MAX)
+        else:
+            stats["mana"] = least(mana_base + mana_added, MANA_MAX)
+
+    return wrong_attempts, answered, stats
+
+def apply_events(campaign_id, events):
+    """
+    Applies an ordered list of gameplay events to one campaign with at most two UPDATEs.
+
+    All touched questions are updated by one statement whose CASE expressions
+    carry each question's change, and the stats row by one more. Both RETURN
+    the resulting state. Raises GameplayEventError for invalid events and
+    LookupError for questions outside the campaign or missing stats; the
+    caller owns the transaction and must roll back on either.
+    """
+    wrong_attempts, answered, stats = fold_events(events)
+    result = {"questions": [], "stats": None}
+
+    question_ids = sorted(set(wrong_attempts) | answered)
+    if question_ids:
+        values = {}
+        if wrong_attempts:
+            values["wrongAttempts"] = Question.wrongAttempts + case(wrong_attempts, value=Question.questionID, else_=0)
+        if answered:
+            values["gotCorrect"] = case((Question.questionID.in_(answered), True), else_=Question.gotCorrect)
+        rows = db.session.execute(
+            update(Question)
+            .where(Question.campaignID == campaign_id, Question.questionID.in_(question_ids))
+            .values(values)
+            .returning(Question.questionID, Question.gotCorrect, Question.wrongAttempts),
+            execution_options={"synchronize_session": False}
+        ).all()
+        missing = set(question_ids) - {row.questionID for row in rows}
+        if missing:
+            raise LookupError(f"Questions not found in this campaign: {sorted(missing)}")
+        result["questions"] = [
+            {"questionID": row.questionID, "gotCorrect": row.gotCorrect, "wrongAttempts": row.wrongAttempts}
+            for row in sorted(rows)
+        ]
+
+    if stats:
+        row = db.session.execute(
+            update(PlayerStats)
+            .where(PlayerStats.campaignID == campaign_id)
+            .values(stats)
+            .returning(PlayerStats.campaignID, PlayerStats.attack, PlayerStats.hp, PlayerStats.mana, PlayerStats.affinity),
+            execution_options={"synchronize_session": False}
+        ).first()
+        if row is None:
+            raise LookupError("Player stats not found")
+        result["stats"] = {
+            "campaignID": row.campaignID,
+            "attack": row.attack,
+            "hp": row.hp,
+            "mana": row.mana,
+            "affinity": row.affinity
+        }
+
+    return result
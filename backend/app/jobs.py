@@ -0,0 +1,265 @@
+import json
+import os
+import random
+import threading
+import time
+import uuid
+import logging
+from contextlib import closing
+from app.background import BackgroundThreads, connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    jobID TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    userID TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    stage TEXT,
+    params TEXT NOT NULL,
+    payload BLOB,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    runAfter REAL NOT NULL,
+    lockedUntil REAL,
+    createdAt REAL NOT NULL,
+    updatedAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_run_after ON jobs (status, runAfter);
+CREATE INDEX IF NOT EXISTS jobs_user_status ON jobs (userID, status);
+"""
+
+ACTIVE_STATUSES = ("queued", "running")
+
+class PermanentJobError(Exception):
+    """Raised by a job handler for failures that retrying cannot fix."""
+
+class JobLimitError(Exception):
+    pass
+
+class JobContext:
+    """What a handler sees of its job: parameters, uploaded payload and a progress hook."""
+
+    def __init__(self, queue, row):
+        self.queue = queue
+        self.job_id = row["jobID"]
+        self.user_id = row["userID"]
+        self.params = json.loads(row["params"])
+        self.payload = row["payload"]
+        self.attempt = row["attempts"]
+
+    def progress(self, percent, stage=None):
+        # Reporting progress also renews the lease so long jobs are not reclaimed
+        self.queue._update(
+            self.job_id, progress=int(percent), stage=stage, lockedUntil=time.time() + self.queue.lease
+        )
+
+class JobQueue:
+    """
+    Background job queue persisted in a local SQLite file.
+
+    Every gunicorn worker runs its own small thread pool against the same
+    file, so any worker can report on a job no matter which one queued or ran
+    it. Claims are made under BEGIN IMMEDIATE and respect a global cap on
+    running jobs; a job whose worker died is picked up again once its lease
+    runs out. Failed attempts are retried with exponential backoff.
+    """
+
+    def __init__(self, path=None, workers=2, max_running=4, max_attempts=3, backoff=5,
+                 lease=900, poll_interval=1.0, max_active_per_user=3):
+        self.path = path
+        self.workers = workers
+        self.max_running = max_running
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.max_active_per_user = max_active_per_user
+        self.app = None
+        self._handlers = {}
+        self._workers = BackgroundThreads("job-worker", self._worker_loop)
+
+    def init_app(self, app):
+        self.app = app
+        # Defaults to the app's own instance folder so unrelated checkouts never share a queue
+        self.path = app.config.get("JOB_DB_PATH")
+        if not self.path:
+            os.makedirs(app.instance_path, exist_ok=True)
+            self.path = os.path.join(app.instance_path, "jobs.sqlite3")
+        # A test app must never claim jobs; tests run them explicitly with run_pending()
+        self.workers = 0 if app.testing else app.config.get("JOB_WORKERS", self.workers)
+        self.max_running = app.config.get("JOB_MAX_RUNNING", self.max_running)
+        self.max_attempts = app.config.get("JOB_MAX_ATTEMPTS", self.max_attempts)
+        self.backoff = app.config.get("JOB_RETRY_BACKOFF", self.backoff)
+        self.max_active_per_user = app.config.get("JOB_MAX_ACTIVE_PER_USER", self.max_active_per_user)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+        app.extensions["job_queue"] = self
+        # Jobs queued or retrying before a restart must not wait for the next upload to this process
+        app.before_request(self._ensure_started)
+        self.start()
+
+    def register(self, kind, handler):
+        self._handlers[kind] = handler
+
+    def _connect(self):
+        return connect_sqlite(self.path)
+
+    def enqueue(self, kind, user_id, params, payload=None):
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            active = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE userID = ? AND status IN (?, ?)",
+                (user_id, *ACTIVE_STATUSES)
+            ).fetchone()[0]
+            if active >= self.max_active_per_user:
+                conn.execute("ROLLBACK")
+                raise JobLimitError(f"At most {self.max_active_per_user} jobs may be pending per user")
+
+            conn.execute(
+                "INSERT INTO jobs (jobID, kind, userID, status, params, payload, runAfter, createdAt, updatedAt) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, kind, user_id, json.dumps(params), payload, now, now, now)
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        self.start()
+        return job_id
+
+    def get(self, job_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT jobID, kind, userID, status, progress, stage, result, error, attempts, runAfter, createdAt, updatedAt "
+                "FROM jobs WHERE jobID = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _update(self, job_id, **fields):
+        fields["updatedAt"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE jobID = ?", (*fields.values(), job_id))
+
+    def _claim(self):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            running = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'running' AND lockedUntil > ?", (now,)
+            ).fetchone()[0]
+            if running >= self.max_running:
+                conn.execute("ROLLBACK")
+                return None
+
+            # Queued jobs that are due, or running jobs whose worker stopped renewing the lease
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND runAfter <= ?) "
+                "OR (status = 'running' AND lockedUntil <= ?) ORDER BY runAfter LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lockedUntil = ?, updatedAt = ? "
+                "WHERE jobID = ?",
+                (now + self.lease, now, row["jobID"])
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+
+    def run_pending(self):
+        """Claim and run a single due job. Returns False when there was nothing to do."""
+        row = self._claim()
+        if row is None:
+            return False
+
+        job = JobContext(self, row)
+        handler = self._handlers.get(row["kind"])
+        done = threading.Event()
+        renewer = threading.Thread(target=self._renew_lease, args=(job.job_id, done), daemon=True)
+        renewer.start()
+        try:
+            if job.attempt > self.max_attempts:
+                raise PermanentJobError("Worker was lost while running the job")
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for {row['kind']}")
+            with self.app.app_context():
+                result = handler(job)
+        except Exception as e:
+            self._fail(job, e)
+            return True
+        finally:
+            done.set()
+            renewer.join()
+
+        self._update(
+            job.job_id, status="succeeded", progress=100, stage="done",
+            result=json.dumps(result), error=None, payload=None, lockedUntil=None
+        )
+        logger.info(f"Job {job.job_id} succeeded after {job.attempt} attempt(s)")
+        return True
+
+    def _renew_lease(self, job_id, done):
+        # Handlers may go a long time between progress reports (one OpenAI call can outlast the
+        # lease), so the lease is renewed while the handler runs; it only lapses if the process dies
+        while not done.wait(self.lease / 3):
+            try:
+                self._update(job_id, lockedUntil=time.time() + self.lease)
+            except Exception as e:
+                logger.warning(f"Could not renew the lease of job {job_id}: {str(e)}")
+
+    def _fail(self, job, error):
+        retryable = not isinstance(error, PermanentJobError) and job.attempt < self.max_attempts
+        if retryable:
+            delay = self.backoff * (2 ** (job.attempt - 1)) * random.uniform(0.8, 1.2)
+            logger.warning(f"Job {job.job_id} attempt {job.attempt} failed, retrying in {delay:.1f}s: {str(error)}")
+            self._update(
+                job.job_id, status="queued", stage="retrying", error=str(error),
+                runAfter=time.time() + delay, lockedUntil=None
+            )
+        else:
+            logger.error(f"Job {job.job_id} failed after {job.attempt} attempt(s): {str(error)}")
+            self._update(job.job_id, status="failed", error=str(error), payload=None, lockedUntil=None)
+
+    def _ensure_started(self):
+        self._workers.ensure_started(self.workers)
+
+    def start(self):
+        self._workers.start(self.workers)
+
+    def stop(self):
+        self._workers.stop()
+
+    def _worker_loop(self):
+        while not self._workers.stopping.is_set():
+            try:
+                ran = self.run_pending()
+            except Exception as e:
+                logger.error(f"Job worker error: {str(e)}")
+                ran = False
+            if not ran:
+                self._workers.stopping.wait(self.poll_interval)
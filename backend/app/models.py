@@ -22,6 +22,10 @@ class PlayerCharacter(db.Model):
     robeID = db.Column(db.Integer)
     bootID = db.Column(db.Integer)
 
+    __table_args__ = (
+        db.Index('ix_player_character_user', 'userID'),
+    )
+
 class Campaign(db.Model):
     __tablename__ = 'campaign'
 
@@ -37,6 +41,10 @@ class Campaign(db.Model):
     player_stats = relationship("PlayerStats", backref="campaign", uselist=False, cascade="all, delete-orphan")
     achievements = relationship("Achievement", backref="campaign", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index('ix_campaign_user', 'userID', 'campaignID'),
+    )
+
 class Question(db.Model):
     __tablename__ = 'questions'
 
@@ -49,6 +57,12 @@ class Question(db.Model):
 
     answers = relationship("Answer", backref="question", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Campaign question lists, optionally narrowed by difficulty and by answered state
+        db.Index('ix_questions_campaign_difficulty_correct', 'campaignID', 'difficulty', 'gotCorrect'),
+        db.Index('ix_questions_campaign_correct', 'campaignID', 'gotCorrect'),
+    )
+
 class Answer(db.Model):
     __tablename__ = 'answers'
 
@@ -57,6 +71,10 @@ class Answer(db.Model):
     answerStr = db.Column(db.Text, nullable=False)
     isCorrect = db.Column(db.Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        db.Index('ix_answers_question', 'questionID', 'answerID'),
+    )
+
 class PlayerStats(db.Model):
     __tablename__ = 'player_stats'
 
@@ -85,10 +103,25 @@ class PlayerSpells(db.Model):
     playerID = db.Column(db.Integer, db.ForeignKey('player_stats.campaignID'), nullable=False)
     spellID = db.Column(db.Integer, db.ForeignKey('spells.spellID'), nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_player_spells_player', 'playerID', 'spellID'),
+    )
+
 class Achievement(db.Model):
     __tablename__ = 'achievements'
 
     achievementID = db.Column(db.Integer, primary_key=True)
     campaignID = db.Column(db.Integer, db.ForeignKey('campaign.campaignID', ondelete="CASCADE"), nullable=False)
     title = db.Column(db.String(63), nullable=False)
-    description = db.Column(db.Text)
\ No newline at end of file
+    description = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('ix_achievements_campaign', 'campaignID'),
+    )
+
+class ResourceVersion(db.Model):
+    """Change counter behind the ETags of cacheable GET routes (see app/versions.py)."""
+    __tablename__ = 'resource_versions'
+
+    scope = db.Column(db.String(63), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
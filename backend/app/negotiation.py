@@ -0,0 +1,23 @@
+from flask import request, has_request_context
+
+try:
+    import msgpack
+except ImportError:
+    # Optional; without it every response is JSON
+    msgpack = None
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+# Many MessagePack clients still ask for the older unregistered name
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, "application/x-msgpack")
+
+def wants_msgpack():
+    """True when the request's Accept header prefers MessagePack over JSON."""
+    if msgpack is None or not has_request_context():
+        return False
+    best = request.accept_mimetypes.best_match([JSON_MIMETYPE, *MSGPACK_MIMETYPES], default=JSON_MIMETYPE)
+    return best in MSGPACK_MIMETYPES
+
+def packb(obj, default):
+    # default is the JSON provider's hook, so dates and decimals come out exactly as they do in JSON
+    return msgpack.packb(obj, default=default, use_bin_type=True)
@@ -0,0 +1,107 @@
+import base64
+import json
+from flask import request, jsonify, current_app
+from app.streaming import streamed_json
+
+class PaginationError(ValueError):
+    pass
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps([key]).encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(token, key_type=None):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        key, = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid cursor")
+    if isinstance(key, bool) or not isinstance(key, (int, str)):
+        raise PaginationError("Invalid cursor")
+    # A key of the wrong type would reach the database as e.g. "questionID" > 'x', which PostgreSQL rejects
+    if key_type is not None and not isinstance(key, key_type):
+        raise PaginationError("Invalid cursor")
+    return key
+
+def key_type_of(key_column):
+    try:
+        return key_column.type.python_type
+    except NotImplementedError:
+        return None
+
+def page_size(unbounded=False):
+    default = current_app.config.get("PAGE_SIZE_DEFAULT", 100)
+    maximum = current_app.config.get("PAGE_SIZE_MAX", 500)
+    limit = request.args.get("limit")
+    if limit is None:
+        return None if unbounded else min(default, maximum)
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+    return min(limit, maximum)
+
+def paginate(query, key_column, key_of=None, unbounded=False):
+    """
+    Applies keyset pagination from the ?after=<cursor>&limit=<n> query arguments.
+
+    Rows are ordered by key_column and only rows past the cursor are read, so
+    every page costs the same no matter how deep into the list it is. One row
+    beyond the page is fetched to tell whether another page exists. Returns
+    (rows, next_cursor); next_cursor is None on the last page. key_of extracts
+    the key from a row when rows are not instances of key_column's model.
+
+    unbounded routes return every row when no limit is given. Use it for
+    lists the Unity client reads whole without following X-Next-Cursor,
+    where a default page size would silently drop rows.
+    """
+    key_of = key_of or (lambda row: getattr(row, key_column.key))
+    limit = page_size(unbounded)
+
+    after = request.args.get("after")
+    if after:
+        query = query.filter(key_column > decode_cursor(after, key_type_of(key_column)))
+    if limit is None:
+        return query.order_by(key_column).all(), None
+
+    rows = query.order_by(key_column).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key_of(rows[-1]))
+
+def paginate_stream(query, key_column, unbounded=False):
+    """
+    Like paginate, but leaves the rows of the page unread.
+
+    The cursor for the next page is worked out first from the key column
+    alone, which the primary key index answers without touching the rows, so
+    the page itself can then be read in yield_per batches (a server-side
+    cursor on PostgreSQL) while the response is being sent. Returns
+    (rows, next_cursor) where rows is an iterator.
+    """
+    limit = page_size(unbounded)
+    batch_size = current_app.config.get("STREAM_BATCH_SIZE", 100)
+
+    after = request.args.get("after")
+    if after:
+        query = query.filter(key_column > decode_cursor(after, key_type_of(key_column)))
+    if limit is None:
+        return query.order_by(key_column).yield_per(batch_size), None
+
+    keys = query.with_entities(key_column).order_by(key_column).offset(limit - 1).limit(2).all()
+    next_cursor = encode_cursor(keys[0][0]) if len(keys) == 2 else None
+
+    rows = query.order_by(key_column).limit(limit).yield_per(batch_size)
+    return rows, next_cursor
+
+def streamed_page_response(rows, serialize, next_cursor):
+    return streamed_json(rows, serialize, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+def paginated_response(items, next_cursor):
+    # The body stays a bare list for existing clients; the cursor for the next page travels in a header
+    response = jsonify(items)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
@@ -0,0 +1,17 @@
+class Principal:
+    """
+    The authenticated caller as seen by route handlers.
+
+    Carries only what requests need on every call and is only built by
+    firebase_auth.resolve_principal; handlers that need more of the user
+    query for it themselves.
+    """
+
+    __slots__ = ("userID", "screenName")
+
+    def __init__(self, userID, screenName):
+        self.userID = userID
+        self.screenName = screenName
+
+    def __repr__(self):
+        return f"<Principal {self.userID}>"
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.models import Achievement
+from app.pagination import paginate_stream, streamed_page_response, PaginationError
+from app.versions import conditional
 from app.firebase_auth import verify_firebase_token
 
 achievements_bp = Blueprint("achievements", __name__)
@@ -24,15 +26,20 @@ def unlock_achievement(user):
 
 @achievements_bp.route("/<int:campaignID>", methods=["GET"])
 @verify_firebase_token
+@conditional(lambda campaignID: f"achievements:{campaignID}")
 def get_achievements(user, campaignID):
-    achievements = Achievement.query.filter_by(campaignID=campaignID).all()
-    return jsonify([
-        {
-            "achievementID": a.achievementID,
-            "title": a.title,
-            "description": a.description
-        } for a in achievements
-    ])
+    try:
+        achievements, next_cursor = paginate_stream(
+            Achievement.query.filter_by(campaignID=campaignID), Achievement.achievementID
+        )
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return streamed_page_response(achievements, lambda a: {
+        "achievementID": a.achievementID,
+        "title": a.title,
+        "description": a.description
+    }, next_cursor)
 
 @achievements_bp.route("/delete/<int:achievementID>", methods=["DELETE"])
 @verify_firebase_token
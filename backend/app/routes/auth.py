@@ -1,8 +1,9 @@
 from flask import request, jsonify, Blueprint
-from app.extensions import db
+from app.extensions import db, known_users
 from app.models import User
 import firebase_admin
 from firebase_admin import auth
+from app.firebase_auth import decode_token
 
 
 auth_bp = Blueprint("auth", __name__)
@@ -16,7 +17,7 @@ def login():
 
     try:
         # Verify the ID token from Unity
-        decoded_token = auth.verify_id_token(id_token)
+        decoded_token = decode_token(id_token)
         user_id = decoded_token.get("uid")
         return jsonify({"userID": user_id}), 200
     except Exception as e:
@@ -44,6 +45,7 @@ def signup():
         new_user = User(userID=firebase_user.uid, screenName=screen_name)
         db.session.add(new_user)
         db.session.commit()
+        known_users.add(firebase_user.uid, screen_name)
 
         return jsonify({"message": "User created successfully", "userID": firebase_user.uid}), 201
     except Exception as e:
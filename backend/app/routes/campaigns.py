@@ -1,10 +1,22 @@
-from flask import Blueprint, request, jsonify
-from app.extensions import db
+from flask import Blueprint, request, jsonify, current_app
+from app.extensions import db, stats_buffer
 from app.models import Campaign
+from app.gameplay import apply_events, GameplayEventError
+from app.snapshot import load_snapshot
+from app.pagination import paginate_stream, streamed_page_response, PaginationError
+from app.versions import conditional
 from app.firebase_auth import verify_firebase_token
 
 campaigns_bp = Blueprint("campaigns", __name__)
 
+def flush_stats(campaignID):
+    """Writes the campaign's buffered player stats through; returns an error response if that fails."""
+    try:
+        stats_buffer.flush_campaign(campaignID)
+    except Exception as e:
+        return jsonify({"error": f"Could not save player stats: {str(e)}"}), 500
+    return None
+
 @campaigns_bp.route("/create", methods=["POST"])
 @verify_firebase_token
 def create_campaign(user):
@@ -33,18 +45,21 @@ def create_campaign(user):
 
 @campaigns_bp.route("/<string:userID>", methods=["GET"])
 @verify_firebase_token
+@conditional(lambda userID: f"campaigns:{userID}")
 def get_campaigns(user, userID):
-    campaigns = Campaign.query.filter_by(userID=userID).all()
-    return jsonify([
-        {
-            "campaignID": c.campaignID,
-            "title": c.title,
-            "campaignLength": c.campaignLength,
-            "currLevel": c.currLevel,
-            "remainingTries": c.remainingTries,
-            "lastUpdated": c.lastUpdated
-        } for c in campaigns
-    ])
+    try:
+        campaigns, next_cursor = paginate_stream(Campaign.query.filter_by(userID=userID), Campaign.campaignID)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return streamed_page_response(campaigns, lambda c: {
+        "campaignID": c.campaignID,
+        "title": c.title,
+        "campaignLength": c.campaignLength,
+        "currLevel": c.currLevel,
+        "remainingTries": c.remainingTries,
+        "lastUpdated": c.lastUpdated
+    }, next_cursor)
 
 @campaigns_bp.route("/update/<int:campaignID>", methods=["PUT"])
 @verify_firebase_token
@@ -55,6 +70,11 @@ def update_campaign(user, campaignID):
     if not campaign:
         return jsonify({"error": "Campaign not found"}), 404
 
+    # Campaign updates mark the end of a level, when buffered stats are written through
+    error = flush_stats(campaignID)
+    if error:
+        return error
+
     if "currLevel" in data:
         campaign.currLevel = data["currLevel"]
     if "remainingTries" in data:
@@ -73,6 +93,7 @@ def delete_campaign(user, campaignID):
 
     db.session.delete(campaign)
     db.session.commit()
+    stats_buffer.discard(campaignID)
     return jsonify({"message": "Campaign deleted successfully"})
 
 @campaigns_bp.route("/single/<int:campaignID>", methods=["GET"])
@@ -90,6 +111,16 @@ def get_campaign(user, campaignID):
         "remainingTries": campaign.remainingTries
     })
 
+@campaigns_bp.route("/<int:campaignID>/snapshot", methods=["GET"])
+@verify_firebase_token
+def get_campaign_snapshot(user, campaignID):
+    """Campaign, stats, equipped spells, question summary and achievements for loading a level."""
+    snapshot = load_snapshot(user.userID, campaignID, current_app.config.get("SNAPSHOT_WORKERS", 4))
+    if snapshot is None:
+        return jsonify({"error": "Campaign not found"}), 404
+
+    return jsonify(snapshot)
+
 @campaigns_bp.route("/<int:campaignID>/restart", methods=["PATCH"])
 @verify_firebase_token
 def restart_campaign(user, campaignID):
@@ -97,9 +128,47 @@ def restart_campaign(user, campaignID):
     if not campaign:
         return jsonify({"error": "Campaign not found"}), 404
 
+    error = flush_stats(campaignID)
+    if error:
+        return error
+
     campaign.currLevel = 1
     campaign.remainingTries = 3
     campaign.lastUpdated = db.func.current_timestamp()
 
     db.session.commit()
     return jsonify({"message": "Campaign restarted successfully"})
+
+@campaigns_bp.route("/<int:campaignID>/events", methods=["POST"])
+@verify_firebase_token
+def record_gameplay_events(user, campaignID):
+    """Applies a level's worth of answer, wrong attempt, mana and stats events in one transaction."""
+    data = request.get_json()
+    events = data.get("events") if isinstance(data, dict) else None
+    if not isinstance(events, list) or not events:
+        return jsonify({"error": "Expected a non-empty 'events' list"}), 400
+
+    max_events = current_app.config.get("GAMEPLAY_MAX_EVENTS", 500)
+    if len(events) > max_events:
+        return jsonify({"error": f"At most {max_events} events may be sent at once"}), 400
+
+    if not db.session.query(Campaign.campaignID).filter_by(campaignID=campaignID, userID=user.userID).first():
+        return jsonify({"error": "Campaign not found"}), 404
+
+    try:
+        # The batch updates player_stats directly: it starts from the buffered values, and buffered
+        # writes to the campaign wait until it has committed
+        with stats_buffer.write_through(campaignID):
+            result = apply_events(campaignID, events)
+            db.session.commit()
+    except GameplayEventError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Could not save gameplay events: {str(e)}"}), 500
+
+    return jsonify(result)
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.models import PlayerCharacter
+from app.versions import conditional
 from ..firebase_auth import verify_firebase_token
 
 characters_bp = Blueprint("characters", __name__)
@@ -33,6 +34,7 @@ def create_character(user):
 
 @characters_bp.route("/<string:userID>", methods=["GET"])
 @verify_firebase_token
+@conditional(lambda userID: f"characters:{userID}")
 def get_character(user, userID):
     character = PlayerCharacter.query.filter_by(userID=userID).first()
     if not character:
@@ -1,9 +1,16 @@
 from flask import Blueprint, request, jsonify
-from app.extensions import db
+from app.extensions import db, job_queue
+from app.jobs import JobLimitError, PermanentJobError
 from app.models import Question
 from app.models import Answer
 from app.models import Campaign
+from app.counters import increment, update_returning
+from app.pagination import paginate, paginate_stream, paginated_response, streamed_page_response, PaginationError
 from ..firebase_auth import verify_firebase_token
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+from pypdf.errors import PdfReadError
+import io
 import os
 import sys
 from werkzeug.utils import secure_filename
@@ -12,80 +19,182 @@ from qa_app import run_qa_session
 
 questions_bp = Blueprint("questions", __name__)
 
+QUESTION_DIFFICULTIES = {"easy", "medium", "hard"}
+
 @questions_bp.route("/<int:campaignID>", methods=["GET"])
 @verify_firebase_token
 def get_questions(user, campaignID):
-    questions = Question.query.filter_by(campaignID=campaignID).all()
-    return jsonify([
+    try:
+        # The Unity client loads a campaign's questions in one request and does not page
+        questions, next_cursor = paginate_stream(
+            Question.query.filter_by(campaignID=campaignID), Question.questionID, unbounded=True
+        )
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return streamed_page_response(questions, lambda q: {
+        "questionID": q.questionID,
+        "difficulty": q.difficulty,
+        "questionStr": q.questionStr,
+        "gotCorrect": q.gotCorrect,
+        "wrongAttempts": q.wrongAttempts
+    }, next_cursor)
+
+def own_questions(user, campaign_id=None):
+    """Questions in the caller's campaigns, optionally only one of them; served by ix_campaign_user."""
+    query = (
+        Question.query
+        .join(Campaign, Campaign.campaignID == Question.campaignID)
+        .filter(Campaign.userID == user.userID)
+    )
+    if campaign_id is not None:
+        query = query.filter(Question.campaignID == campaign_id)
+    return query
+
+def campaign_id_arg():
+    campaign_id = request.args.get("campaignID")
+    if campaign_id is None:
+        return None
+    if not campaign_id.isdigit():
+        raise ValueError("campaignID must be an integer")
+    return int(campaign_id)
+
+@questions_bp.route("/<int:campaignID>/bundle", methods=["GET"])
+@verify_firebase_token
+def get_question_bundle(user, campaignID):
+    """Every question of one of the caller's campaigns with its answers nested, in two queries."""
+    query = own_questions(user, campaignID).options(selectinload(Question.answers))
+
+    difficulty = request.args.get("difficulty")
+    if difficulty is not None:
+        if difficulty.lower() not in QUESTION_DIFFICULTIES:
+            return jsonify({"error": "Invalid difficulty level"}), 400
+        query = query.filter(Question.difficulty == difficulty.lower())
+
+    got_correct = request.args.get("gotCorrect")
+    if got_correct is not None:
+        if got_correct.lower() not in ("true", "false"):
+            return jsonify({"error": "gotCorrect must be true or false"}), 400
+        query = query.filter(Question.gotCorrect == (got_correct.lower() == "true"))
+
+    try:
+        questions, next_cursor = paginate(query, Question.questionID, unbounded=True)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return paginated_response([
         {
             "questionID": q.questionID,
+            "campaignID": q.campaignID,
             "difficulty": q.difficulty,
             "questionStr": q.questionStr,
             "gotCorrect": q.gotCorrect,
-            "wrongAttempts": q.wrongAttempts
-        } for q in questions
-    ])
+            "wrongAttempts": q.wrongAttempts,
+            "answerList": [
+                {
+                    "answerID": ans.answerID,
+                    "questionID": ans.questionID,
+                    "answerStr": ans.answerStr,
+                    "isCorrect": ans.isCorrect
+                }
+                for ans in q.answers
+            ]
+        }
+        for q in questions
+    ], next_cursor)
 
 @questions_bp.route("/answer/<int:questionID>", methods=["PUT"])
 @verify_firebase_token
 def answer_question(user, questionID):
     data = request.get_json()
-    question = Question.query.get(questionID)
-
-    if not question:
-        return jsonify({"error": "Question not found"}), 404
-
     if "gotCorrect" not in data:
         return jsonify({"error": "Missing gotCorrect field"}), 400
 
+    # One UPDATE ... RETURNING either way, so concurrent answers cannot lose a wrong attempt
     if data["gotCorrect"]:
-        question.gotCorrect = True
+        updated = update_returning(Question, questionID, {"gotCorrect": True}, Question.questionID)
     else:
-        question.wrongAttempts += 1
+        updated = increment(Question.wrongAttempts, questionID)
+
+    if updated is None:
+        return jsonify({"error": "Question not found"}), 404
 
     db.session.commit()
     return jsonify({"message": "Answer recorded successfully"})
 
+def validate_questions(data):
+    if not isinstance(data, list):
+        return "Expected a list of questions"
+
+    # Everything the database would reject is caught here, so save_questions never fails halfway
+    for item in data:
+        if not isinstance(item, dict) or not all(key in item for key in ["campaignID", "difficulty", "questionStr", "answers"]):
+            return "Missing required fields in one or more questions"
+
+        if not isinstance(item["questionStr"], str) or not item["questionStr"].strip():
+            return "Each question must have a non-empty 'questionStr'"
+
+        if item["difficulty"] not in QUESTION_DIFFICULTIES:
+            return f"Question '{item['questionStr']}' has an invalid difficulty."
+
+        if not isinstance(item["answers"], list) or len(item["answers"]) not in [2, 4]:
+            return f"Question '{item['questionStr']}' must have exactly 2 or 4 answers."
+
+        for ans in item["answers"]:
+            if not isinstance(ans, dict) or "answerStr" not in ans or "isCorrect" not in ans:
+                return "Each answer must include 'answerStr' and 'isCorrect'"
+            if not isinstance(ans["answerStr"], str) or not isinstance(ans["isCorrect"], bool):
+                return "Each answer's 'answerStr' must be a string and 'isCorrect' a boolean"
+
+    return None
+
+def save_questions(data):
+    """
+    Inserts validated questions and their answers as two set-based statements.
+
+    The questions go in as one multi-row INSERT ... RETURNING "questionID"
+    and the answers as one multi-row INSERT using the returned IDs, instead of
+    a flush per question. A multi-row INSERT does not promise to return its
+    rows in VALUES order, so sort_by_parameter_order has SQLAlchemy hand the
+    IDs back in the order of data. On PostgreSQL it does so by ordering on
+    the autoincrement key within each statement (up to 1000 rows apiece);
+    SQLite cannot, so there the questions are inserted one row at a time.
+    """
+    if not data:
+        return
+
+    question_rows = [
+        {
+            "campaignID": item["campaignID"],
+            "difficulty": item["difficulty"],
+            "questionStr": item["questionStr"],
+            "gotCorrect": False,
+            "wrongAttempts": 0
+        } for item in data
+    ]
+
+    with db.session.begin_nested():
+        question_ids = db.session.scalars(
+            insert(Question).returning(Question.questionID, sort_by_parameter_order=True), question_rows
+        ).all()
+
+        answer_rows = [
+            {"questionID": question_id, "answerStr": ans["answerStr"], "isCorrect": ans["isCorrect"]}
+            for question_id, item in zip(question_ids, data)
+            for ans in item["answers"]
+        ]
+        db.session.execute(insert(Answer), answer_rows)
+    db.session.commit()
+
 @questions_bp.route("/batch_create", methods=["POST"])
 @verify_firebase_token
 def batch_create_questions(user, data):
-    if not isinstance(data, list):
-        return jsonify({"error": "Expected a list of questions"}), 400
-
-    new_answers = []
+    error = validate_questions(data)
+    if error:
+        return jsonify({"error": error}), 400
 
     try:
-        with db.session.begin_nested():
-            for item in data:
-                if not all(key in item for key in ["campaignID", "difficulty", "questionStr", "answers"]):
-                    return jsonify({"error": "Missing required fields in one or more questions"}), 400
-                
-                if len(item["answers"]) not in [2, 4]:
-                    return jsonify({"error": f"Question '{item['questionStr']}' must have exactly 2 or 4 answers."}), 400
-
-                new_question = Question(
-                    campaignID=item["campaignID"],
-                    difficulty=item["difficulty"],
-                    questionStr=item["questionStr"],
-                    gotCorrect=False,
-                    wrongAttempts=0
-                )
-                db.session.add(new_question)
-                db.session.flush()
-
-                for ans in item["answers"]:
-                    if "answerStr" not in ans or "isCorrect" not in ans:
-                        return jsonify({"error": "Each answer must include 'answerStr' and 'isCorrect'"}), 400
-
-                    new_answers.append(Answer(
-                        questionID=new_question.questionID,
-                        answerStr=ans["answerStr"],
-                        isCorrect=ans["isCorrect"]
-                    ))
-
-            db.session.bulk_save_objects(new_answers)
-        db.session.commit()
-
+        save_questions(data)
     except Exception as e:
         db.session.rollback() 
         return jsonify({"error": str(e)}), 500
@@ -123,12 +232,16 @@ def delete_question(user, questionID):
 @questions_bp.route("/answers/<int:questionID>", methods=["GET"])
 @verify_firebase_token
 def get_answers(user, questionID):
-    answers = Answer.query.filter_by(questionID=questionID).all()
-    
+    try:
+        answers, next_cursor = paginate(Answer.query.filter_by(questionID=questionID), Answer.answerID)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+
     if not answers:
         return jsonify({"error": "No answers found for this question"}), 404
 
-    return jsonify([
+    return paginated_response([
         {
             "answerID": ans.answerID,
             "questionID": ans.questionID,
@@ -136,29 +249,33 @@ def get_answers(user, questionID):
             "isCorrect": ans.isCorrect
         }
         for ans in answers
-    ])
+    ], next_cursor)
 
 @questions_bp.route("/wrong_attempt/<int:questionID>", methods=["PUT"])
 @verify_firebase_token
 def increment_wrong_attempt(user, questionID):
-    question = Question.query.get(questionID)
-    if not question:
+    wrong_attempts = increment(Question.wrongAttempts, questionID)
+    if wrong_attempts is None:
         return jsonify({"error": "Question not found"}), 404
 
-    question.wrongAttempts += 1
     db.session.commit()
     
     return jsonify({
         "message": "Wrong attempt recorded",
         "questionID": questionID,
-        "wrongAttempts": question.wrongAttempts
+        "wrongAttempts": wrong_attempts
     })
 
 @questions_bp.route("/unanswered", methods=["GET"])
 @verify_firebase_token
 def get_unanswered_questions(user):
-    unanswered_questions = Question.query.filter_by(gotCorrect=False).all()
-    return jsonify([
+    try:
+        query = own_questions(user, campaign_id_arg()).filter(Question.gotCorrect == False)
+        unanswered_questions, next_cursor = paginate(query, Question.questionID)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return paginated_response([
         {
             "questionID": q.questionID,
             "campaignID": q.campaignID,
@@ -167,19 +284,21 @@ def get_unanswered_questions(user):
             "wrongAttempts": q.wrongAttempts
         }
         for q in unanswered_questions
-    ])
+    ], next_cursor)
 
 @questions_bp.route("/difficulty/<string:difficulty>", methods=["GET"])
 @verify_firebase_token
 def get_questions_by_difficulty(user, difficulty):
-    valid_difficulties = {"easy", "medium", "hard"}
-    
-    if difficulty.lower() not in valid_difficulties:
+    if difficulty.lower() not in QUESTION_DIFFICULTIES:
         return jsonify({"error": "Invalid difficulty level"}), 400
 
-    questions = Question.query.filter_by(difficulty=difficulty.lower()).all()
-    
-    return jsonify([
+    try:
+        query = own_questions(user, campaign_id_arg()).filter(Question.difficulty == difficulty.lower())
+        questions, next_cursor = paginate(query, Question.questionID)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return paginated_response([
         {
             "questionID": q.questionID,
             "campaignID": q.campaignID,
@@ -188,44 +307,49 @@ def get_questions_by_difficulty(user, difficulty):
             "wrongAttempts": q.wrongAttempts
         }
         for q in questions
-    ])
+    ], next_cursor)
 
-@questions_bp.route("/create", methods=["POST"])
-@verify_firebase_token
-def create_questions(user):
+CAMPAIGN_LENGTH_ROUNDS = {"quest": 5, "odyssey": 10, "saga": 15}
+
+def parse_upload(user):
+    """Validates a PDF upload form; returns (pdf_file, campaign_id, num_rounds, error_response)."""
     if "file" not in request.files:
-        return jsonify({"error": "No file provided"}), 400
+        return None, None, None, (jsonify({"error": "No file provided"}), 400)
 
     pdf_file = request.files["file"]
     if pdf_file.filename == "":
-        return jsonify({"error": "Empty file uploaded"}), 400
+        return None, None, None, (jsonify({"error": "Empty file uploaded"}), 400)
 
     campaign_id = request.form.get("campaignID")
     
     if not campaign_id:
-        return jsonify({"error": "Missing campaignID"}), 400
+        return None, None, None, (jsonify({"error": "Missing campaignID"}), 400)
 
     current_campaign = Campaign.query.filter_by(userID=user.userID, campaignID=campaign_id).first()
 
     if not current_campaign:
-        return jsonify({"error": "Invalid campaign or unauthorized access"}), 403
-
-    campaign_length_map = {"quest": 5, "odyssey": 10, "saga": 15}
-    num_rounds = campaign_length_map.get(current_campaign.campaignLength, 5)
+        return None, None, None, (jsonify({"error": "Invalid campaign or unauthorized access"}), 403)
 
-    filename = secure_filename(pdf_file.filename)
+    num_rounds = CAMPAIGN_LENGTH_ROUNDS.get(current_campaign.campaignLength, 5)
+    return pdf_file, campaign_id, num_rounds, None
 
-    temp_dir = os.getenv("TEMP") if os.name == "nt" else "/tmp"
-    os.makedirs(temp_dir, exist_ok=True)
+def campaign_question_texts(campaign_id):
+    # Existing questions seed the near-duplicate filter so a new upload does not repeat them
+    rows = Question.query.with_entities(Question.questionStr).filter_by(campaignID=campaign_id).all()
+    return [row.questionStr for row in rows]
 
-    temp_pdf_path = os.path.join(temp_dir, filename)
-
-    print(f"Saving uploaded PDF to: {temp_pdf_path}")
-
-    pdf_file.save(temp_pdf_path)
+@questions_bp.route("/create", methods=["POST"])
+@verify_firebase_token
+def create_questions(user):
+    pdf_file, campaign_id, num_rounds, error = parse_upload(user)
+    if error:
+        return error
 
     try:
-        questions_data = run_qa_session(temp_pdf_path, num_rounds, campaign_id)
+        # The upload is read straight from the request's spooled stream, never copied to a shared path
+        questions_data = run_qa_session(
+            pdf_file.stream, num_rounds, campaign_id, existing_questions=campaign_question_texts(campaign_id)
+        )
 
         if not questions_data:
             return jsonify({"error": "No questions generated"}), 500
@@ -235,6 +359,91 @@ def create_questions(user):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        if os.path.exists(temp_pdf_path):
-            os.remove(temp_pdf_path)
\ No newline at end of file
+def generate_questions_job(job):
+    generation_stats = {}
+    job.progress(10, "generating")
+    # An unreadable or textless PDF fails the same way on every attempt, so neither is retried
+    try:
+        questions_data = run_qa_session(
+            io.BytesIO(job.payload), job.params["numRounds"], job.params["campaignID"], stats=generation_stats,
+            existing_questions=campaign_question_texts(job.params["campaignID"])
+        )
+    except PdfReadError as e:
+        raise PermanentJobError(f"Could not read the PDF: {str(e)}")
+
+    if not questions_data:
+        raise PermanentJobError("No questions generated")
+
+    error = validate_questions(questions_data)
+    if error:
+        raise PermanentJobError(error)
+
+    job.progress(90, "saving")
+    try:
+        save_questions(questions_data)
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return {
+        "campaignID": job.params["campaignID"],
+        "questionsCreated": len(questions_data),
+        "generation": generation_stats
+    }
+
+job_queue.register("generate_questions", generate_questions_job)
+
+@questions_bp.route("/create_async", methods=["POST"])
+@verify_firebase_token
+def create_questions_async(user):
+    pdf_file, campaign_id, num_rounds, error = parse_upload(user)
+    if error:
+        return error
+
+    try:
+        job_id = job_queue.enqueue(
+            "generate_questions",
+            user.userID,
+            {"campaignID": int(campaign_id), "numRounds": num_rounds, "filename": secure_filename(pdf_file.filename)},
+            payload=pdf_file.read()
+        )
+    except JobLimitError as e:
+        return jsonify({"error": str(e)}), 429
+
+    return jsonify({"jobID": job_id, "status": "queued"}), 202
+
+def get_own_job(user, jobID):
+    job = job_queue.get(jobID)
+    if not job or job["userID"] != user.userID:
+        return None
+    return job
+
+@questions_bp.route("/jobs/<string:jobID>", methods=["GET"])
+@verify_firebase_token
+def get_question_job(user, jobID):
+    job = get_own_job(user, jobID)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify({
+        "jobID": job["jobID"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "stage": job["stage"],
+        "attempts": job["attempts"],
+        "error": job["error"]
+    })
+
+@questions_bp.route("/jobs/<string:jobID>/result", methods=["GET"])
+@verify_firebase_token
+def get_question_job_result(user, jobID):
+    job = get_own_job(user, jobID)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job["status"] == "failed":
+        return jsonify({"error": job["error"], "status": job["status"]}), 500
+    if job["status"] != "succeeded":
+        return jsonify({"status": job["status"], "progress": job["progress"]}), 202
+
+    return jsonify(job["result"])
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
-from app.extensions import db
+from app.extensions import db, stats_buffer
 from app.models import PlayerStats, PlayerSpells, Spell
+from app.counters import increment
+from app.gameplay import validate_stats, GameplayEventError
+from app.pagination import paginate, paginated_response, PaginationError
+from app.versions import conditional
 from ..firebase_auth import verify_firebase_token
 
 stats_bp = Blueprint("stats", __name__)
@@ -8,6 +12,11 @@ stats_bp = Blueprint("stats", __name__)
 @stats_bp.route("/<int:campaignID>", methods=["GET"])
 @verify_firebase_token
 def get_player_stats(user, campaignID):
+    if stats_buffer.enabled:
+        buffered = stats_buffer.get(campaignID)
+        if buffered:
+            return jsonify(buffered)
+
     stats = PlayerStats.query.get(campaignID)
     if not stats:
         return jsonify({"error": "Player stats not found"}), 404
@@ -24,6 +33,21 @@ def get_player_stats(user, campaignID):
 @verify_firebase_token
 def update_player_stats(user, campaignID):
     data = request.get_json()
+    if stats_buffer.enabled:
+        # Buffered values only reach the database at the next flush, so they are checked up front
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+        try:
+            validate_stats(data)
+            stats = stats_buffer.update(campaignID, **data)
+        except GameplayEventError as e:
+            return jsonify({"error": str(e)}), 400
+        except TimeoutError as e:
+            return jsonify({"error": str(e)}), 503
+        if stats is None:
+            return jsonify({"error": "Player stats not found"}), 404
+        return jsonify({"message": "Player stats updated successfully"})
+
     stats = PlayerStats.query.get(campaignID)
 
     if not stats:
@@ -43,9 +67,16 @@ def update_player_stats(user, campaignID):
 
 @stats_bp.route("/spells", methods=["GET"])
 @verify_firebase_token
+@conditional("spells")
 def get_spells(user):
-    spells = Spell.query.all()
-    return jsonify([{"spellID": s.spellID, "name": s.spellName, "element": s.spellElement} for s in spells])
+    try:
+        spells, next_cursor = paginate(Spell.query, Spell.spellID)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return paginated_response(
+        [{"spellID": s.spellID, "name": s.spellName, "element": s.spellElement} for s in spells], next_cursor
+    )
 
 @stats_bp.route("/assign_spells", methods=["POST"])
 @verify_firebase_token
@@ -70,12 +101,16 @@ def assign_spells(user):
 @stats_bp.route("/player_spells/<int:campaignID>", methods=["GET"])
 @verify_firebase_token
 def get_player_spells(user, campaignID):
-    spells = db.session.query(PlayerSpells, Spell).join(Spell, PlayerSpells.spellID == Spell.spellID).filter(PlayerSpells.playerID == campaignID).all()
-    
+    query = db.session.query(PlayerSpells, Spell).join(Spell, PlayerSpells.spellID == Spell.spellID).filter(PlayerSpells.playerID == campaignID)
+    try:
+        spells, next_cursor = paginate(query, PlayerSpells.playerspellID, key_of=lambda row: row[0].playerspellID)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
     if not spells:
         return jsonify({"error": "No spells found for this player"}), 404
 
-    return jsonify([
+    return paginated_response([
         {
             "playerspellID": ps.playerspellID,
             "spellID": spell.spellID,
@@ -83,7 +118,7 @@ def get_player_spells(user, campaignID):
             "spellElement": spell.spellElement
         }
         for ps, spell in spells
-    ])
+    ], next_cursor)
 
 
 @stats_bp.route("/create", methods=["POST"])
@@ -99,6 +134,7 @@ def create_player_stats(user):
     )
     db.session.add(new_stats)
     db.session.commit()
+    stats_buffer.discard(new_stats.campaignID)
     return jsonify({"message": "Player stats created successfully"})
 
 @stats_bp.route("/player_spells/delete/<int:playerSpellID>", methods=["DELETE"])
@@ -132,12 +168,22 @@ def replenish_mana(user, campaignID):
     
     if "manaAmount" not in data:
         return jsonify({"error": "Missing manaAmount"}), 400
-
-    player_stats = PlayerStats.query.get(campaignID)
-    if not player_stats:
+    if isinstance(data["manaAmount"], bool) or not isinstance(data["manaAmount"], int):
+        return jsonify({"error": "manaAmount must be an integer"}), 400
+
+    if stats_buffer.enabled:
+        try:
+            stats = stats_buffer.add_mana(campaignID, data["manaAmount"])
+        except TimeoutError as e:
+            return jsonify({"error": str(e)}), 503
+        if stats is None:
+            return jsonify({"error": "Player stats not found"}), 404
+        return jsonify({"message": "Mana replenished successfully", "newMana": stats["mana"]})
+
+    new_mana = increment(PlayerStats.mana, campaignID, data["manaAmount"], maximum=100)
+    if new_mana is None:
         return jsonify({"error": "Player stats not found"}), 404
 
-    player_stats.mana = min(player_stats.mana + data["manaAmount"], 100)
     db.session.commit()
     
-    return jsonify({"message": "Mana replenished successfully", "newMana": player_stats.mana})
\ No newline at end of file
+    return jsonify({"message": "Mana replenished successfully", "newMana": new_mana})
\ No newline at end of file
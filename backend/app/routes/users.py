@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
-from app.extensions import db
-from app.models import User
+from app.extensions import db, token_cache, known_users, resource_versions
+from app.models import User, Campaign
+from app.pagination import paginate_stream, streamed_page_response, PaginationError
 from ..firebase_auth import verify_firebase_token
 
 users_bp = Blueprint('users', __name__)
@@ -21,8 +22,16 @@ def delete_user(user, userID):
     if not user:
         return jsonify({"error": "User not found"}), 404
 
+    # The database cascades the delete to the user's campaigns and their achievements; the ETags of
+    # those achievement lists change here, since no flush event is guaranteed to see the rows go
+    campaign_ids = db.session.scalars(db.select(Campaign.campaignID).filter_by(userID=userID)).all()
+    if campaign_ids:
+        resource_versions.bump([f"achievements:{campaign_id}" for campaign_id in campaign_ids])
+
     db.session.delete(user)
     db.session.commit()
+    token_cache.invalidate_user(userID)
+    known_users.discard(userID)
     return jsonify({"message": "User deleted successfully"}), 200
 
 @users_bp.route("/update/<string:userID>", methods=["PUT"])
@@ -37,10 +46,16 @@ def update_user(user, userID):
         user.screenName = data["screenName"]
 
     db.session.commit()
+    token_cache.invalidate_user(userID)
+    known_users.discard(userID)
     return jsonify({"message": "User updated successfully"})
 
 @users_bp.route("/", methods=["GET"])
 @verify_firebase_token
 def get_all_users(user):
-    users = User.query.all()
-    return jsonify([{"userID": u.userID, "screenName": u.screenName} for u in users])
\ No newline at end of file
+    try:
+        users, next_cursor = paginate_stream(User.query, User.userID)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return streamed_page_response(users, lambda u: {"userID": u.userID, "screenName": u.screenName}, next_cursor)
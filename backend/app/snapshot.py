@@ -0,0 +1,149 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, func, case
+from app.extensions import db, stats_buffer
+from app.models import Campaign, PlayerStats, PlayerSpells, Spell, Question, Achievement
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def executor(workers):
+    global _executor, _executor_pid
+    with _executor_lock:
+        # Pool threads do not survive a gunicorn fork, so each worker process makes its own
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snapshot")
+            _executor_pid = os.getpid()
+        return _executor
+
+def gather(queries, engine=None, workers=1):
+    """
+    Runs independent read queries, each a function of a connection, and returns their results in order.
+
+    With an engine and more than one worker every query gets its own pooled
+    connection on a shared thread pool, so their round trips overlap;
+    otherwise they run one after another on the session's connection.
+    """
+    if engine is None or workers <= 1 or len(queries) <= 1:
+        connection = db.session.connection()
+        return [query(connection) for query in queries]
+
+    def run(query):
+        with engine.connect() as connection:
+            return query(connection)
+
+    return list(executor(workers).map(run, queries))
+
+def campaign_with_stats(user_id, campaign_id):
+    def query(connection):
+        return connection.execute(
+            select(
+                Campaign.campaignID, Campaign.title, Campaign.campaignLength, Campaign.currLevel,
+                Campaign.remainingTries, Campaign.lastUpdated, PlayerStats.campaignID.label("statsCampaignID"),
+                PlayerStats.attack, PlayerStats.hp, PlayerStats.mana, PlayerStats.affinity
+            )
+            .outerjoin(PlayerStats, PlayerStats.campaignID == Campaign.campaignID)
+            .where(Campaign.campaignID == campaign_id, Campaign.userID == user_id)
+        ).first()
+    return query
+
+def equipped_spells(campaign_id):
+    def query(connection):
+        return connection.execute(
+            select(PlayerSpells.playerspellID, Spell.spellID, Spell.spellName, Spell.spellElement)
+            .join(Spell, PlayerSpells.spellID == Spell.spellID)
+            .where(PlayerSpells.playerID == campaign_id)
+            .order_by(PlayerSpells.playerspellID)
+        ).all()
+    return query
+
+def question_summary(campaign_id):
+    def query(connection):
+        return connection.execute(
+            select(
+                Question.difficulty,
+                func.count().label("total"),
+                func.sum(case((Question.gotCorrect, 1), else_=0)).label("answered"),
+                func.sum(Question.wrongAttempts).label("wrongAttempts")
+            )
+            .where(Question.campaignID == campaign_id)
+            .group_by(Question.difficulty)
+        ).all()
+    return query
+
+def campaign_achievements(campaign_id):
+    def query(connection):
+        return connection.execute(
+            select(Achievement.achievementID, Achievement.title, Achievement.description)
+            .where(Achievement.campaignID == campaign_id)
+            .order_by(Achievement.achievementID)
+        ).all()
+    return query
+
+def load_snapshot(user_id, campaign_id, workers=1):
+    """
+    Everything a level load needs from one of the caller's campaigns, in four queries; None if not theirs.
+
+    The campaign and its stats come from one join, and equipped spells, a
+    per-difficulty question summary and achievements from one query each.
+    The four are independent, so on PostgreSQL they run concurrently. SQLite
+    is in-process, with no round trips to overlap, so there they run in turn.
+    """
+    engine = db.engine if db.engine.dialect.name != "sqlite" else None
+    campaign, spells, questions, achievements = gather([
+        campaign_with_stats(user_id, campaign_id),
+        equipped_spells(campaign_id),
+        question_summary(campaign_id),
+        campaign_achievements(campaign_id)
+    ], engine, workers)
+    if campaign is None:
+        return None
+
+    stats = None
+    if campaign.statsCampaignID is not None:
+        stats = {
+            "campaignID": campaign.campaignID,
+            "attack": campaign.attack,
+            "hp": campaign.hp,
+            "mana": campaign.mana,
+            "affinity": campaign.affinity
+        }
+    if stats_buffer.enabled:
+        stats = stats_buffer.get(campaign_id) or stats
+
+    by_difficulty = {
+        row.difficulty: {"total": row.total, "answered": row.answered, "wrongAttempts": row.wrongAttempts}
+        for row in questions
+    }
+    return {
+        "campaign": {
+            "campaignID": campaign.campaignID,
+            "title": campaign.title,
+            "campaignLength": campaign.campaignLength,
+            "currLevel": campaign.currLevel,
+            "remainingTries": campaign.remainingTries,
+            "lastUpdated": campaign.lastUpdated
+        },
+        "stats": stats,
+        "spells": [
+            {
+                "playerspellID": row.playerspellID,
+                "spellID": row.spellID,
+                "spellName": row.spellName,
+                "spellElement": row.spellElement
+            }
+            for row in spells
+        ],
+        "questions": {
+            "total": sum(summary["total"] for summary in by_difficulty.values()),
+            "answered": sum(summary["answered"] for summary in by_difficulty.values()),
+            "wrongAttempts": sum(summary["wrongAttempts"] for summary in by_difficulty.values()),
+            "byDifficulty": by_difficulty
+        },
+        "achievements": [
+            {"achievementID": row.achievementID, "title": row.title, "description": row.description}
+            for row in achievements
+        ]
+    }
@@ -0,0 +1,331 @@
+import time
+import uuid
+import logging
+from contextlib import closing, contextmanager
+from decimal import Decimal
+from sqlalchemy import update, select, bindparam
+from app.background import BackgroundThreads, connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_stats (
+    campaignID INTEGER PRIMARY KEY,
+    attack TEXT NOT NULL,
+    hp INTEGER NOT NULL,
+    mana INTEGER NOT NULL,
+    affinity TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    flushedVersion INTEGER NOT NULL DEFAULT 0,
+    updatedAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS player_stats_dirty ON player_stats (flushedVersion, version);
+CREATE TABLE IF NOT EXISTS campaign_locks (
+    campaignID INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    lockedUntil REAL NOT NULL
+);
+"""
+
+FIELDS = ("attack", "hp", "mana", "affinity")
+
+class StatsBuffer:
+    """
+    Write-behind buffer for player_stats, persisted in a local SQLite file.
+
+    Mana ticks and HP changes only matter once a level ends, so while the
+    buffer is enabled they update a copy of the row in the buffer file instead
+    of the database. Every gunicorn worker shares the file, so reads through
+    get() see the latest buffered values no matter which worker wrote them.
+    Each write bumps the row's version; flush() copies rows whose version is
+    ahead of the last flushed one to the database in one statement and then
+    records what it flushed. Rows hold absolute values rather than deltas, so
+    a flush repeated after a crash between the database commit and the
+    bookkeeping writes the same values again. Anything that writes
+    player_stats directly must do so inside write_through() (or discard the
+    campaign's row when it replaces it). The file has to outlive deploys, so
+    its path must be configured.
+    """
+
+    def __init__(self, path=None, enabled=False, flush_interval=30, idle_seconds=600, mana_max=100,
+                 lock_ttl=30, lock_timeout=10):
+        self.path = path
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.idle_seconds = idle_seconds
+        self.mana_max = mana_max
+        self.lock_ttl = lock_ttl
+        self.lock_timeout = lock_timeout
+        self.app = None
+        self.db = None
+        self.table = None
+        self._flusher = BackgroundThreads("stats-buffer-flusher", self._flush_loop)
+
+    def init_app(self, app, db):
+        self.app = app
+        self.db = db
+        self.table = db.metadata.tables["player_stats"]
+        self.enabled = app.config.get("STATS_BUFFER_ENABLED", self.enabled)
+        self.path = app.config.get("STATS_BUFFER_PATH") or self.path
+        self.flush_interval = app.config.get("STATS_BUFFER_FLUSH_INTERVAL", self.flush_interval)
+        self.idle_seconds = app.config.get("STATS_BUFFER_IDLE_SECONDS", self.idle_seconds)
+        app.extensions["stats_buffer"] = self
+        if not self.enabled:
+            return
+
+        # Unflushed stats live only in this file, so a temp dir wiped on redeploy would lose them
+        if not self.path:
+            raise ValueError("STATS_BUFFER_PATH must be set to a persistent location when STATS_BUFFER_ENABLED is.")
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+        # Rows left behind by a crashed process are flushed without waiting for a new write
+        app.before_request(self._ensure_started)
+        self.start()
+
+    def _connect(self):
+        # A buffered write is only acknowledged once it would survive a power loss
+        return connect_sqlite(self.path, synchronous="FULL")
+
+    @staticmethod
+    def _as_stats(row):
+        return {
+            "campaignID": row["campaignID"],
+            "attack": Decimal(row["attack"]),
+            "hp": row["hp"],
+            "mana": row["mana"],
+            "affinity": row["affinity"]
+        }
+
+    def get(self, campaign_id):
+        """Buffered stats of a campaign, or None when the database copy is current."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT campaignID, attack, hp, mana, affinity FROM player_stats WHERE campaignID = ?", (campaign_id,)
+            ).fetchone()
+        return None if row is None else self._as_stats(row)
+
+    def _begin(self, conn, campaign_id):
+        """Opens a write transaction once nobody holds the campaign's lock, waiting up to lock_timeout."""
+        deadline = time.time() + self.lock_timeout
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            locked = conn.execute(
+                "SELECT 1 FROM campaign_locks WHERE campaignID = ? AND lockedUntil > ?", (campaign_id, time.time())
+            ).fetchone()
+            if not locked:
+                return
+            conn.execute("ROLLBACK")
+            if time.time() >= deadline:
+                raise TimeoutError(f"Player stats of campaign {campaign_id} are locked")
+            time.sleep(0.01)
+
+    def _lock(self, conn, campaign_ids, owner):
+        conn.executemany(
+            "INSERT OR REPLACE INTO campaign_locks (campaignID, owner, lockedUntil) VALUES (?, ?, ?)",
+            [(campaign_id, owner, time.time() + self.lock_ttl) for campaign_id in campaign_ids]
+        )
+
+    def _unlock(self, campaign_ids, owner):
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "DELETE FROM campaign_locks WHERE campaignID = ? AND owner = ?",
+                [(campaign_id, owner) for campaign_id in campaign_ids]
+            )
+
+    def _load(self, conn, campaign_id):
+        if conn.execute("SELECT 1 FROM player_stats WHERE campaignID = ?", (campaign_id,)).fetchone():
+            return True
+
+        # Read while the buffer's write transaction is open, so a concurrent write_through()
+        # cannot commit new values to the database between this read and the insert
+        row = self.db.session.execute(
+            select(self.table.c.attack, self.table.c.hp, self.table.c.mana, self.table.c.affinity)
+            .where(self.table.c.campaignID == campaign_id)
+        ).first()
+        if row is None:
+            return False
+
+        conn.execute(
+            "INSERT INTO player_stats (campaignID, attack, hp, mana, affinity, updatedAt) VALUES (?, ?, ?, ?, ?, ?)",
+            (campaign_id, str(row.attack), row.hp, row.mana, row.affinity, time.time())
+        )
+        return True
+
+    def _write(self, campaign_id, assignments, params):
+        conn = self._connect()
+        try:
+            self._begin(conn, campaign_id)
+            if not self._load(conn, campaign_id):
+                conn.execute("ROLLBACK")
+                return None
+            assignments = ", ".join([*assignments, "version = version + 1", "updatedAt = ?"])
+            row = conn.execute(
+                f"UPDATE player_stats SET {assignments} "
+                "WHERE campaignID = ? RETURNING campaignID, attack, hp, mana, affinity",
+                (*params, time.time(), campaign_id)
+            ).fetchall()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return self._as_stats(row)
+
+    def update(self, campaign_id, **fields):
+        """Buffers new values for some of attack, hp, mana and affinity; returns the stats or None."""
+        fields = {name: value for name, value in fields.items() if name in FIELDS}
+        if "attack" in fields:
+            fields["attack"] = str(Decimal(str(fields["attack"])))
+        return self._write(campaign_id, [f"{name} = ?" for name in fields], tuple(fields.values()))
+
+    def add_mana(self, campaign_id, amount):
+        """Buffers a mana replenish, capped like the database update; returns the stats or None."""
+        return self._write(campaign_id, ["mana = min(mana + ?, ?)"], (amount, self.mana_max))
+
+    def discard(self, campaign_id):
+        """Forgets a campaign's buffered row without writing it, e.g. when the row is replaced or deleted."""
+        if not self.enabled:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM player_stats WHERE campaignID = ?", (campaign_id,))
+
+    def _write_rows(self, rows):
+        """Copies buffered rows to the database and commits, then records them as flushed."""
+        if not rows:
+            return
+        table = self.table
+        statement = (
+            update(table)
+            .where(table.c.campaignID == bindparam("b_campaignID"))
+            .values({name: bindparam(f"b_{name}") for name in FIELDS})
+        )
+        try:
+            self.db.session.execute(statement, [
+                {f"b_{name}": value for name, value in self._as_stats(row).items()} for row in rows
+            ])
+            self.db.session.commit()
+        except Exception:
+            self.db.session.rollback()
+            raise
+
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "UPDATE player_stats SET flushedVersion = ? WHERE campaignID = ? AND flushedVersion < ?",
+                [(row["version"], row["campaignID"], row["version"]) for row in rows]
+            )
+
+    @contextmanager
+    def write_through(self, campaign_id):
+        """
+        Flushes and evicts a campaign's buffered stats, then holds its lock until the block exits.
+
+        Code that writes player_stats directly runs and commits inside the
+        block. Until it leaves, buffered writes to the campaign wait (they
+        would otherwise reload the row before that commit) and flushes skip
+        it (they would overwrite it with older values). Raises when the flush
+        fails, leaving the buffer as it was.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        owner = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            self._begin(conn, campaign_id)
+            self._lock(conn, [campaign_id], owner)
+            rows = conn.execute(
+                "SELECT campaignID, attack, hp, mana, affinity, version FROM player_stats "
+                "WHERE campaignID = ? AND version > flushedVersion", (campaign_id,)
+            ).fetchall()
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        try:
+            self._write_rows(rows)
+            # Nothing can have been buffered since, so the row goes and the next read uses the database
+            self.discard(campaign_id)
+            yield
+        finally:
+            self._unlock([campaign_id], owner)
+
+    def flush_campaign(self, campaign_id):
+        """Writes a campaign's buffered stats through and evicts them, e.g. at the end of a level."""
+        with self.write_through(campaign_id):
+            pass
+
+    def flush(self, evict=False):
+        """
+        Writes every buffered change to the database and commits; returns how many rows were written.
+
+        Campaigns locked by write_through() are left for the next flush, and
+        the rest stay locked while they are written. evict also drops clean
+        rows that have been idle for idle_seconds, so the file does not grow
+        without bound. Raises when the database write fails, leaving the
+        buffer as it was.
+        """
+        if not self.enabled:
+            return 0
+
+        owner = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT campaignID, attack, hp, mana, affinity, version FROM player_stats "
+                "WHERE version > flushedVersion AND campaignID NOT IN "
+                "(SELECT campaignID FROM campaign_locks WHERE lockedUntil > ?)", (time.time(),)
+            ).fetchall()
+            self._lock(conn, [row["campaignID"] for row in rows], owner)
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        try:
+            self._write_rows(rows)
+        finally:
+            self._unlock([row["campaignID"] for row in rows], owner)
+
+        if evict:
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    "DELETE FROM player_stats WHERE version = flushedVersion AND updatedAt <= ? AND campaignID NOT IN "
+                    "(SELECT campaignID FROM campaign_locks WHERE lockedUntil > ?)",
+                    (time.time() - self.idle_seconds, time.time())
+                )
+
+        if rows:
+            logger.info(f"Flushed buffered stats of {len(rows)} campaign(s)")
+        return len(rows)
+
+    def _ensure_started(self):
+        if self.flush_interval > 0:
+            self._flusher.ensure_started()
+
+    def start(self):
+        if self.flush_interval > 0:
+            self._flusher.start()
+
+    def stop(self):
+        self._flusher.stop()
+
+    def _flush_loop(self):
+        while not self._flusher.stopping.wait(self.flush_interval):
+            try:
+                with self.app.app_context():
+                    # Rows idle for a while are also evicted so the file does not grow without bound
+                    self.flush(evict=True)
+            except Exception as e:
+                logger.error(f"Stats buffer flush failed: {str(e)}")
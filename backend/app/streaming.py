@@ -0,0 +1,41 @@
+from flask import Response, current_app, stream_with_context
+from app.negotiation import wants_msgpack
+
+def json_array(items, serialize, batch_size=100):
+    """
+    Writes items as a JSON array, one slice at a time.
+
+    Each item is passed through serialize and encoded on its own with the
+    app's JSON provider; encoded items are sent in groups of batch_size, so
+    only one group is ever held in memory however long the array is.
+    """
+    dumps = current_app.json.dumps
+    yield "["
+    separator = ""
+    batch = []
+    for item in items:
+        batch.append(dumps(serialize(item)))
+        if len(batch) >= batch_size:
+            yield separator + ",".join(batch)
+            separator = ","
+            batch = []
+    if batch:
+        yield separator + ",".join(batch)
+    yield "]"
+
+def streamed_json(items, serialize, headers=None):
+    if wants_msgpack():
+        # A MessagePack array starts with its length, so the (size-capped) page is packed in one go
+        response = current_app.json.response([serialize(item) for item in items])
+        response.headers.extend(headers or {})
+        return response
+
+    # stream_with_context keeps the request (and its database session) alive until the last row is sent
+    batch_size = current_app.config.get("STREAM_BATCH_SIZE", 100)
+    response = Response(
+        stream_with_context(json_array(items, serialize, batch_size)),
+        mimetype="application/json",
+        headers=headers
+    )
+    response.vary.add("Accept")
+    return response
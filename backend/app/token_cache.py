@@ -0,0 +1,154 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+class TokenCache:
+    """
+    Bounded LRU of verified ID tokens.
+
+    Keys are SHA-256 digests of the raw token so the cache never holds usable
+    credentials. Each entry keeps the decoded claims and the resolved principal
+    and expires at the token's own exp claim (or max_ttl, whichever comes first).
+    Every gunicorn worker has its own cache and invalidate_user() only reaches
+    the calling one, so max_ttl is kept short: it bounds how long other workers
+    keep accepting a deleted or changed user's tokens.
+    """
+
+    def __init__(self, max_size=1024, max_ttl=60):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_size = app.config.get("TOKEN_CACHE_SIZE", self.max_size)
+        self.max_ttl = app.config.get("TOKEN_CACHE_TTL", self.max_ttl)
+        self.clear()
+        app.extensions["token_cache"] = self
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token):
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, principal, expires_at = entry
+            if time.time() >= expires_at:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims, principal
+
+    def put(self, token, claims, principal):
+        exp = claims.get("exp")
+        if self.max_size <= 0 or isinstance(exp, bool) or not isinstance(exp, (int, float)):
+            return
+        expires_at = min(exp, time.time() + self.max_ttl)
+        if expires_at <= time.time():
+            return
+
+        key = self.digest(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (claims, principal, expires_at)
+            self._by_user.setdefault(claims["uid"], set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def _remove(self, key):
+        claims, _, _ = self._entries.pop(key)
+        keys = self._by_user.get(claims["uid"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[claims["uid"]]
+
+class KnownUserCache:
+    """
+    Bounded LRU of registered users (userID -> screenName).
+
+    Lets verify_firebase_token confirm registration without touching the
+    database. Only users that were actually found are remembered, so a miss
+    always falls through to a lookup and never rejects a valid user. Entries
+    expire after ttl seconds because discard() only reaches the calling
+    worker; afterwards the user row is looked up again, so a user deleted
+    through another worker is rejected again within ttl.
+    """
+
+    def __init__(self, max_size=4096, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_size = app.config.get("KNOWN_USER_CACHE_SIZE", self.max_size)
+        self.ttl = app.config.get("KNOWN_USER_CACHE_TTL", self.ttl)
+        self.clear()
+        app.extensions["known_users"] = self
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            screen_name, expires_at = entry
+            if time.time() >= expires_at:
+                del self._users[user_id]
+                self.misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            self.hits += 1
+            return screen_name
+
+    def add(self, user_id, screen_name):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._users[user_id] = (screen_name, time.time() + self.ttl)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._users)}
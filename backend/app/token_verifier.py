@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+import logging
+import jwt
+import requests
+from cryptography.x509 import load_pem_x509_certificate
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+DEFAULT_MAX_AGE = 3600
+
+class TokenVerificationError(Exception):
+    pass
+
+class GoogleCertificateSource:
+    """Fetches Firebase signing certificates and the Cache-Control max-age they were served with."""
+
+    def __init__(self, url=GOOGLE_CERTS_URL, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json(), parse_max_age(response.headers.get("Cache-Control"))
+
+class StaticKeySource:
+    """Serves a fixed set of PEM certificates, e.g. a locally generated key set in tests."""
+
+    def __init__(self, certificates, max_age=DEFAULT_MAX_AGE):
+        self.certificates = dict(certificates)
+        self.max_age = max_age
+
+    def fetch(self):
+        return dict(self.certificates), self.max_age
+
+def parse_max_age(cache_control):
+    if not cache_control:
+        return DEFAULT_MAX_AGE
+    match = re.search(r"max-age=(\d+)", cache_control)
+    return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+class TokenVerifier:
+    """
+    Verifies Firebase ID tokens in-process.
+
+    Public keys are parsed once per certificate refresh and kept until the
+    max-age advertised by the key source runs out. Shortly before that, a
+    background thread refreshes them so requests never wait on the fetch
+    unless the cache is empty, expired, or missing the token's key ID.
+    Every refresh logs the hit, miss and refresh counters at INFO.
+    """
+
+    def __init__(self, project_id=None, key_source=None, refresh_margin=300, clock_skew=5, min_refresh_interval=30):
+        self.project_id = project_id
+        self.key_source = key_source or GoogleCertificateSource()
+        self.refresh_margin = refresh_margin
+        self.clock_skew = clock_skew
+        self.min_refresh_interval = min_refresh_interval
+        self._keys = {}
+        self._expires_at = 0
+        self._refreshed_at = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def init_app(self, app):
+        self.project_id = app.config.get("FIREBASE_PROJECT_ID")
+        app.extensions["token_verifier"] = self
+
+    @property
+    def enabled(self):
+        return bool(self.project_id)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refreshErrors": self.refresh_errors,
+            "cachedKeys": len(self._keys),
+            "expiresIn": max(0, int(self._expires_at - time.time()))
+        }
+
+    def refresh(self):
+        try:
+            certificates, max_age = self.key_source.fetch()
+            keys = {
+                kid: load_pem_x509_certificate(pem.encode("utf-8")).public_key()
+                for kid, pem in certificates.items()
+            }
+        except Exception:
+            self.refresh_errors += 1
+            raise
+        finally:
+            self._refreshing = False
+
+        with self._lock:
+            self._keys = keys
+            self._refreshed_at = time.time()
+            self._expires_at = self._refreshed_at + max_age
+            self.refreshes += 1
+        # Refreshes follow the key max-age, so this doubles as a periodic report of the key cache
+        logger.info(
+            f"Loaded {len(keys)} token signing keys (max-age {max_age}s); key cache so far: "
+            f"{self.hits} hits, {self.misses} misses, {self.refreshes} refreshes, {self.refresh_errors} refresh errors"
+        )
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Background signing key refresh failed: {str(e)}")
+
+        threading.Thread(target=run, name="token-key-refresh", daemon=True).start()
+
+    def get_key(self, kid):
+        now = time.time()
+        key = self._keys.get(kid)
+
+        if key is not None and now < self._expires_at:
+            self.hits += 1
+            if now >= self._expires_at - self.refresh_margin:
+                self._refresh_in_background()
+            return key
+
+        self.misses += 1
+        with self._refresh_lock:
+            # Another request may have refreshed while we waited; an unknown kid on
+            # freshly loaded keys is not worth another fetch.
+            now = time.time()
+            stale = now >= self._expires_at
+            recently_refreshed = now - self._refreshed_at < self.min_refresh_interval
+            if stale or (kid not in self._keys and not recently_refreshed):
+                self.refresh()
+            key = self._keys.get(kid)
+
+        if key is None:
+            raise TokenVerificationError(f"Unknown signing key: {kid}")
+        return key
+
+    def verify(self, token):
+        if not self.enabled:
+            raise TokenVerificationError("FIREBASE_PROJECT_ID is not configured")
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Malformed token: {str(e)}")
+
+        if header.get("alg") != "RS256":
+            raise TokenVerificationError("Token must be signed with RS256")
+
+        key = self.get_key(header.get("kid"))
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                audience=self.project_id,
+                issuer=f"https://securetoken.google.com/{self.project_id}",
+                leeway=self.clock_skew,
+                options={"require": ["exp", "iat", "sub", "aud", "iss"]}
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e))
+
+        if not isinstance(claims["sub"], str) or not claims["sub"] or len(claims["sub"]) > 128:
+            raise TokenVerificationError("Token has an invalid subject")
+        if claims.get("auth_time", 0) > time.time() + self.clock_skew:
+            raise TokenVerificationError("Token auth_time is in the future")
+
+        claims["uid"] = claims["sub"]
+        return claims
@@ -0,0 +1,17 @@
+from tempfile import SpooledTemporaryFile
+from flask import Request, current_app
+
+class SpooledUploadRequest(Request):
+    """
+    Request class that keeps uploaded files in memory up to UPLOAD_SPOOL_BYTES.
+
+    Werkzeug's default spools anything over 500 KiB to disk, which sends most
+    lecture PDFs through a temp file. Here each upload gets its own
+    SpooledTemporaryFile, so typical uploads are parsed straight from memory
+    and larger ones spill to an anonymous temp file that is removed when the
+    request ends. Concurrent uploads with the same filename never share a path.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        max_size = current_app.config.get("UPLOAD_SPOOL_BYTES", 8 * 1024 * 1024)
+        return SpooledTemporaryFile(max_size=max_size, mode="rb+", suffix=".pdf")
@@ -0,0 +1,130 @@
+import hashlib
+from functools import wraps
+from flask import request, current_app, make_response, Response
+from sqlalchemy import event, select, update, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from app.negotiation import wants_msgpack
+
+# Scopes a changed row belongs to, by table. Deleting a user or campaign cascades in the
+# database, so those rows also bump the scopes of their children.
+SCOPES = {
+    "spells": lambda row: ["spells"],
+    "player_character": lambda row: [f"characters:{row.userID}"],
+    "campaign": lambda row: [f"campaigns:{row.userID}", f"achievements:{row.campaignID}"],
+    "achievements": lambda row: [f"achievements:{row.campaignID}"],
+    "users": lambda row: [f"campaigns:{row.userID}", f"characters:{row.userID}"],
+}
+
+UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+class ResourceVersions:
+    """
+    Version counters for rarely-changing resources, kept in resource_versions.
+
+    Every flush that inserts, changes or deletes a tracked row bumps the
+    counters of the scopes it belongs to in the same transaction, so all
+    gunicorn workers agree on the current version. GET routes decorated with
+    conditional() derive a strong ETag from the counter and answer a matching
+    If-None-Match with 304 after one primary key lookup, before the resource
+    is queried or serialized. Writes that bypass the session (raw SQL, bulk
+    Query.update/delete on tracked tables) must call bump() themselves.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.table = None
+
+    def init_app(self, app, db):
+        self.db = db
+        self.table = db.metadata.tables["resource_versions"]
+        if not event.contains(db.session, "after_flush", self._after_flush):
+            event.listen(db.session, "after_flush", self._after_flush)
+        app.extensions["resource_versions"] = self
+
+    def current(self, scope):
+        version = self.db.session.execute(
+            select(self.table.c.version).where(self.table.c.scope == scope)
+        ).scalar()
+        return version or 0
+
+    def bump(self, scopes, connection=None):
+        connection = connection or self.db.session.connection()
+        rows = [{"scope": scope, "version": 1} for scope in sorted(set(scopes))]
+        upsert = UPSERTS.get(connection.dialect.name)
+        if upsert is not None:
+            statement = upsert(self.table).values(rows)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[self.table.c.scope], set_={"version": self.table.c.version + 1}
+            ))
+            return
+
+        for row in rows:
+            updated = connection.execute(
+                update(self.table).where(self.table.c.scope == row["scope"]).values(version=self.table.c.version + 1)
+            )
+            if updated.rowcount == 0:
+                connection.execute(insert(self.table).values(**row))
+
+    def _after_flush(self, session, flush_context):
+        scopes = set()
+        for row in (*session.new, *session.dirty, *session.deleted):
+            scopes_of = SCOPES.get(getattr(row, "__tablename__", None))
+            if scopes_of and (row not in session.dirty or session.is_modified(row)):
+                scopes.update(scopes_of(row))
+        if scopes:
+            self.bump(scopes, session.connection())
+
+    def etag(self, scope):
+        # Pages, page sizes and response formats of one resource each get their own tag
+        variant = "msgpack" if wants_msgpack() else "json"
+        key = f"{scope}:{self.current(scope)}:{request.full_path}:{variant}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+def matching_etag(etag):
+    """
+    The variant of etag the client already holds that this request would be served, or None.
+
+    The compressor appends the encoding to the tags of compressed bodies, so
+    a 200 carries either the bare tag or the tag for the encoding this
+    request negotiates. A 304 has to repeat exactly that tag.
+    """
+    compressor = current_app.extensions.get("compressor")
+    encoding = compressor.choose_encoding() if compressor is not None else None
+    suffixes = ("", f"-{encoding}") if encoding else ("",)
+    for suffix in suffixes:
+        if request.if_none_match.contains(etag + suffix):
+            return etag + suffix
+    return None
+
+def conditional(scope):
+    """
+    Adds a strong ETag to a GET route and answers If-None-Match with 304.
+
+    scope is the resource's version scope, or a function of the route's URL
+    arguments that returns it. Apps without ResourceVersions serve the route
+    unconditionally.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(user, *args, **kwargs):
+            versions = current_app.extensions.get("resource_versions")
+            if versions is None:
+                return f(user, *args, **kwargs)
+
+            # The version is read before the resource, so a write in between can only make the tag stale, never wrong
+            etag = versions.etag(scope(**kwargs) if callable(scope) else scope)
+            matched = matching_etag(etag)
+            if matched:
+                response = Response(status=304)
+                etag = matched
+            else:
+                response = make_response(f(user, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.vary.add("Accept")
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,134 @@
+"""
+Compares the old flush-per-question save with save_questions' set-based INSERTs.
+
+On PostgreSQL save_questions sends one INSERT for the questions and one for
+their answers (per 1000 rows). SQLite cannot return the inserted IDs in a guaranteed order,
+so there SQLAlchemy inserts the questions one row at a time and only the
+answers are batched; the default in-memory run therefore shows little saving.
+Point --database-url at a scratch PostgreSQL database to measure the real
+backend. Its questions, answers, campaigns and users tables are created if
+missing and the benchmark rows are deleted afterwards.
+
+SQLite in memory has no network between the app and the database, so
+--latency-ms adds a sleep per statement to stand in for the round trip to a
+hosted PostgreSQL instance. Leave it at 0 against a real server.
+
+Usage:
+    python benchmarks/bench_bulk_insert.py [--questions 2000] [--latency-ms 1.0]
+    python benchmarks/bench_bulk_insert.py --database-url postgresql://localhost/wizdomrun_bench --latency-ms 0
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# The app initialises Firebase on import; the benchmark never authenticates, so stub it as the tests do
+sys.modules["firebase_admin"] = MagicMock()
+sys.modules["firebase_admin.credentials"] = MagicMock()
+sys.modules["firebase_admin.auth"] = MagicMock()
+os.environ.setdefault("FIREBASE_ADMIN_CREDENTIALS", "{}")
+os.environ.setdefault("OPEN_AI_KEY", "unused")
+
+from sqlalchemy import event
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import User, Campaign, Question, Answer
+from app.routes.questions import save_questions, validate_questions
+
+def make_payload(count, campaign_id):
+    # Shaped like run_qa_session output: a spread of difficulties, four answers each
+    return [
+        {
+            "campaignID": campaign_id,
+            "difficulty": ("easy", "medium", "hard")[i % 3],
+            "questionStr": f"Which statement about reaction {i} and its equilibrium constant is correct?",
+            "answers": [
+                {"answerStr": f"Option {letter} for reaction {i}", "isCorrect": letter == "A"} for letter in "ABCD"
+            ]
+        } for i in range(count)
+    ]
+
+def save_questions_per_row(data):
+    # The previous implementation: one flush per question to learn its ID
+    new_answers = []
+    with db.session.begin_nested():
+        for item in data:
+            new_question = Question(
+                campaignID=item["campaignID"], difficulty=item["difficulty"], questionStr=item["questionStr"],
+                gotCorrect=False, wrongAttempts=0
+            )
+            db.session.add(new_question)
+            db.session.flush()
+            for ans in item["answers"]:
+                new_answers.append(Answer(
+                    questionID=new_question.questionID, answerStr=ans["answerStr"], isCorrect=ans["isCorrect"]
+                ))
+        db.session.bulk_save_objects(new_answers)
+    db.session.commit()
+
+def measure(name, save, payload, latency):
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+        if latency:
+            time.sleep(latency)
+
+    event.listen(db.engine, "before_cursor_execute", before_execute)
+    start = time.perf_counter()
+    save(payload)
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, "before_cursor_execute", before_execute)
+
+    # Only this campaign's rows, so a shared database keeps its own questions
+    campaign_id = payload[0]["campaignID"]
+    question_ids = db.session.query(Question.questionID).filter_by(campaignID=campaign_id)
+    db.session.query(Answer).filter(Answer.questionID.in_(question_ids)).delete(synchronize_session=False)
+    db.session.query(Question).filter_by(campaignID=campaign_id).delete(synchronize_session=False)
+    db.session.commit()
+    print(f"{name:<16} {elapsed * 1000:>9.1f} ms {len(statements):>6} statements")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--database-url", default="sqlite://", help="defaults to in-memory SQLite")
+    args = parser.parse_args()
+
+    with patch.object(Config, "SQLALCHEMY_DATABASE_URI", args.database_url), patch.object(Config, "JOB_WORKERS", 0):
+        app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        # A fresh user so a run against a shared database never collides with real rows
+        user = User(userID=f"bench-{uuid.uuid4().hex}", screenName="Bench")
+        campaign = Campaign(userID=user.userID, title="Bench", campaignLength="saga", currLevel=1)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(campaign)
+        db.session.commit()
+
+        print(f"{db.engine.dialect.name} database")
+        if db.engine.dialect.name == "sqlite":
+            print("SQLite cannot order RETURNING, so the set-based save inserts its questions one row at a time")
+
+        try:
+            for count in (45, args.questions):
+                payload = make_payload(count, campaign.campaignID)
+                assert validate_questions(payload) is None
+                print(f"\n{count} questions, {count * 4} answers, {args.latency_ms} ms per round trip")
+                measure("flush per row", save_questions_per_row, payload, args.latency_ms / 1000)
+                measure("set-based", save_questions, payload, args.latency_ms / 1000)
+        finally:
+            db.session.rollback()
+            db.session.delete(campaign)
+            db.session.delete(user)
+            db.session.commit()
+
+if __name__ == "__main__":
+    main()
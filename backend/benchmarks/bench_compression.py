@@ -0,0 +1,60 @@
+"""
+Shows the CPU versus bytes tradeoff of each compression setting on typical payloads.
+
+Usage:
+    python benchmarks/bench_compression.py [--repeat 50]
+"""
+import argparse
+import gzip
+import json
+import time
+
+from bench_json import make_bundle
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def make_questions(count):
+    # GET /questions/<campaignID> rows, without the answers
+    return [{key: value for key, value in question.items() if key != "answerList"} for question in make_bundle(count)]
+
+def make_spells():
+    # GET /stats/spells: the spell catalogue
+    elements = ["fire", "water", "earth", "air", "light", "shadow"]
+    return [{"spellID": i, "name": f"Spell of {elements[i % 6]} {i}", "element": elements[i % 6]} for i in range(60)]
+
+def settings():
+    for level in (1, 4, 6, 9):
+        yield f"gzip -{level}", lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            yield f"brotli q{quality}", lambda data, quality=quality: brotli.compress(data, quality=quality)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    if brotli is None:
+        print("brotli is not installed; showing gzip only")
+
+    payloads = {
+        "spells (60)": make_spells(),
+        "questions (100)": make_questions(100),
+        "bundle (100)": make_bundle(100),
+        "bundle (500)": make_bundle(500)
+    }
+    for label, payload in payloads.items():
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        print(f"\n{label}: {len(data) / 1024:.1f} KiB uncompressed")
+        for name, compress in settings():
+            size = len(compress(data))
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                compress(data)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f"  {name:<12} {size / 1024:>8.1f} KiB {size / len(data):>7.1%} {elapsed * 1e6:>9.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compares Flask's stdlib JSON provider with FastJSONProvider (and MessagePack) on realistic payloads.
+
+Usage:
+    python benchmarks/bench_json.py [--questions 500] [--repeat 200]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+import types
+from decimal import Decimal
+
+# Register app as a bare package so its modules load without app/__init__.py, which initialises Firebase
+app_package = types.ModuleType("app")
+app_package.__path__ = [os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))]
+sys.modules["app"] = app_package
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONProvider
+from app.negotiation import packb
+
+def make_bundle(count, seed=0):
+    # Shaped like GET /questions/<campaignID>/bundle: each question with its four answers
+    rng = random.Random(seed)
+    words = ["entropy", "enthalpy", "reaction", "catalyst", "equilibrium", "isotope", "molar", "titration"]
+    bundle = []
+    for question_id in range(1, count + 1):
+        correct = rng.randrange(4)
+        bundle.append({
+            "questionID": question_id,
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "questionStr": " ".join(rng.choices(words, k=rng.randint(8, 16))) + "?",
+            "gotCorrect": rng.random() < 0.5,
+            "wrongAttempts": rng.randint(0, 3),
+            "answerList": [
+                {
+                    "answerID": question_id * 4 + i,
+                    "answerStr": " ".join(rng.choices(words, k=rng.randint(2, 6))),
+                    "isCorrect": i == correct
+                } for i in range(4)
+            ]
+        })
+    return bundle
+
+def make_snapshot(count):
+    # Campaign and stats rows bring in the TIMESTAMP and Numeric(2, 1) columns
+    now = datetime.datetime(2025, 3, 14, 9, 26, 53)
+    return [
+        {
+            "campaignID": i,
+            "lastUpdated": now - datetime.timedelta(hours=i),
+            "attack": Decimal("2.5"),
+            "hp": 100,
+            "mana": 40
+        } for i in range(count)
+    ]
+
+def measure(name, encode, payload, repeat):
+    size = len(encode(payload))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode(payload)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed / repeat * 1e6:>9.1f} us/encode {size / 1024:>8.1f} KiB {size * repeat / elapsed / 1e6:>8.1f} MB/s")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    print(f"FastJSONProvider backend: {fast.name}")
+
+    for label, payload in (("bundle", make_bundle(args.questions)), ("snapshot", make_snapshot(args.questions))):
+        measure(f"stdlib  {label}", stdlib.dumps, payload, args.repeat)
+        measure(f"{fast.name:<7} {label}", fast.dumps, payload, args.repeat)
+        measure(f"msgpack {label}", lambda obj: packb(obj, fast.default), payload, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Add the resource_versions table behind conditional GETs
+
+Revision ID: 4e7b2d9c1a03
+Revises: 8c3f5a1e9b27
+Create Date: 2026-10-18 15:40:12.271845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '4e7b2d9c1a03'
+down_revision = '8c3f5a1e9b27'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('resource_versions',
+        sa.Column('scope', sa.String(length=63), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('scope')
+    )
+
+def downgrade():
+    op.drop_table('resource_versions')
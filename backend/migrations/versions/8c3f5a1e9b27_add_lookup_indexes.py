@@ -0,0 +1,33 @@
+"""Add indexes for the per-request foreign key lookups
+
+Revision ID: 8c3f5a1e9b27
+Revises: 2d519de3a00d
+Create Date: 2026-10-18 10:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8c3f5a1e9b27'
+down_revision = '2d519de3a00d'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_questions_campaign_difficulty_correct', 'questions', ['campaignID', 'difficulty', 'gotCorrect']),
+    ('ix_questions_campaign_correct', 'questions', ['campaignID', 'gotCorrect']),
+    ('ix_answers_question', 'answers', ['questionID', 'answerID']),
+    ('ix_achievements_campaign', 'achievements', ['campaignID']),
+    ('ix_campaign_user', 'campaign', ['userID', 'campaignID']),
+    ('ix_player_character_user', 'player_character', ['userID']),
+    ('ix_player_spells_player', 'player_spells', ['playerID', 'spellID']),
+]
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -61,7 +61,7 @@ def test_get_achievements(_, client):
        
         mock_query = MockAchievement.query
         mock_filter = mock_query.filter_by.return_value
-        mock_filter.all.return_value = [
+        mock_filter.order_by.return_value.limit.return_value.yield_per.return_value = [
             MagicMock(achievementID=1, title="Title 1", description="Desc 1"),
             MagicMock(achievementID=2, title="Title 2", description="Desc 2"),
         ]
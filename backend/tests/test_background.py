@@ -0,0 +1,70 @@
+import sys
+import os
+import threading
+from contextlib import closing
+from unittest.mock import MagicMock, patch
+import pytest
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+from app.background import BackgroundThreads, connect_sqlite
+
+def test_connect_sqlite_uses_wal(tmp_path):
+    with closing(connect_sqlite(str(tmp_path / "shared.sqlite3"), synchronous="FULL")) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+
+def test_threads_start_once_per_process():
+    started = threading.Semaphore(0)
+    pool = None
+
+    def target():
+        started.release()
+        pool.stopping.wait()
+
+    pool = BackgroundThreads("worker", target)
+    try:
+        pool.start(2)
+        assert started.acquire(timeout=5) and started.acquire(timeout=5)
+        assert [thread.name for thread in pool.threads] == ["worker-0", "worker-1"]
+        first = pool.threads
+
+        pool.ensure_started(2)
+        assert pool.threads is first
+
+        # A forked worker inherits the pool but none of its threads
+        with patch("app.background.os.getpid", return_value=os.getpid() + 1):
+            pool.ensure_started(2)
+        assert pool.threads is not first
+    finally:
+        pool.stop()
+    assert pool.threads == []
+
+def test_no_threads_for_a_zero_count():
+    pool = BackgroundThreads("worker", lambda: None)
+    pool.ensure_started(0)
+    assert pool.threads == []
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
@@ -89,7 +89,7 @@ def test_get_campaigns(mock_verify_token, client):
 
         # Mock the query behavior
         mock_query = MagicMock()
-        mock_query.filter_by.return_value.all.return_value = [mock_campaign]
+        mock_query.filter_by.return_value.order_by.return_value.limit.return_value.yield_per.return_value = [mock_campaign]
         mock_campaign_class.query = mock_query
 
         # Make request
@@ -27,18 +27,19 @@ os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
 os_getenv_patcher.start()
 
 @pytest.fixture
-def app():
+def app(tmp_path):
     # Patch verify_firebase_token before importing create_app
     with patch('app.routes.characters.verify_firebase_token', return_value={"uid": "test_user_id"}), \
          patch('app.firebase_auth.verify_firebase_token', return_value={"uid": "test_user_id"}):
 
         from app import create_app
-        app = create_app()
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
         app.config["TESTING"] = True
 
         # Enter app context before patching User.query
         with app.app_context(), \
              patch('app.routes.characters.db') as mock_db, \
+             patch('app.extensions.resource_versions.current', return_value=0), \
              patch('app.models.User.query') as mock_user_query:
             
             # Mock User.query.filter_by().first() to return a dummy user
@@ -0,0 +1,108 @@
+import sys
+import os
+import gzip
+import pytest
+from unittest.mock import patch
+from flask import Flask, Response, jsonify, stream_with_context
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.compression import Compressor
+
+LARGE = [{"questionID": i, "questionStr": "Which gas law relates pressure and volume?"} for i in range(100)]
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(COMPRESSION_MIN_SIZE=256, COMPRESSION_GZIP_LEVEL=5)
+    Compressor().init_app(app)
+
+    @app.route("/large")
+    def large():
+        return jsonify(LARGE)
+
+    @app.route("/small")
+    def small():
+        return jsonify({"message": "ok"})
+
+    @app.route("/image")
+    def image():
+        return Response(b"\x89PNG" * 1000, mimetype="image/png")
+
+    @app.route("/stream")
+    def stream():
+        return Response(stream_with_context(iter(["[", "1,2,3" * 200, "]"])), mimetype="application/json")
+
+    @app.route("/stream/empty")
+    def empty_stream():
+        return Response(stream_with_context(iter(["[", "]"])), mimetype="application/json")
+
+    @app.route("/stream/sized")
+    def sized_stream():
+        return Response(iter([b"[1]"]), mimetype="application/json", headers={"Content-Length": "3"})
+
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+def test_large_json_is_gzipped(app, client):
+    response = client.get("/large", headers=GZIP)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    plain = client.get("/large").data
+    assert gzip.decompress(response.data) == plain
+    assert len(response.data) < len(plain) / 5
+    assert app.extensions["compressor"].gzip_level == 5
+
+def test_identical_bodies_compress_identically(client):
+    assert client.get("/large", headers=GZIP).data == client.get("/large", headers=GZIP).data
+
+def test_small_responses_are_left_alone(client):
+    response = client.get("/small", headers=GZIP)
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == {"message": "ok"}
+
+def test_other_content_types_are_left_alone(client):
+    response = client.get("/image", headers=GZIP)
+    assert "Content-Encoding" not in response.headers
+
+@pytest.mark.parametrize("accept", [None, "identity", "gzip;q=0", "deflate"])
+def test_clients_without_gzip_get_plain_bodies(client, accept):
+    response = client.get("/large", headers={"Accept-Encoding": accept} if accept else {})
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == LARGE
+
+def test_streamed_responses_are_compressed_incrementally(client):
+    response = client.get("/stream", headers=GZIP)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.data) == b"[" + b"1,2,3" * 200 + b"]"
+
+@pytest.mark.parametrize("path,body", [("/stream/empty", b"[]"), ("/stream/sized", b"[1]")])
+def test_small_streamed_responses_are_left_alone(client, path, body):
+    response = client.get(path, headers=GZIP)
+    assert "Content-Encoding" not in response.headers
+    assert response.data == body
+
+def test_brotli_preferred_when_available(client):
+    class FakeBrotli:
+        @staticmethod
+        def compress(data, quality):
+            return b"br:" + data[:10]
+
+    with patch("app.compression.brotli", FakeBrotli):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["Content-Encoding"] == "br"
+        assert response.data.startswith(b"br:")
+
+        response = client.get("/large", headers=GZIP)
+        assert response.headers["Content-Encoding"] == "gzip"
+
+if __name__ == '__main__':
+    pytest.main()
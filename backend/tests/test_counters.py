@@ -0,0 +1,152 @@
+import sys
+import os
+import threading
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+HEADERS = {"Authorization": "Bearer test-token"}
+
+@pytest.fixture
+def app(tmp_path):
+    # A file database, so threads get connections of their own
+    from app import create_app
+    from app.config import Config
+    from app.extensions import db, known_users
+    from app.models import User, Campaign, Question, PlayerStats
+
+    with patch.object(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'counters.db'}"):
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(userID="player1", screenName="Player One"),
+            Campaign(campaignID=1, userID="player1", title="Mine", campaignLength="quest", currLevel=1),
+            PlayerStats(campaignID=1, attack=Decimal("1.0"), mana=70),
+            Question(questionID=1, campaignID=1, difficulty="easy", questionStr="Q?", gotCorrect=False, wrongAttempts=0)
+        ])
+        db.session.commit()
+        known_users.add("player1", "Player One")
+
+        with patch('app.firebase_auth.decode_token', return_value={"uid": "player1"}):
+            yield app
+
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def statements(app):
+    from app.extensions import db
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(db.engine, "before_cursor_execute", record)
+
+def test_least_compiles_per_dialect():
+    from app.counters import least
+    from app.models import PlayerStats
+    expression = select(least(PlayerStats.mana + 5, 100))
+    assert "least(" in str(expression.compile(dialect=postgresql.dialect())).lower()
+    assert "min(" in str(expression.compile(dialect=sqlite.dialect()))
+
+def test_increment_is_one_statement(app, statements):
+    from app.counters import increment
+    from app.models import Question
+    assert increment(Question.wrongAttempts, 1) == 1
+    assert increment(Question.wrongAttempts, 1, amount=2) == 3
+    assert len(statements) == 2
+    assert all(s.startswith("UPDATE questions") and "RETURNING" in s for s in statements)
+
+def test_increment_caps_at_maximum(app):
+    from app.counters import increment
+    from app.models import PlayerStats
+    assert increment(PlayerStats.mana, 1, 20, maximum=100) == 90
+    assert increment(PlayerStats.mana, 1, 20, maximum=100) == 100
+
+def test_increment_missing_row(app):
+    from app.counters import increment
+    from app.models import Question
+    assert increment(Question.wrongAttempts, 999) is None
+
+def test_routes_use_single_updates(app, statements):
+    client = app.test_client()
+    response = client.put("/questions/wrong_attempt/1", headers=HEADERS)
+    assert response.get_json()["wrongAttempts"] == 1
+
+    response = client.put("/questions/answer/1", json={"gotCorrect": False}, headers=HEADERS)
+    assert response.status_code == 200
+    response = client.put("/questions/answer/1", json={"gotCorrect": True}, headers=HEADERS)
+    assert response.status_code == 200
+
+    response = client.patch("/stats/replenish_mana/1", json={"manaAmount": 50}, headers=HEADERS)
+    assert response.get_json() == {"message": "Mana replenished successfully", "newMana": 100}
+
+    assert not any(s.startswith("SELECT") and ("questions" in s or "player_stats" in s) for s in statements)
+
+    from app.extensions import db
+    from app.models import Question
+    question = db.session.get(Question, 1)
+    assert (question.wrongAttempts, question.gotCorrect) == (2, True)
+
+@pytest.mark.parametrize("payload", [{"manaAmount": "10"}, {"manaAmount": True}])
+def test_replenish_mana_rejects_non_integers(app, payload):
+    response = app.test_client().patch("/stats/replenish_mana/1", json=payload, headers=HEADERS)
+    assert response.status_code == 400
+
+def test_answer_missing_question(app):
+    response = app.test_client().put("/questions/answer/999", json={"gotCorrect": True}, headers=HEADERS)
+    assert response.status_code == 404
+
+def test_concurrent_increments_are_not_lost(app):
+    from app.counters import increment
+    from app.extensions import db
+    from app.models import Question
+
+    def worker():
+        with app.app_context():
+            for _ in range(25):
+                increment(Question.wrongAttempts, 1)
+                db.session.commit()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db.session.expire_all()
+    assert db.session.get(Question, 1).wrongAttempts == 100
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
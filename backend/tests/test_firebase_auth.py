@@ -12,10 +12,10 @@ sys.modules["firebase_admin.auth"] = MagicMock()
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 @pytest.fixture
-def app():
+def app(tmp_path):
     os.environ["DATABASE_URL"] = "sqlite:///:memory:"
     from app import create_app
-    app = create_app()
+    app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
     app.config["TESTING"] = True
     with app.app_context():
         from app.extensions import db
@@ -35,7 +35,7 @@ def test_verify_firebase_token_valid(app):
          patch('app.models.User.query') as mock_query:
         mock_user = MagicMock()
         mock_user.userID = "test_user"  # Set attribute directly
-        mock_query.filter_by.return_value.first.return_value = mock_user
+        mock_query.with_entities.return_value.filter_by.return_value.first.return_value = mock_user
         decorated = verify_firebase_token(dummy_func)
         result = decorated()
         assert result == {"uid": "test_user"}
@@ -71,11 +71,128 @@ def test_verify_firebase_token_user_not_found(app):
     with app.test_request_context(headers={"Authorization": "Bearer valid-token"}), \
          patch('firebase_admin.auth.verify_id_token', return_value={"uid": "test_user"}), \
          patch('app.models.User.query') as mock_query:
-        mock_query.filter_by.return_value.first.return_value = None
+        mock_query.with_entities.return_value.filter_by.return_value.first.return_value = None
         decorated = verify_firebase_token(dummy_func)
         response = decorated()
         assert response[1] == 403
         assert response[0].get_json() == {"error": "User not registered"}
 
+def test_verify_firebase_token_local_verifier(app):
+    from app.firebase_auth import verify_firebase_token
+    def dummy_func(user, *args, **kwargs):
+        return {"uid": user.userID}
+
+    with app.test_request_context(headers={"Authorization": "Bearer valid-token"}), \
+         patch('app.firebase_auth.token_verifier') as mock_verifier, \
+         patch('firebase_admin.auth.verify_id_token') as mock_firebase_verify, \
+         patch('app.models.User.query') as mock_query:
+        mock_verifier.enabled = True
+        mock_verifier.verify.return_value = {"uid": "test_user"}
+        mock_user = MagicMock()
+        mock_user.userID = "test_user"
+        mock_query.with_entities.return_value.filter_by.return_value.first.return_value = mock_user
+        decorated = verify_firebase_token(dummy_func)
+        result = decorated()
+        assert result == {"uid": "test_user"}
+        mock_verifier.verify.assert_called_once_with("valid-token")
+        mock_firebase_verify.assert_not_called()
+
+def test_verify_firebase_token_cache_hit(app):
+    import time
+    from app.extensions import db
+    from app.models import User
+    from app.firebase_auth import verify_firebase_token
+    def dummy_func(user, *args, **kwargs):
+        return {"uid": user.userID, "screenName": user.screenName}
+
+    db.session.add(User(userID="cached_user", screenName="Cached"))
+    db.session.commit()
+
+    decoded = {"uid": "cached_user", "exp": int(time.time()) + 3600}
+    decorated = verify_firebase_token(dummy_func)
+    with patch('app.firebase_auth.decode_token', return_value=decoded) as mock_verify:
+        for _ in range(2):
+            with app.test_request_context(headers={"Authorization": "Bearer cached-token"}):
+                assert decorated() == {"uid": "cached_user", "screenName": "Cached"}
+            db.session.remove()
+        mock_verify.assert_called_once()
+
+def test_delete_user_invalidates_cached_token(app):
+    import time
+    from app.extensions import db, token_cache
+    from app.models import User
+
+    db.session.add(User(userID="doomed_user", screenName="Doomed"))
+    db.session.commit()
+
+    decoded = {"uid": "doomed_user", "exp": int(time.time()) + 3600}
+    client = app.test_client()
+    with patch('app.firebase_auth.decode_token', return_value=decoded):
+        response = client.get("/users/doomed_user", headers={"Authorization": "Bearer doomed-token"})
+        assert response.status_code == 200
+        assert token_cache.get("doomed-token") is not None
+
+        response = client.delete("/users/doomed_user", headers={"Authorization": "Bearer doomed-token"})
+        assert response.status_code == 200
+        assert token_cache.get("doomed-token") is None
+
+        response = client.get("/users/doomed_user", headers={"Authorization": "Bearer doomed-token"})
+        assert response.status_code == 403
+        assert response.get_json() == {"error": "User not registered"}
+
+def test_user_deleted_by_another_worker_is_rejected_after_expiry(app):
+    import time
+    from app.extensions import db, token_cache, known_users
+    from app.models import User
+
+    db.session.add(User(userID="gone_user", screenName="Gone"))
+    db.session.commit()
+
+    decoded = {"uid": "gone_user", "exp": int(time.time()) + 3600}
+    client = app.test_client()
+    with patch('app.firebase_auth.decode_token', return_value=decoded):
+        assert client.get("/users/gone_user", headers={"Authorization": "Bearer gone-token"}).status_code == 200
+
+        # Deleted through another worker: this worker's caches are never told
+        User.query.filter_by(userID="gone_user").delete()
+        db.session.commit()
+
+        later = time.time() + max(token_cache.max_ttl, known_users.ttl) + 1
+        with patch('app.token_cache.time.time', return_value=later):
+            response = client.get("/users/gone_user", headers={"Authorization": "Bearer gone-token"})
+        assert response.status_code == 403
+        assert response.get_json() == {"error": "User not registered"}
+
+def test_verify_firebase_token_known_user_skips_query(app):
+    from app.extensions import known_users
+    from app.firebase_auth import verify_firebase_token
+    def dummy_func(user, *args, **kwargs):
+        return {"uid": user.userID, "screenName": user.screenName}
+
+    known_users.add("known_user", "Known")
+    with app.test_request_context(headers={"Authorization": "Bearer valid-token"}), \
+         patch('app.firebase_auth.decode_token', return_value={"uid": "known_user"}), \
+         patch('app.models.User.query') as mock_query:
+        decorated = verify_firebase_token(dummy_func)
+        assert decorated() == {"uid": "known_user", "screenName": "Known"}
+        mock_query.with_entities.assert_not_called()
+
+def test_resolve_principal_builds_slotted_principal(app):
+    from app.extensions import db
+    from app.models import User
+    from app.principal import Principal
+    from app.firebase_auth import resolve_principal
+
+    db.session.add(User(userID="lazy_user", screenName="Lazy"))
+    db.session.commit()
+    db.session.expunge_all()
+
+    principal = resolve_principal("lazy_user")
+    assert isinstance(principal, Principal)
+    assert not hasattr(principal, "__dict__")
+    assert principal.screenName == "Lazy"
+    assert principal.userID == "lazy_user"
+    assert resolve_principal("missing_user") is None
+
 if __name__ == '__main__':
     pytest.main()
\ No newline at end of file
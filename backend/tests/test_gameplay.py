@@ -0,0 +1,173 @@
+import sys
+import os
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+import pytest
+from sqlalchemy import event
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+HEADERS = {"Authorization": "Bearer test-token"}
+
+@pytest.fixture
+def app(tmp_path):
+    from app import create_app
+    from app.config import Config
+    from app.extensions import db, known_users
+    from app.models import User, Campaign, Question, PlayerStats
+
+    with patch.object(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://"):
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(userID="player1", screenName="Player One"),
+            User(userID="player2", screenName="Player Two"),
+            Campaign(campaignID=1, userID="player1", title="Mine", campaignLength="quest", currLevel=1),
+            Campaign(campaignID=2, userID="player2", title="Theirs", campaignLength="quest", currLevel=1),
+            PlayerStats(campaignID=1, attack=Decimal("1.0"), hp=100, mana=70, affinity="fire"),
+            PlayerStats(campaignID=2, attack=Decimal("1.0"), hp=100, mana=0)
+        ])
+        for questionID, campaignID in [(1, 1), (2, 1), (3, 1), (4, 2)]:
+            db.session.add(Question(
+                questionID=questionID, campaignID=campaignID, difficulty="easy",
+                questionStr=f"Question {questionID}?", gotCorrect=False, wrongAttempts=0
+            ))
+        db.session.commit()
+        known_users.add("player1", "Player One")
+
+        with patch('app.firebase_auth.decode_token', return_value={"uid": "player1"}):
+            yield app
+
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def statements(app):
+    from app.extensions import db
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(db.engine, "before_cursor_execute", record)
+
+def post_events(client, events, campaign_id=1):
+    return client.post(f"/campaigns/{campaign_id}/events", json={"events": events}, headers=HEADERS)
+
+def test_events_are_applied_in_two_updates(client, statements):
+    response = post_events(client, [
+        {"type": "wrongAttempt", "questionID": 1},
+        {"type": "answer", "questionID": 1, "gotCorrect": False},
+        {"type": "answer", "questionID": 1, "gotCorrect": True},
+        {"type": "answer", "questionID": 2, "gotCorrect": True},
+        {"type": "wrongAttempt", "questionID": 3},
+        {"type": "replenishMana", "manaAmount": 10},
+        {"type": "updateStats", "hp": 80, "attack": 2.5, "affinity": "water"}
+    ])
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "questions": [
+            {"questionID": 1, "gotCorrect": True, "wrongAttempts": 2},
+            {"questionID": 2, "gotCorrect": True, "wrongAttempts": 0},
+            {"questionID": 3, "gotCorrect": False, "wrongAttempts": 1}
+        ],
+        "stats": {"campaignID": 1, "attack": "2.5", "hp": 80, "mana": 80, "affinity": "water"}
+    }
+    updates = [s for s in statements if s.startswith("UPDATE")]
+    assert len(updates) == 2
+    assert not any(s.startswith("SELECT") and ("questions" in s or "player_stats" in s) for s in statements)
+
+@pytest.mark.parametrize("events,mana", [
+    ([{"type": "replenishMana", "manaAmount": 20}, {"type": "replenishMana", "manaAmount": 20}], 100),
+    ([{"type": "replenishMana", "manaAmount": 20}, {"type": "updateStats", "mana": 10}], 10),
+    ([{"type": "updateStats", "mana": 10}, {"type": "replenishMana", "manaAmount": 5}], 15),
+    ([{"type": "updateStats", "mana": 90}, {"type": "replenishMana", "manaAmount": 50}], 100),
+    ([{"type": "updateStats", "mana": 150}], 150)
+])
+def test_stats_events_keep_their_order(client, events, mana):
+    response = post_events(client, events)
+    assert response.get_json()["stats"]["mana"] == mana
+
+def test_questions_outside_the_campaign_roll_back(app, client):
+    response = post_events(client, [
+        {"type": "wrongAttempt", "questionID": 1},
+        {"type": "wrongAttempt", "questionID": 4}
+    ])
+    assert response.status_code == 404
+    assert "[4]" in response.get_json()["error"]
+
+    from app.extensions import db
+    from app.models import Question
+    db.session.expire_all()
+    assert db.session.get(Question, 1).wrongAttempts == 0
+
+@pytest.mark.parametrize("bad_event", [
+    {"type": "teleport"},
+    {"type": [1]},
+    {"type": {"kind": "answer"}},
+    {"type": "wrongAttempt", "questionID": [1]},
+    {"type": "answer", "questionID": {"id": 1}, "gotCorrect": True},
+    {"type": "replenishMana", "manaAmount": [5]},
+    {"type": "updateStats", "attack": [2]},
+    {"type": "updateStats", "hp": {"value": 1}},
+    {"type": "updateStats", "affinity": ["fire"]},
+    {"type": "wrongAttempt"},
+    {"type": "answer", "questionID": 1},
+    {"type": "replenishMana", "manaAmount": -5},
+    {"type": "updateStats", "attack": 9},
+    {"type": "updateStats", "hp": "full"},
+    {"type": "updateStats", "affinity": "lightning"},
+    "wrongAttempt"
+])
+def test_invalid_events_are_rejected_before_any_update(client, statements, bad_event):
+    response = post_events(client, [{"type": "wrongAttempt", "questionID": 1}, bad_event])
+    assert response.status_code == 400
+    assert not any(s.startswith("UPDATE") for s in statements)
+
+@pytest.mark.parametrize("body", [{}, {"events": []}, {"events": "wrongAttempt"}, []])
+def test_events_list_is_required(client, body):
+    response = client.post("/campaigns/1/events", json=body, headers=HEADERS)
+    assert response.status_code == 400
+
+def test_batch_size_is_capped(app, client):
+    app.config["GAMEPLAY_MAX_EVENTS"] = 2
+    response = post_events(client, [{"type": "wrongAttempt", "questionID": 1}] * 3)
+    assert response.status_code == 400
+
+def test_other_players_campaigns_are_not_found(client):
+    response = post_events(client, [{"type": "wrongAttempt", "questionID": 4}], campaign_id=2)
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Campaign not found"}
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,205 @@
+import sys
+import os
+import time
+from unittest.mock import MagicMock, patch
+import pytest
+from flask import Flask
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+from app.jobs import JobQueue, JobLimitError, PermanentJobError
+
+@pytest.fixture
+def queue(tmp_path):
+    app = Flask(__name__)
+    app.config["JOB_DB_PATH"] = str(tmp_path / "jobs.sqlite3")
+    app.config["JOB_WORKERS"] = 0  # Jobs are run explicitly with run_pending()
+    app.config["JOB_RETRY_BACKOFF"] = 0
+    queue = JobQueue()
+    queue.init_app(app)
+    return queue
+
+def test_enqueue_and_run(queue):
+    def handler(job):
+        job.progress(50, "halfway")
+        return {"echo": job.params["value"], "size": len(job.payload)}
+
+    queue.register("echo", handler)
+    job_id = queue.enqueue("echo", "user1", {"value": 42}, payload=b"pdf-bytes")
+    assert queue.get(job_id)["status"] == "queued"
+
+    assert queue.run_pending() is True
+    job = queue.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["progress"] == 100
+    assert job["attempts"] == 1
+    assert job["result"] == {"echo": 42, "size": 9}
+    assert queue.run_pending() is False
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.enqueue("missing", "user1", {})
+
+def test_failed_job_is_retried_with_backoff(queue):
+    queue.backoff = 10
+    handler = MagicMock(side_effect=[Exception("LLM timeout"), {"ok": True}])
+    queue.register("flaky", handler)
+    job_id = queue.enqueue("flaky", "user1", {})
+
+    queue.run_pending()
+    job = queue.get(job_id)
+    assert job["status"] == "queued"
+    assert job["stage"] == "retrying"
+    assert job["error"] == "LLM timeout"
+    assert job["runAfter"] >= time.time() + 7
+
+    # Not due yet
+    assert queue.run_pending() is False
+
+    with patch('app.jobs.time.time', return_value=time.time() + 20):
+        assert queue.run_pending() is True
+    job = queue.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+
+def test_job_fails_after_max_attempts(queue):
+    queue.max_attempts = 2
+    queue.register("broken", MagicMock(side_effect=Exception("boom")))
+    job_id = queue.enqueue("broken", "user1", {})
+
+    queue.run_pending()
+    queue.run_pending()
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 2
+    assert job["error"] == "boom"
+
+def test_permanent_error_is_not_retried(queue):
+    queue.register("invalid", MagicMock(side_effect=PermanentJobError("bad input")))
+    job_id = queue.enqueue("invalid", "user1", {})
+
+    queue.run_pending()
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1
+
+def test_per_user_limit(queue):
+    queue.max_active_per_user = 2
+    queue.register("echo", MagicMock(return_value={}))
+    queue.enqueue("echo", "user1", {})
+    queue.enqueue("echo", "user1", {})
+    with pytest.raises(JobLimitError):
+        queue.enqueue("echo", "user1", {})
+    queue.enqueue("echo", "user2", {})
+
+    queue.run_pending()
+    queue.enqueue("echo", "user1", {})
+
+def test_global_running_limit(queue):
+    queue.max_running = 1
+    queue.register("echo", MagicMock(return_value={}))
+    first = queue.enqueue("echo", "user1", {})
+    queue.enqueue("echo", "user2", {})
+
+    assert queue._claim()["jobID"] == first
+    assert queue._claim() is None
+
+def test_stale_running_job_is_reclaimed(queue):
+    queue.register("echo", MagicMock(return_value={"ok": True}))
+    job_id = queue.enqueue("echo", "user1", {})
+    queue._claim()  # Worker claims the job and then dies
+
+    assert queue.run_pending() is False
+    with patch('app.jobs.time.time', return_value=time.time() + queue.lease + 1):
+        assert queue.run_pending() is True
+    job = queue.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+
+def test_lease_is_renewed_while_the_handler_runs(queue):
+    queue.lease = 0.3
+
+    def slow_handler(job):
+        # Runs past the lease without reporting progress; nobody else may claim it meanwhile
+        time.sleep(queue.lease * 3)
+        assert queue._claim() is None
+        return {"ok": True}
+
+    queue.register("slow", slow_handler)
+    job_id = queue.enqueue("slow", "user1", {})
+    assert queue.run_pending() is True
+    job = queue.get(job_id)
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+
+def test_worker_threads_process_jobs(queue):
+    queue.workers = 1
+    queue.poll_interval = 0.01
+    queue.register("echo", MagicMock(return_value={"ok": True}))
+    job_id = queue.enqueue("echo", "user1", {})
+    try:
+        deadline = time.time() + 5
+        while queue.get(job_id)["status"] != "succeeded" and time.time() < deadline:
+            time.sleep(0.01)
+        assert queue.get(job_id)["status"] == "succeeded"
+    finally:
+        queue.stop()
+
+def test_pool_starts_with_the_app(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    handler = MagicMock(return_value={"ok": True})
+
+    # Queued by a process that has since been restarted
+    app = Flask(__name__)
+    app.config.update(JOB_DB_PATH=path, JOB_WORKERS=0)
+    previous = JobQueue()
+    previous.init_app(app)
+    previous.register("echo", handler)
+    job_id = previous.enqueue("echo", "user1", {})
+
+    app = Flask(__name__)
+    app.config.update(JOB_DB_PATH=path, JOB_WORKERS=1)
+    restarted = JobQueue(poll_interval=0.01)
+    restarted.register("echo", handler)
+    restarted.init_app(app)
+    try:
+        deadline = time.time() + 5
+        while restarted.get(job_id)["status"] != "succeeded" and time.time() < deadline:
+            time.sleep(0.01)
+        assert restarted.get(job_id)["status"] == "succeeded"
+    finally:
+        restarted.stop()
+
+def test_testing_app_starts_no_workers(tmp_path):
+    app = Flask(__name__, instance_path=str(tmp_path / "instance"))
+    app.config.update(TESTING=True, JOB_WORKERS=2)
+    queue = JobQueue()
+    queue.init_app(app)
+    # Without JOB_DB_PATH the queue lives in the app's instance folder, not a shared temp dir
+    assert queue.path == str(tmp_path / "instance" / "jobs.sqlite3")
+    assert queue.workers == 0
+    assert queue._workers.threads == []
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
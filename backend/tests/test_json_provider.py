@@ -0,0 +1,92 @@
+import sys
+import os
+import json
+import datetime
+from decimal import Decimal
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.json_provider import FastJSONProvider, http_date
+from werkzeug.http import http_date as werkzeug_http_date
+
+PAYLOAD = {
+    "playerID": 7,
+    "attack": Decimal("2.5"),
+    "lastUpdated": datetime.datetime(2025, 3, 14, 9, 26, 53),
+    "dueDate": datetime.date(2025, 3, 14),
+    "questionStr": "Which of these is 'Ångström'?",
+    "answers": [{"isCorrect": True, "answerStr": None}]
+}
+
+def make_app(backend="orjson", debug=False):
+    app = Flask(__name__)
+    app.config["JSON_BACKEND"] = backend
+    app.debug = debug
+    app.json = FastJSONProvider(app)
+    return app
+
+def test_uses_orjson_by_default():
+    assert make_app().json.name == "orjson"
+    assert make_app("stdlib").json.name == "stdlib"
+
+def test_dumps_matches_stdlib_provider():
+    app = make_app()
+    encoded = app.json.dumps(PAYLOAD)
+    assert json.loads(encoded) == json.loads(DefaultJSONProvider(app).dumps(PAYLOAD))
+    assert '"attack":"2.5"' in encoded
+    assert '"lastUpdated":"Fri, 14 Mar 2025 09:26:53 GMT"' in encoded
+
+@pytest.mark.parametrize("value", [
+    datetime.datetime(2025, 3, 14, 9, 26, 53),
+    datetime.datetime(2025, 1, 1, 0, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=5))),
+    datetime.datetime(1999, 12, 31, 23, 59, 59, 999999),
+    datetime.date(2024, 2, 29)
+])
+def test_http_date_matches_werkzeug(value):
+    assert http_date(value) == werkzeug_http_date(value)
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        make_app().json.dumps({"value": object()})
+
+def test_keys_stay_sorted():
+    assert make_app().json.dumps({"b": 1, "a": 2}) == '{"a":2,"b":1}'
+
+def test_integer_keys_are_allowed():
+    assert make_app().json.dumps({2: "b", 1: "a"}) == '{"1":"a","2":"b"}'
+
+def test_response_matches_stdlib_provider():
+    app = make_app()
+    with app.app_context():
+        response = app.json.response(PAYLOAD)
+    assert response.mimetype == "application/json"
+    assert response.get_data().endswith(b"\n")
+    assert json.loads(response.get_data()) == json.loads(DefaultJSONProvider(app).dumps(PAYLOAD))
+
+def test_debug_responses_are_indented():
+    app = make_app(debug=True)
+    with app.app_context():
+        assert b'\n  "a": 1' in app.json.response({"a": 1}).get_data()
+
+def test_stdlib_arguments_fall_back():
+    app = make_app()
+    assert app.json.dumps({"a": 1}, indent=4) == '{\n    "a": 1\n}'
+
+def test_loads():
+    app = make_app()
+    assert app.json.loads(b'{"a": [1, 2.5, "x"]}') == {"a": [1, 2.5, "x"]}
+    with pytest.raises(ValueError):
+        app.json.loads("{not json")
+
+def test_request_json_is_parsed():
+    app = make_app()
+    with app.test_request_context("/", method="POST", data='{"attack": 2.5}', content_type="application/json"):
+        from flask import request
+        assert request.get_json() == {"attack": 2.5}
+
+if __name__ == '__main__':
+    pytest.main()
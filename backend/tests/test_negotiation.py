@@ -0,0 +1,69 @@
+import sys
+import os
+import datetime
+from decimal import Decimal
+import pytest
+import msgpack
+from flask import Flask, jsonify
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.json_provider import FastJSONProvider
+from app.streaming import streamed_json
+
+STATS = {"attack": Decimal("2.5"), "lastUpdated": datetime.datetime(2025, 3, 14, 9, 26, 53), "hp": 100}
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    @app.route("/stats")
+    def stats():
+        return jsonify(STATS)
+
+    @app.route("/missing")
+    def missing():
+        return jsonify({"error": "Not found"}), 404
+
+    @app.route("/list")
+    def listing():
+        return streamed_json(iter(range(3)), lambda i: {"id": i}, headers={"X-Next-Cursor": "abc"})
+
+    return app.test_client()
+
+@pytest.mark.parametrize("accept", [None, "*/*", "application/json", "application/json, application/msgpack;q=0.5"])
+def test_json_by_default(client, accept):
+    response = client.get("/stats", headers={"Accept": accept} if accept else {})
+    assert response.mimetype == "application/json"
+    assert response.get_json() == {"attack": "2.5", "lastUpdated": "Fri, 14 Mar 2025 09:26:53 GMT", "hp": 100}
+    assert "Accept" in response.headers["Vary"]
+
+@pytest.mark.parametrize("accept", ["application/msgpack", "application/x-msgpack", "application/msgpack, application/json;q=0.5"])
+def test_msgpack_when_preferred(client, accept):
+    response = client.get("/stats", headers={"Accept": accept})
+    assert response.mimetype == "application/msgpack"
+    assert msgpack.unpackb(response.data) == client.get("/stats").get_json()
+    assert "Accept" in response.headers["Vary"]
+
+def test_msgpack_is_smaller(client):
+    json_size = len(client.get("/stats").data)
+    assert len(client.get("/stats", headers={"Accept": "application/msgpack"}).data) < json_size
+
+def test_msgpack_keeps_status(client):
+    response = client.get("/missing", headers={"Accept": "application/msgpack"})
+    assert response.status_code == 404
+    assert msgpack.unpackb(response.data) == {"error": "Not found"}
+
+def test_streamed_list_negotiates(client):
+    response = client.get("/list")
+    assert response.get_json() == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+    response = client.get("/list", headers={"Accept": "application/msgpack"})
+    assert response.mimetype == "application/msgpack"
+    assert msgpack.unpackb(response.data) == [{"id": 0}, {"id": 1}, {"id": 2}]
+    assert response.headers["X-Next-Cursor"] == "abc"
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,96 @@
+import sys
+import os
+from unittest.mock import MagicMock
+import pytest
+from flask import Flask
+from sqlalchemy import Integer, column
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.pagination import encode_cursor, decode_cursor, page_size, paginate, paginate_stream, PaginationError
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(PAGE_SIZE_DEFAULT=2, PAGE_SIZE_MAX=3)
+    return app
+
+@pytest.mark.parametrize("key", [0, 42, "user-abc", ""])
+def test_cursor_round_trip(key):
+    token = encode_cursor(key)
+    assert "=" not in token
+    assert decode_cursor(token) == key
+
+@pytest.mark.parametrize("token", ["???", "bm90IGpzb24", encode_cursor(None), encode_cursor(True)])
+def test_decode_cursor_rejects_garbage(token):
+    with pytest.raises(PaginationError):
+        decode_cursor(token)
+
+@pytest.mark.parametrize("key,key_type", [("x", int), (7, str)])
+def test_decode_cursor_rejects_wrong_key_type(key, key_type):
+    with pytest.raises(PaginationError):
+        decode_cursor(encode_cursor(key), key_type)
+
+@pytest.mark.parametrize("paginator", [paginate, paginate_stream])
+def test_paginate_rejects_cursor_of_wrong_type(app, paginator):
+    query = MagicMock()
+    with app.test_request_context(f"/?after={encode_cursor('x')}"):
+        with pytest.raises(PaginationError):
+            paginator(query, column("itemID", Integer))
+    query.filter.assert_not_called()
+
+def test_page_size(app):
+    with app.test_request_context("/"):
+        assert page_size() == 2
+    with app.test_request_context("/?limit=1"):
+        assert page_size() == 1
+    with app.test_request_context("/?limit=50"):
+        assert page_size() == 3
+
+def test_paginate_fetches_one_extra_row(app):
+    query = MagicMock()
+    key_column = column("itemID")
+    query.order_by.return_value.limit.return_value.all.return_value = [
+        MagicMock(itemID=1), MagicMock(itemID=2), MagicMock(itemID=3)
+    ]
+    with app.test_request_context("/"):
+        rows, next_cursor = paginate(query, key_column)
+    query.order_by.assert_called_once_with(key_column)
+    query.order_by.return_value.limit.assert_called_once_with(3)
+    assert [row.itemID for row in rows] == [1, 2]
+    assert decode_cursor(next_cursor) == 2
+
+def test_paginate_last_page_has_no_cursor(app):
+    query = MagicMock()
+    query.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [MagicMock(itemID=5)]
+    with app.test_request_context(f"/?after={encode_cursor(4)}"):
+        rows, next_cursor = paginate(query, column("itemID"))
+    (condition,), _ = query.filter.call_args
+    assert str(condition) == '"itemID" > :itemID_1' and condition.right.value == 4
+    assert len(rows) == 1
+    assert next_cursor is None
+
+def test_paginate_stream_reads_cursor_from_keys(app):
+    query = MagicMock()
+    key_column = column("itemID")
+    keys = query.with_entities.return_value.order_by.return_value.offset.return_value.limit.return_value
+    keys.all.return_value = [(2,), (3,)]
+    with app.test_request_context("/"):
+        rows, next_cursor = paginate_stream(query, key_column)
+    query.with_entities.assert_called_once_with(key_column)
+    query.with_entities.return_value.order_by.return_value.offset.assert_called_once_with(1)
+    query.order_by.return_value.limit.assert_called_once_with(2)
+    assert rows is query.order_by.return_value.limit.return_value.yield_per.return_value
+    assert decode_cursor(next_cursor) == 2
+
+def test_paginate_stream_last_page_has_no_cursor(app):
+    query = MagicMock()
+    keys = query.with_entities.return_value.order_by.return_value.offset.return_value.limit.return_value
+    keys.all.return_value = [(5,)]
+    with app.test_request_context("/"):
+        _, next_cursor = paginate_stream(query, column("itemID"))
+    assert next_cursor is None
+
+if __name__ == '__main__':
+    pytest.main()
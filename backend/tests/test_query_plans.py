@@ -0,0 +1,122 @@
+import sys
+import os
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+import pytest
+from sqlalchemy import event
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+@pytest.fixture
+def app(tmp_path):
+    # Query plans need a real database; SQLite has no statistics, so plans depend only on the indexes
+    from app import create_app
+    from app.config import Config
+    from app.extensions import db, known_users
+    from app.models import (
+        User, PlayerCharacter, Campaign, Question, Answer, PlayerStats, Spell, PlayerSpells, Achievement
+    )
+
+    with patch.object(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://"):
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(userID="player1", screenName="Player One"),
+            PlayerCharacter(characterID=1, userID="player1", modelID=1),
+            Campaign(campaignID=1, userID="player1", title="Mine", campaignLength="quest", currLevel=1),
+            PlayerStats(campaignID=1, attack=Decimal("1.0")),
+            Spell(spellID=1, spellName="Fireball", spellElement="fire"),
+            PlayerSpells(playerspellID=1, playerID=1, spellID=1),
+            Achievement(achievementID=1, campaignID=1, title="First steps"),
+            Question(questionID=1, campaignID=1, difficulty="easy", questionStr="Q?", gotCorrect=False, wrongAttempts=0),
+            Answer(answerID=1, questionID=1, answerStr="A", isCorrect=True),
+            Answer(answerID=2, questionID=1, answerStr="B", isCorrect=False)
+        ])
+        db.session.commit()
+        known_users.add("player1", "Player One")
+
+        with patch('app.firebase_auth.decode_token', return_value={"uid": "player1"}):
+            yield app
+
+        db.session.remove()
+        db.drop_all()
+
+def query_plans(app, url):
+    """Requests url and returns the EXPLAIN QUERY PLAN details of every SELECT it ran."""
+    from app.extensions import db
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = app.test_client().get(url, headers={"Authorization": "Bearer test-token"})
+        # Streamed bodies run their queries as they are read
+        response.get_data()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+
+    details = []
+    with db.engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            details.extend(row[3] for row in rows)
+    return details
+
+# Each route's main query and the index it must be answered from
+ROUTE_INDEXES = [
+    ("/questions/1", "questions", "ix_questions_campaign_"),
+    ("/questions/1/bundle?difficulty=easy&gotCorrect=false", "questions", "ix_questions_campaign_difficulty_correct"),
+    ("/questions/1/bundle", "answers", "ix_answers_question"),
+    ("/questions/answers/1", "answers", "ix_answers_question"),
+    ("/questions/unanswered", "campaign", "ix_campaign_user"),
+    ("/questions/unanswered", "questions", "ix_questions_campaign_"),
+    ("/questions/unanswered?campaignID=1", "questions", "ix_questions_campaign_"),
+    ("/questions/difficulty/easy", "campaign", "ix_campaign_user"),
+    ("/questions/difficulty/easy", "questions", "ix_questions_campaign_difficulty_correct"),
+    ("/achievements/1", "achievements", "ix_achievements_campaign"),
+    ("/campaigns/player1", "campaign", "ix_campaign_user"),
+    ("/characters/player1", "player_character", "ix_player_character_user"),
+    ("/stats/player_spells/1", "player_spells", "ix_player_spells_player"),
+    ("/campaigns/1/snapshot", "questions", "ix_questions_campaign_"),
+    ("/campaigns/1/snapshot", "achievements", "ix_achievements_campaign"),
+    ("/campaigns/1/snapshot", "player_spells", "ix_player_spells_player"),
+]
+
+@pytest.mark.parametrize("url,table,index", ROUTE_INDEXES)
+def test_route_uses_index(app, url, table, index):
+    details = query_plans(app, url)
+    searches = [detail for detail in details if detail.startswith(f"SEARCH {table} ")]
+    assert searches, f"{url} did not search {table}: {details}"
+    assert all(index in detail for detail in searches), details
+    assert not any(detail.startswith(f"SCAN {table}") for detail in details), details
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
@@ -1,8 +1,10 @@
 import sys
 import os
+import io
 from unittest.mock import MagicMock, patch
 import pytest
 from flask import json, jsonify
+from pypdf.errors import PdfReadError
 
 # Mock Firebase modules to prevent real initialization
 sys.modules['firebase_admin'] = MagicMock()
@@ -29,12 +31,12 @@ os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
 os_getenv_patcher.start()
 
 @pytest.fixture
-def app():
+def app(tmp_path):
     with patch('app.routes.questions.verify_firebase_token', return_value={"uid": "test_user_id"}), \
          patch('app.firebase_auth.verify_firebase_token', return_value={"uid": "test_user_id"}):
 
         from app import create_app
-        app = create_app()
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
         app.config["TESTING"] = True
 
         with app.app_context(), \
@@ -60,7 +62,7 @@ def test_get_questions(client):
         mock_question.questionStr = "What is 2+2?"
         mock_question.gotCorrect = False
         mock_question.wrongAttempts = 0
-        MockQuestion.query.filter_by.return_value.all.return_value = [mock_question]
+        MockQuestion.query.filter_by.return_value.order_by.return_value.yield_per.return_value = [mock_question]
 
         response = client.get("/questions/1", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 200
@@ -72,12 +74,173 @@ def test_get_questions(client):
             "wrongAttempts": 0
         }]
 
+@pytest.fixture
+def db_app(tmp_path):
+    # A real in-memory database for routes whose queries matter, not just their results
+    from app import create_app
+    from app.config import Config
+    from app.extensions import db as real_db, known_users
+    from app.models import User, Campaign, Question, Answer
+
+    with patch.object(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://"):
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        real_db.create_all()
+        real_db.session.add_all([
+            User(userID="player1", screenName="Player One"),
+            User(userID="player2", screenName="Player Two"),
+            Campaign(campaignID=1, userID="player1", title="Mine", campaignLength="quest", currLevel=1),
+            Campaign(campaignID=2, userID="player2", title="Theirs", campaignLength="quest", currLevel=1)
+        ])
+        for questionID, campaignID, difficulty, got_correct in [
+            (1, 1, "easy", False), (2, 1, "hard", True), (3, 1, "hard", False), (4, 2, "easy", False)
+        ]:
+            real_db.session.add(Question(
+                questionID=questionID, campaignID=campaignID, difficulty=difficulty,
+                questionStr=f"Question {questionID}?", gotCorrect=got_correct, wrongAttempts=0
+            ))
+            real_db.session.add_all([
+                Answer(questionID=questionID, answerStr=f"Right {questionID}", isCorrect=True),
+                Answer(questionID=questionID, answerStr=f"Wrong {questionID}", isCorrect=False)
+            ])
+        real_db.session.commit()
+        known_users.add("player1", "Player One")
+
+        with patch('app.firebase_auth.decode_token', return_value={"uid": "player1"}):
+            yield app
+
+        real_db.session.remove()
+        real_db.drop_all()
+
+@pytest.fixture
+def db_client(db_app):
+    return db_app.test_client()
+
+@pytest.fixture
+def count_queries(db_app):
+    from sqlalchemy import event
+    from app.extensions import db as real_db
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(real_db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(real_db.engine, "before_cursor_execute", record)
+
+def test_get_question_bundle(db_client, count_queries):
+    response = db_client.get("/questions/1/bundle", headers={"Authorization": "Bearer test-token"})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [q["questionID"] for q in data] == [1, 2, 3]
+    assert data[0] == {
+        "questionID": 1,
+        "campaignID": 1,
+        "difficulty": "easy",
+        "questionStr": "Question 1?",
+        "gotCorrect": False,
+        "wrongAttempts": 0,
+        "answerList": [
+            {"answerID": 1, "questionID": 1, "answerStr": "Right 1", "isCorrect": True},
+            {"answerID": 2, "questionID": 1, "answerStr": "Wrong 1", "isCorrect": False}
+        ]
+    }
+    assert len(count_queries) == 2  # Questions, then all of their answers
+
+def test_get_question_bundle_as_msgpack(db_client):
+    import msgpack
+    headers = {"Authorization": "Bearer test-token"}
+    as_json = db_client.get("/questions/1/bundle", headers=headers)
+    as_msgpack = db_client.get("/questions/1/bundle", headers={**headers, "Accept": "application/msgpack"})
+    assert as_msgpack.mimetype == "application/msgpack"
+    assert msgpack.unpackb(as_msgpack.data) == as_json.get_json()
+    assert len(as_msgpack.data) < len(as_json.data)
+
+def test_get_question_bundle_filters(db_client):
+    response = db_client.get(
+        "/questions/1/bundle?difficulty=HARD&gotCorrect=false", headers={"Authorization": "Bearer test-token"}
+    )
+    assert [q["questionID"] for q in response.get_json()] == [3]
+
+def test_get_question_bundle_other_users_campaign(db_client):
+    response = db_client.get("/questions/2/bundle", headers={"Authorization": "Bearer test-token"})
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+def test_get_question_bundle_invalid_filters(db_client):
+    response = db_client.get("/questions/1/bundle?difficulty=extreme", headers={"Authorization": "Bearer test-token"})
+    assert response.status_code == 400
+    response = db_client.get("/questions/1/bundle?gotCorrect=maybe", headers={"Authorization": "Bearer test-token"})
+    assert response.status_code == 400
+
+def test_get_questions_keyset_pagination(db_client):
+    headers = {"Authorization": "Bearer test-token"}
+    first = db_client.get("/questions/1?limit=2", headers=headers)
+    assert [q["questionID"] for q in first.get_json()] == [1, 2]
+    cursor = first.headers["X-Next-Cursor"]
+    assert "2" not in cursor  # Opaque, not the raw ID
+
+    second = db_client.get(f"/questions/1?limit=2&after={cursor}", headers=headers)
+    assert [q["questionID"] for q in second.get_json()] == [3]
+    assert "X-Next-Cursor" not in second.headers
+
+def test_get_questions_streams_rows(db_client, count_queries):
+    response = db_client.get("/questions/1", headers={"Authorization": "Bearer test-token"})
+    assert response.is_streamed
+    assert [q["questionID"] for q in response.get_json()] == [1, 2, 3]
+    assert len(count_queries) == 1  # No limit, so no cursor to work out
+
+def test_get_questions_pages_only_when_asked(db_client, count_queries):
+    response = db_client.get("/questions/1?limit=2", headers={"Authorization": "Bearer test-token"})
+    assert [q["questionID"] for q in response.get_json()] == [1, 2]
+    assert "X-Next-Cursor" in response.headers
+    assert len(count_queries) == 2  # Keys for the cursor, then the rows themselves
+
+def test_campaign_questions_are_not_cut_at_the_default_page_size(db_app, db_client):
+    # The Unity client does not follow X-Next-Cursor, so without a limit a campaign comes back whole
+    db_app.config["PAGE_SIZE_DEFAULT"] = 1
+    headers = {"Authorization": "Bearer test-token"}
+    for url in ("/questions/1", "/questions/1/bundle"):
+        response = db_client.get(url, headers=headers)
+        assert [q["questionID"] for q in response.get_json()] == [1, 2, 3]
+        assert "X-Next-Cursor" not in response.headers
+
+def test_get_questions_page_size_is_capped(db_app, db_client):
+    db_app.config["PAGE_SIZE_MAX"] = 1
+    response = db_client.get("/questions/1?limit=1000", headers={"Authorization": "Bearer test-token"})
+    assert [q["questionID"] for q in response.get_json()] == [1]
+    assert "X-Next-Cursor" in response.headers
+
+@pytest.mark.parametrize("query", ["after=not-a-cursor", "after=WyJ4Il0", "limit=0", "limit=ten"])
+def test_get_questions_invalid_pagination(db_client, query):
+    response = db_client.get(f"/questions/1?{query}", headers={"Authorization": "Bearer test-token"})
+    assert response.status_code == 400
+
+def test_get_unanswered_questions_scoped_to_caller(db_client):
+    headers = {"Authorization": "Bearer test-token"}
+    response = db_client.get("/questions/unanswered", headers=headers)
+    assert [q["questionID"] for q in response.get_json()] == [1, 3]
+
+    response = db_client.get("/questions/unanswered?campaignID=2", headers=headers)
+    assert response.get_json() == []
+
+    response = db_client.get("/questions/unanswered?campaignID=one", headers=headers)
+    assert response.status_code == 400
+
+def test_get_questions_by_difficulty_scoped_to_caller(db_client):
+    headers = {"Authorization": "Bearer test-token"}
+    response = db_client.get("/questions/difficulty/easy", headers=headers)
+    assert [q["questionID"] for q in response.get_json()] == [1]
+
+    response = db_client.get("/questions/difficulty/hard?campaignID=1", headers=headers)
+    assert [q["questionID"] for q in response.get_json()] == [2, 3]
+
 def test_answer_question_success(client):
-    with patch('app.routes.questions.Question') as MockQuestion, \
+    with patch('app.routes.questions.update_returning', return_value=(1,)) as mock_update, \
          patch('app.routes.questions.db.session') as mock_session:
-        mock_question = MagicMock()
-        mock_question.gotCorrect = False
-        MockQuestion.query.get.return_value = mock_question
 
         response = client.put(
             "/questions/answer/1",
@@ -87,12 +250,11 @@ def test_answer_question_success(client):
         )
         assert response.status_code == 200
         assert response.get_json() == {"message": "Answer recorded successfully"}
-        assert mock_question.gotCorrect is True
+        assert mock_update.call_args.args[2] == {"gotCorrect": True}
         mock_session.commit.assert_called_once()
 
 def test_answer_question_not_found(client):
-    with patch('app.routes.questions.Question') as MockQuestion:
-        MockQuestion.query.get.return_value = None
+    with patch('app.routes.questions.update_returning', return_value=None):
 
         response = client.put(
             "/questions/answer/999",
@@ -105,36 +267,59 @@ def test_answer_question_not_found(client):
 
 from functools import wraps
 
-def test_batch_create_questions_success(app):
+def test_batch_create_questions_success(db_app, count_queries):
+    from app.models import Question, Answer
     payload = [{
         "campaignID": 1,
-        "difficulty": "easy",
-        "questionStr": "What is 2+2?",
-        "answers": [
-            {"answerStr": "4", "isCorrect": True},
-            {"answerStr": "5", "isCorrect": False}
-        ]
-    }]
+        "difficulty": difficulty,
+        "questionStr": f"New question {i}?",
+        "answers": [{"answerStr": f"Answer {i}{letter}", "isCorrect": letter == "a"} for letter in "abcd"]
+    } for i, difficulty in enumerate(["easy", "medium", "hard"] * 15)]
 
     # Get the original function without the decorator
     from app.routes.questions import batch_create_questions
     original_func = batch_create_questions.__wrapped__  # Access the undecorated function
 
-    with patch('app.routes.questions.Question') as MockQuestion, \
-         patch('app.routes.questions.Answer') as MockAnswer, \
-         patch('app.routes.questions.db.session') as mock_session:
-        mock_question = MockQuestion.return_value
-        mock_question.questionID = 1
-        mock_session.begin_nested.return_value.__enter__.return_value = None
-
-        with app.app_context():  # For DB session
-            response = original_func({"uid": "test_user_id"}, payload)
+    with db_app.app_context():  # For DB session
+        response = original_func({"uid": "player1"}, payload)
 
         assert response[1] == 201
         assert response[0].get_json() == {"message": "Questions and answers created successfully"}
-        mock_session.add.assert_called_once()
-        mock_session.bulk_save_objects.assert_called_once()
-        mock_session.commit.assert_called_once()
+
+        # All of the answers go in as one statement. PostgreSQL batches the questions too (see save_questions);
+        # SQLite cannot promise RETURNING order, so SQLAlchemy sends them a row at a time to keep the IDs paired
+        inserts = [statement for statement in count_queries if statement.lstrip().upper().startswith("INSERT")]
+        assert len([statement for statement in inserts if "INTO answers" in statement]) == 1
+        assert len([statement for statement in inserts if "INTO questions" in statement]) == len(payload)
+
+        created = Question.query.filter(Question.questionStr.like("New question %")).order_by(Question.questionID).all()
+        assert [q.questionStr for q in created] == [item["questionStr"] for item in payload]
+        for question, item in zip(created, payload):
+            answers = Answer.query.filter_by(questionID=question.questionID).order_by(Answer.answerID).all()
+            assert [(a.answerStr, a.isCorrect) for a in answers] == [
+                (ans["answerStr"], ans["isCorrect"]) for ans in item["answers"]
+            ]
+
+@pytest.mark.parametrize("item,error", [
+    ({"difficulty": "impossible"}, "invalid difficulty"),
+    ({"questionStr": "  "}, "non-empty"),
+    ({"answers": {"answerStr": "4", "isCorrect": True}}, "exactly 2 or 4 answers"),
+    ({"answers": [{"answerStr": "4", "isCorrect": "yes"}, {"answerStr": "5", "isCorrect": False}]}, "boolean")
+])
+def test_batch_create_questions_validates_before_inserting(db_app, count_queries, item, error):
+    valid = {
+        "campaignID": 1,
+        "difficulty": "easy",
+        "questionStr": "What is 2+2?",
+        "answers": [{"answerStr": "4", "isCorrect": True}, {"answerStr": "5", "isCorrect": False}]
+    }
+    from app.routes.questions import batch_create_questions
+    with db_app.app_context():
+        response = batch_create_questions.__wrapped__({"uid": "player1"}, [valid, {**valid, **item}])
+
+    assert response[1] == 400
+    assert error in response[0].get_json()["error"]
+    assert not any(statement.lstrip().upper().startswith("INSERT") for statement in count_queries)
 
 def test_batch_create_questions_missing_fields(app):
     payload = [{"campaignID": 1}]  # Missing required fields
@@ -191,7 +376,7 @@ def test_get_answers_success(client):
         mock_answer.questionID = 1
         mock_answer.answerStr = "4"
         mock_answer.isCorrect = True
-        MockAnswer.query.filter_by.return_value.all.return_value = [mock_answer]
+        MockAnswer.query.filter_by.return_value.order_by.return_value.limit.return_value.all.return_value = [mock_answer]
 
         response = client.get("/questions/answers/1", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 200
@@ -203,16 +388,13 @@ def test_get_answers_success(client):
         }]
 
 def test_increment_wrong_attempt_success(client):
-    with patch('app.routes.questions.Question') as MockQuestion, \
+    with patch('app.routes.questions.increment', return_value=1) as mock_increment, \
          patch('app.routes.questions.db.session') as mock_session:
-        mock_question = MagicMock()
-        mock_question.wrongAttempts = 0
-        MockQuestion.query.get.return_value = mock_question
 
         response = client.put("/questions/wrong_attempt/1", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 200
         assert response.get_json() == {"message": "Wrong attempt recorded", "questionID": 1, "wrongAttempts": 1}
-        assert mock_question.wrongAttempts == 1
+        mock_increment.assert_called_once()
         mock_session.commit.assert_called_once()
 
 def test_get_unanswered_questions(client):
@@ -223,7 +405,8 @@ def test_get_unanswered_questions(client):
         mock_question.difficulty = "easy"
         mock_question.questionStr = "What is 2+2?"
         mock_question.wrongAttempts = 0
-        MockQuestion.query.filter_by.return_value.all.return_value = [mock_question]
+        mock_filtered = MockQuestion.query.join.return_value.filter.return_value.filter.return_value
+        mock_filtered.order_by.return_value.limit.return_value.all.return_value = [mock_question]
 
         response = client.get("/questions/unanswered", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 200
@@ -243,7 +426,8 @@ def test_get_questions_by_difficulty_success(client):
         mock_question.questionStr = "What is 2+2?"
         mock_question.gotCorrect = False
         mock_question.wrongAttempts = 0
-        MockQuestion.query.filter_by.return_value.all.return_value = [mock_question]
+        mock_filtered = MockQuestion.query.join.return_value.filter.return_value.filter.return_value
+        mock_filtered.order_by.return_value.limit.return_value.all.return_value = [mock_question]
 
         response = client.get("/questions/difficulty/easy", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 200
@@ -259,29 +443,131 @@ def test_create_questions_success(client):
     with patch('app.routes.questions.Campaign') as MockCampaign, \
          patch('app.routes.questions.run_qa_session') as mock_run_qa, \
          patch('app.routes.questions.batch_create_questions') as mock_batch_create, \
-         patch('os.path.exists', return_value=True), \
-         patch('os.remove') as mock_remove, \
-         patch('os.makedirs') as mock_makedirs, \
+         patch('app.routes.questions.campaign_question_texts', return_value=["Old question?"]), \
          patch('werkzeug.datastructures.FileStorage.save') as mock_save:
         mock_campaign = MagicMock()
         mock_campaign.userID = "test_user_id"
         mock_campaign.campaignID = "1"
         mock_campaign.campaignLength = "quest"
         MockCampaign.query.filter_by.return_value.first.return_value = mock_campaign
-        mock_run_qa.return_value = [{"campaignID": 1, "difficulty": "easy", "questionStr": "Test?", "answers": [{"answerStr": "Yes", "isCorrect": True}, {"answerStr": "No", "isCorrect": False}]}]
+        uploaded = []
+        def run_qa(source, num_rounds, campaign_id, existing_questions):
+            assert existing_questions == ["Old question?"]
+            uploaded.append(source.read())
+            return [{"campaignID": 1, "difficulty": "easy", "questionStr": "Test?", "answers": [{"answerStr": "Yes", "isCorrect": True}, {"answerStr": "No", "isCorrect": False}]}]
+        mock_run_qa.side_effect = run_qa
         mock_batch_create.return_value = (jsonify({"message": "Questions created"}), 201)
 
         response = client.post(
             "/questions/create",
-            data={"file": (open(os.path.join(os.path.dirname(__file__), "test.pdf"), "rb"), "test.pdf"), "campaignID": "1"},
+            data={"file": (io.BytesIO(b"%PDF-1.0 notes"), "test.pdf"), "campaignID": "1"},
             content_type="multipart/form-data",
             headers={"Authorization": "Bearer test-token"}
         )
         assert response.status_code == 201
         assert response.get_json() == {"message": "Questions created"}
-        mock_run_qa.assert_called_once()
+        assert uploaded == [b"%PDF-1.0 notes"]
         mock_batch_create.assert_called_once()
-        mock_remove.assert_called_once()
+        mock_save.assert_not_called()
+
+def test_uploads_spool_to_disk_above_threshold(app):
+    app.config["UPLOAD_SPOOL_BYTES"] = 1024
+    streams = {}
+    with app.test_request_context(
+        "/questions/create",
+        method="POST",
+        data={"small": (io.BytesIO(b"x" * 100), "small.pdf"), "large": (io.BytesIO(b"x" * 4096), "large.pdf")},
+        content_type="multipart/form-data"
+    ):
+        from flask import request
+        for name in ["small", "large"]:
+            streams[name] = request.files[name].stream
+            assert streams[name].read() == b"x" * (100 if name == "small" else 4096)
+        assert not streams["small"]._rolled
+        assert streams["large"]._rolled
+
+def test_create_questions_async_queues_job(client):
+    with patch('app.routes.questions.Campaign') as MockCampaign, \
+         patch('app.routes.questions.job_queue') as mock_queue:
+        mock_campaign = MagicMock()
+        mock_campaign.campaignLength = "odyssey"
+        MockCampaign.query.filter_by.return_value.first.return_value = mock_campaign
+        mock_queue.enqueue.return_value = "job123"
+
+        response = client.post(
+            "/questions/create_async",
+            data={"file": (io.BytesIO(b"%PDF-1.0 notes"), "notes.pdf"), "campaignID": "1"},
+            content_type="multipart/form-data",
+            headers={"Authorization": "Bearer test-token"}
+        )
+        assert response.status_code == 202
+        assert response.get_json() == {"jobID": "job123", "status": "queued"}
+        kind, _, params = mock_queue.enqueue.call_args[0]
+        assert kind == "generate_questions"
+        assert params["campaignID"] == 1
+        assert params["numRounds"] == 10
+        assert mock_queue.enqueue.call_args[1]["payload"] == b"%PDF-1.0 notes"
+
+def test_create_questions_async_missing_campaign(client):
+    response = client.post(
+        "/questions/create_async",
+        data={"file": (open(os.path.join(os.path.dirname(__file__), "test.pdf"), "rb"), "test.pdf")},
+        content_type="multipart/form-data",
+        headers={"Authorization": "Bearer test-token"}
+    )
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Missing campaignID"}
+
+def test_get_question_job_not_found(client):
+    with patch('app.routes.questions.job_queue') as mock_queue:
+        mock_queue.get.return_value = None
+        response = client.get("/questions/jobs/missing", headers={"Authorization": "Bearer test-token"})
+        assert response.status_code == 404
+        assert response.get_json() == {"error": "Job not found"}
+
+def test_get_question_job_result_pending(client):
+    with patch('app.routes.questions.get_own_job') as mock_get_own_job:
+        mock_get_own_job.return_value = {"jobID": "job123", "status": "running", "progress": 10}
+        response = client.get("/questions/jobs/job123/result", headers={"Authorization": "Bearer test-token"})
+        assert response.status_code == 202
+        assert response.get_json() == {"status": "running", "progress": 10}
+
+def test_generate_questions_job(app):
+    from app.routes.questions import generate_questions_job
+    job = MagicMock()
+    job.payload = b"%PDF-1.0"
+    job.params = {"campaignID": 1, "numRounds": 5}
+    questions = [{"campaignID": 1, "difficulty": "easy", "questionStr": "Q?", "answers": [{"answerStr": "A", "isCorrect": True}, {"answerStr": "B", "isCorrect": False}]}]
+
+    with patch('app.routes.questions.run_qa_session', return_value=questions) as mock_run_qa, \
+         patch('app.routes.questions.Question') as MockQuestion, \
+         patch('app.routes.questions.save_questions') as mock_save:
+        MockQuestion.query.with_entities.return_value.filter_by.return_value.all.return_value = [
+            MagicMock(questionStr="Old question?")
+        ]
+        result = generate_questions_job(job)
+
+    assert result == {"campaignID": 1, "questionsCreated": 1, "generation": {}}
+    assert mock_run_qa.call_args[0][0].getvalue() == b"%PDF-1.0"
+    assert mock_run_qa.call_args[1]["existing_questions"] == ["Old question?"]
+    MockQuestion.query.with_entities.return_value.filter_by.assert_called_once_with(campaignID=1)
+    mock_save.assert_called_once_with(questions)
+
+@pytest.mark.parametrize("qa_outcome", [{"return_value": []}, {"side_effect": PdfReadError("EOF marker not found")}])
+def test_generate_questions_job_does_not_retry_unusable_pdfs(app, qa_outcome):
+    from app.jobs import PermanentJobError
+    from app.routes.questions import generate_questions_job
+    job = MagicMock()
+    job.payload = b"not a pdf"
+    job.params = {"campaignID": 1, "numRounds": 5}
+
+    with patch('app.routes.questions.run_qa_session', **qa_outcome), \
+         patch('app.routes.questions.campaign_question_texts', return_value=[]), \
+         patch('app.routes.questions.save_questions') as mock_save:
+        with pytest.raises(PermanentJobError):
+            generate_questions_job(job)
+
+    mock_save.assert_not_called()
 
 def pytest_sessionfinish():
     os_getenv_patcher.stop()
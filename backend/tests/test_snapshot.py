@@ -0,0 +1,164 @@
+import sys
+import os
+import datetime
+import threading
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+import pytest
+from sqlalchemy import event, create_engine, text
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+HEADERS = {"Authorization": "Bearer test-token"}
+
+@pytest.fixture
+def app(tmp_path):
+    from app import create_app
+    from app.config import Config
+    from app.extensions import db, known_users
+    from app.models import User, Campaign, PlayerStats, Spell, PlayerSpells, Question, Achievement
+
+    with patch.object(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://"):
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(userID="player1", screenName="Player One"),
+            User(userID="player2", screenName="Player Two"),
+            Campaign(campaignID=1, userID="player1", title="Mine", campaignLength="quest", currLevel=2,
+                     remainingTries=3, lastUpdated=datetime.datetime(2024, 5, 1, 12, 0, 0)),
+            Campaign(campaignID=2, userID="player2", title="Theirs", campaignLength="saga", currLevel=1),
+            Campaign(campaignID=3, userID="player1", title="Fresh", campaignLength="odyssey", currLevel=1,
+                     remainingTries=3, lastUpdated=datetime.datetime(2024, 5, 2, 12, 0, 0)),
+            PlayerStats(campaignID=1, attack=Decimal("2.5"), hp=80, mana=40, affinity="water"),
+            Spell(spellID=1, spellName="Fireball", spellElement="fire"),
+            Spell(spellID=2, spellName="Tide", spellElement="water"),
+        ])
+        db.session.flush()
+        db.session.add_all([
+            PlayerSpells(playerspellID=1, playerID=1, spellID=2),
+            PlayerSpells(playerspellID=2, playerID=1, spellID=1),
+            Question(questionID=1, campaignID=1, difficulty="easy", questionStr="Q1?", gotCorrect=True, wrongAttempts=1),
+            Question(questionID=2, campaignID=1, difficulty="easy", questionStr="Q2?", gotCorrect=False, wrongAttempts=2),
+            Question(questionID=3, campaignID=1, difficulty="hard", questionStr="Q3?", gotCorrect=True, wrongAttempts=0),
+            Question(questionID=4, campaignID=2, difficulty="hard", questionStr="Q4?", gotCorrect=False, wrongAttempts=5),
+            Achievement(achievementID=1, campaignID=1, title="First blood", description="Won a fight"),
+            Achievement(achievementID=2, campaignID=2, title="Not mine", description="Someone else's"),
+        ])
+        db.session.commit()
+        known_users.add("player1", "Player One")
+
+        with patch('app.firebase_auth.decode_token', return_value={"uid": "player1"}):
+            yield app
+
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def selects(app):
+    from app.extensions import db
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            recorded.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(db.engine, "before_cursor_execute", record)
+
+def test_snapshot_returns_everything_for_a_level(client, selects):
+    response = client.get("/campaigns/1/snapshot", headers=HEADERS)
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "campaign": {
+            "campaignID": 1,
+            "title": "Mine",
+            "campaignLength": "quest",
+            "currLevel": 2,
+            "remainingTries": 3,
+            "lastUpdated": "Wed, 01 May 2024 12:00:00 GMT"
+        },
+        "stats": {"campaignID": 1, "attack": "2.5", "hp": 80, "mana": 40, "affinity": "water"},
+        "spells": [
+            {"playerspellID": 1, "spellID": 2, "spellName": "Tide", "spellElement": "water"},
+            {"playerspellID": 2, "spellID": 1, "spellName": "Fireball", "spellElement": "fire"}
+        ],
+        "questions": {
+            "total": 3,
+            "answered": 2,
+            "wrongAttempts": 3,
+            "byDifficulty": {
+                "easy": {"total": 2, "answered": 1, "wrongAttempts": 3},
+                "hard": {"total": 1, "answered": 1, "wrongAttempts": 0}
+            }
+        },
+        "achievements": [{"achievementID": 1, "title": "First blood", "description": "Won a fight"}]
+    }
+    assert len(selects) == 4
+
+def test_snapshot_of_a_new_campaign(client):
+    response = client.get("/campaigns/3/snapshot", headers=HEADERS)
+    snapshot = response.get_json()
+    assert snapshot["stats"] is None
+    assert snapshot["spells"] == []
+    assert snapshot["achievements"] == []
+    assert snapshot["questions"] == {"total": 0, "answered": 0, "wrongAttempts": 0, "byDifficulty": {}}
+
+@pytest.mark.parametrize("campaign_id", [2, 999])
+def test_snapshot_of_other_campaigns_is_not_found(client, campaign_id):
+    response = client.get(f"/campaigns/{campaign_id}/snapshot", headers=HEADERS)
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Campaign not found"}
+
+def test_snapshot_reads_buffered_stats(client):
+    from app.extensions import stats_buffer
+    buffered = {"campaignID": 1, "attack": Decimal("2.5"), "hp": 10, "mana": 90, "affinity": "water"}
+    with patch.object(stats_buffer, "enabled", True), patch.object(stats_buffer, "get", return_value=buffered):
+        response = client.get("/campaigns/1/snapshot", headers=HEADERS)
+    assert response.get_json()["stats"]["mana"] == 90
+
+def test_gather_runs_queries_on_the_thread_pool(tmp_path):
+    from app.snapshot import gather
+    engine = create_engine(f"sqlite:///{tmp_path / 'gather.db'}")
+    seen = []
+
+    def query(value):
+        def run(connection):
+            seen.append(threading.current_thread().name)
+            return connection.execute(text(f"SELECT {value}")).scalar()
+        return run
+
+    assert gather([query(1), query(2), query(3)], engine, workers=3) == [1, 2, 3]
+    assert len(seen) == 3 and all(name.startswith("snapshot") for name in seen)
+    engine.dispose()
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
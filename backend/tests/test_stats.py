@@ -29,16 +29,17 @@ os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
 os_getenv_patcher.start()
 
 @pytest.fixture
-def app():
+def app(tmp_path):
     with patch('app.routes.stats.verify_firebase_token', return_value={"uid": "test_user_id"}), \
          patch('app.firebase_auth.verify_firebase_token', return_value={"uid": "test_user_id"}):
 
         from app import create_app
-        app = create_app()
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
         app.config["TESTING"] = True
 
         with app.app_context(), \
              patch('app.routes.stats.db') as mock_db, \
+             patch('app.extensions.resource_versions.current', return_value=0), \
              patch('app.models.User.query') as mock_user_query:
             
             mock_user = MagicMock()
@@ -124,7 +125,7 @@ def test_get_spells_success(client):
         mock_spell.spellID = 1
         mock_spell.spellName = "Fireball"
         mock_spell.spellElement = "fire"
-        MockSpell.query.all.return_value = [mock_spell]
+        MockSpell.query.order_by.return_value.limit.return_value.all.return_value = [mock_spell]
 
         response = client.get("/stats/spells", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 200
@@ -173,7 +174,7 @@ def test_get_player_spells_success(client):
         mock_spell.spellName = "Fireball"
         mock_spell.spellElement = "fire"
         mock_query = mock_session.query.return_value
-        mock_query.join.return_value.filter.return_value.all.return_value = [(mock_ps, mock_spell)]
+        mock_query.join.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [(mock_ps, mock_spell)]
 
         response = client.get("/stats/player_spells/1", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 200
@@ -187,7 +188,7 @@ def test_get_player_spells_success(client):
 def test_get_player_spells_not_found(client):
     with patch('app.routes.stats.db.session') as mock_session:
         mock_query = mock_session.query.return_value
-        mock_query.join.return_value.filter.return_value.all.return_value = []
+        mock_query.join.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = []
 
         response = client.get("/stats/player_spells/999", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 404
@@ -256,12 +257,8 @@ def test_create_spell_success(client):
         mock_session.commit.assert_called_once()
 
 def test_replenish_mana_success(client):
-    with patch('app.routes.stats.PlayerStats') as MockPlayerStats, \
+    with patch('app.routes.stats.increment', return_value=90) as mock_increment, \
          patch('app.routes.stats.db.session') as mock_session:
-        mock_stats = MagicMock()
-        mock_stats.campaignID = 1
-        mock_stats.mana = 70
-        MockPlayerStats.query.get.return_value = mock_stats
 
         payload = {"manaAmount": 20}
         response = client.patch(
@@ -272,7 +269,8 @@ def test_replenish_mana_success(client):
         )
         assert response.status_code == 200
         assert response.get_json() == {"message": "Mana replenished successfully", "newMana": 90}
-        assert mock_stats.mana == 90
+        assert mock_increment.call_args.args[1:] == (1, 20)
+        assert mock_increment.call_args.kwargs == {"maximum": 100}
         mock_session.commit.assert_called_once()
 
 def test_replenish_mana_missing_amount(client):
@@ -288,8 +286,7 @@ def test_replenish_mana_missing_amount(client):
         assert response.get_json() == {"error": "Missing manaAmount"}
 
 def test_replenish_mana_not_found(client):
-    with patch('app.routes.stats.PlayerStats') as MockPlayerStats:
-        MockPlayerStats.query.get.return_value = None
+    with patch('app.routes.stats.increment', return_value=None):
 
         payload = {"manaAmount": 20}
         response = client.patch(
@@ -0,0 +1,267 @@
+import sys
+import os
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+import threading
+import time
+from contextlib import closing
+import pytest
+from sqlalchemy import event, update
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+HEADERS = {"Authorization": "Bearer test-token"}
+
+@pytest.fixture
+def app(tmp_path):
+    from app import create_app
+    from app.config import Config
+    from app.extensions import db, known_users
+    from app.models import User, Campaign, PlayerStats
+
+    with patch.object(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://"), \
+         patch.object(Config, "STATS_BUFFER_ENABLED", True), \
+         patch.object(Config, "STATS_BUFFER_PATH", str(tmp_path / "stats.sqlite3")), \
+         patch.object(Config, "STATS_BUFFER_FLUSH_INTERVAL", 0):
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(userID="player1", screenName="Player One"),
+            Campaign(campaignID=1, userID="player1", title="Mine", campaignLength="quest", currLevel=1),
+            PlayerStats(campaignID=1, attack=Decimal("1.0"), hp=100, mana=70, affinity="fire")
+        ])
+        db.session.commit()
+        known_users.add("player1", "Player One")
+
+        with patch('app.firebase_auth.decode_token', return_value={"uid": "player1"}):
+            yield app
+
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def buffer(app):
+    from app.extensions import stats_buffer
+    return stats_buffer
+
+@pytest.fixture
+def updates(app):
+    from app.extensions import db
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE player_stats"):
+            recorded.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(db.engine, "before_cursor_execute", record)
+
+def stored_stats():
+    from app.extensions import db
+    from app.models import PlayerStats
+    db.session.expire_all()
+    stats = db.session.get(PlayerStats, 1)
+    return {"attack": stats.attack, "hp": stats.hp, "mana": stats.mana, "affinity": stats.affinity}
+
+def test_writes_are_buffered_and_visible_to_reads(client, updates):
+    response = client.patch("/stats/replenish_mana/1", json={"manaAmount": 20}, headers=HEADERS)
+    assert response.get_json() == {"message": "Mana replenished successfully", "newMana": 90}
+    response = client.patch("/stats/replenish_mana/1", json={"manaAmount": 20}, headers=HEADERS)
+    assert response.get_json()["newMana"] == 100
+    response = client.put("/stats/update/1", json={"hp": 40, "attack": 2.5}, headers=HEADERS)
+    assert response.status_code == 200
+
+    response = client.get("/stats/1", headers=HEADERS)
+    assert response.get_json() == {"campaignID": 1, "attack": "2.5", "hp": 40, "mana": 100, "affinity": "fire"}
+    assert updates == []
+    assert stored_stats() == {"attack": Decimal("1.0"), "hp": 100, "mana": 70, "affinity": "fire"}
+
+def test_flush_writes_through_once(client, buffer, updates):
+    client.put("/stats/update/1", json={"hp": 40, "mana": 10}, headers=HEADERS)
+    client.patch("/stats/replenish_mana/1", json={"manaAmount": 5}, headers=HEADERS)
+
+    assert buffer.flush() == 1
+    assert len(updates) == 1
+    assert stored_stats() == {"attack": Decimal("1.0"), "hp": 40, "mana": 15, "affinity": "fire"}
+    assert buffer.flush() == 0
+    # Flushed rows keep serving reads until they are evicted
+    assert buffer.get(1)["mana"] == 15
+
+def test_writes_after_a_flush_are_flushed_again(client, buffer):
+    client.put("/stats/update/1", json={"hp": 40}, headers=HEADERS)
+    buffer.flush()
+    client.put("/stats/update/1", json={"hp": 30}, headers=HEADERS)
+
+    buffer.flush_campaign(1)
+    assert stored_stats()["hp"] == 30
+    assert buffer.get(1) is None
+
+def test_campaign_update_flushes_and_evicts(client, buffer):
+    client.put("/stats/update/1", json={"hp": 55, "affinity": "water"}, headers=HEADERS)
+    response = client.put("/campaigns/update/1", json={"currLevel": 2}, headers=HEADERS)
+    assert response.status_code == 200
+
+    assert stored_stats() == {"attack": Decimal("1.0"), "hp": 55, "mana": 70, "affinity": "water"}
+    assert buffer.get(1) is None
+
+def test_gameplay_events_start_from_buffered_values(client):
+    client.patch("/stats/replenish_mana/1", json={"manaAmount": 20}, headers=HEADERS)
+    response = client.post(
+        "/campaigns/1/events", json={"events": [{"type": "replenishMana", "manaAmount": 5}]}, headers=HEADERS
+    )
+    assert response.get_json()["stats"]["mana"] == 95
+
+def restarted_buffer(buffer, **config):
+    # A new process opening the same buffer file
+    from flask import Flask, current_app
+    from app.extensions import db
+    from app.stats_buffer import StatsBuffer
+    app = Flask(__name__)
+    app.config.update(STATS_BUFFER_ENABLED=True, STATS_BUFFER_PATH=buffer.path, **config)
+    restarted = StatsBuffer()
+    with patch.object(StatsBuffer, "start") as start:
+        restarted.init_app(app, db)
+    start.assert_called_once()
+    # The flusher works against the test database
+    restarted.app = current_app._get_current_object()
+    restarted.start()
+    return restarted
+
+def test_buffer_survives_a_restart(client, buffer):
+    client.put("/stats/update/1", json={"hp": 12}, headers=HEADERS)
+
+    restarted = restarted_buffer(buffer, STATS_BUFFER_FLUSH_INTERVAL=0)
+    assert restarted.get(1)["hp"] == 12
+    assert restarted.flush() == 1
+    assert stored_stats()["hp"] == 12
+
+def test_flusher_starts_with_the_app(client, buffer):
+    client.put("/stats/update/1", json={"hp": 12}, headers=HEADERS)
+
+    # No write reaches the restarted process, yet the leftover row is flushed
+    restarted = restarted_buffer(buffer, STATS_BUFFER_FLUSH_INTERVAL=0.05)
+    try:
+        deadline = time.time() + 5
+        with closing(restarted._connect()) as conn:
+            while time.time() < deadline and conn.execute(
+                "SELECT 1 FROM player_stats WHERE version > flushedVersion"
+            ).fetchone():
+                time.sleep(0.01)
+    finally:
+        restarted.stop()
+    assert stored_stats()["hp"] == 12
+
+def test_buffer_path_is_required(app):
+    from flask import Flask
+    from app.extensions import db
+    from app.stats_buffer import StatsBuffer
+    unconfigured = Flask(__name__)
+    unconfigured.config.update(STATS_BUFFER_ENABLED=True)
+    with pytest.raises(ValueError):
+        StatsBuffer().init_app(unconfigured, db)
+
+def test_buffered_writes_wait_for_write_through(app, buffer):
+    from app.extensions import db
+    from app.models import PlayerStats
+    written = []
+
+    def buffered_write():
+        with app.app_context():
+            written.append(buffer.update(1, hp=40))
+
+    with buffer.write_through(1):
+        writer = threading.Thread(target=buffered_write)
+        writer.start()
+        time.sleep(0.2)
+        assert writer.is_alive()
+        # A direct write, as the gameplay batch makes, committed while the lock is held
+        db.session.execute(update(PlayerStats).where(PlayerStats.campaignID == 1).values(mana=5))
+        db.session.commit()
+    writer.join(timeout=5)
+
+    # The buffered write reloaded the row after the commit instead of overwriting it
+    assert written[0]["mana"] == 5 and written[0]["hp"] == 40
+    buffer.flush()
+    assert stored_stats()["mana"] == 5
+
+def test_flush_skips_locked_campaigns(client, buffer):
+    client.put("/stats/update/1", json={"hp": 12}, headers=HEADERS)
+    # Another process is inside write_through() for the campaign
+    with closing(buffer._connect()) as conn:
+        buffer._lock(conn, [1], "other-process")
+
+    assert buffer.flush() == 0
+    assert stored_stats()["hp"] == 100
+
+    buffer._unlock([1], "other-process")
+    assert buffer.flush() == 1
+    assert stored_stats()["hp"] == 12
+
+def test_failed_flush_leaves_the_buffer_dirty(client, buffer):
+    from app.extensions import db
+    client.put("/stats/update/1", json={"hp": 12}, headers=HEADERS)
+
+    with patch.object(db.session, "commit", side_effect=RuntimeError("database unavailable")):
+        with pytest.raises(RuntimeError):
+            buffer.flush()
+    assert stored_stats()["hp"] == 100
+
+    assert buffer.flush() == 1
+    assert stored_stats()["hp"] == 12
+
+def test_idle_clean_rows_are_evicted(client, buffer):
+    client.put("/stats/update/1", json={"hp": 12}, headers=HEADERS)
+    buffer.flush(evict=True)
+    assert buffer.get(1) is not None
+
+    with patch.object(buffer, "idle_seconds", -1):
+        buffer.flush(evict=True)
+    assert buffer.get(1) is None
+
+@pytest.mark.parametrize("payload", [{"attack": 9}, {"hp": "full"}, {"affinity": "lightning"}])
+def test_invalid_buffered_updates_are_rejected(client, buffer, payload):
+    response = client.put("/stats/update/1", json=payload, headers=HEADERS)
+    assert response.status_code == 400
+    assert buffer.get(1) is None
+
+def test_missing_stats_are_not_buffered(client, buffer):
+    assert client.put("/stats/update/2", json={"hp": 1}, headers=HEADERS).status_code == 404
+    assert client.patch("/stats/replenish_mana/2", json={"manaAmount": 1}, headers=HEADERS).status_code == 404
+    assert buffer.get(2) is None
+
+def test_deleting_the_campaign_discards_its_buffer(client, buffer):
+    client.put("/stats/update/1", json={"hp": 12}, headers=HEADERS)
+    assert client.delete("/campaigns/delete/1", headers=HEADERS).status_code == 200
+    assert buffer.get(1) is None
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+import json
+import pytest
+from flask import Flask
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.streaming import json_array, streamed_json
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+@pytest.mark.parametrize("count", [0, 1, 2, 3, 7])
+def test_json_array_is_valid_json(app, count):
+    with app.app_context():
+        body = "".join(json_array(range(count), lambda i: {"id": i}, batch_size=2))
+    assert json.loads(body) == [{"id": i} for i in range(count)]
+
+def test_json_array_is_lazy(app):
+    consumed = []
+
+    def rows():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    with app.app_context():
+        chunks = json_array(rows(), lambda i: i, batch_size=4)
+        assert next(chunks) == "["
+        assert next(chunks) == "0,1,2,3"
+        assert consumed == [0, 1, 2, 3]
+
+def test_streamed_json_response(app):
+    with app.test_request_context("/"):
+        response = streamed_json(iter([1, 2]), lambda i: {"n": i}, headers={"X-Next-Cursor": "abc"})
+        assert response.is_streamed
+        body = response.get_data()
+    assert response.mimetype == "application/json"
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert json.loads(body) == [{"n": 1}, {"n": 2}]
+
+if __name__ == '__main__':
+    pytest.main()
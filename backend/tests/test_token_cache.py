@@ -0,0 +1,118 @@
+import sys
+import os
+import time
+from unittest.mock import MagicMock, patch
+import pytest
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+from app.token_cache import TokenCache, KnownUserCache
+
+def claims_for(uid, ttl=3600):
+    return {"uid": uid, "exp": int(time.time()) + ttl}
+
+def test_put_and_get():
+    cache = TokenCache()
+    user = MagicMock()
+    cache.put("token-a", claims_for("user1"), user)
+    claims, cached_user = cache.get("token-a")
+    assert claims["uid"] == "user1"
+    assert cached_user is user
+    assert cache.stats() == {"hits": 1, "misses": 0, "size": 1}
+
+def test_raw_token_is_not_stored():
+    cache = TokenCache()
+    cache.put("secret-token", claims_for("user1"), MagicMock())
+    assert "secret-token" not in cache._entries
+    assert TokenCache.digest("secret-token") in cache._entries
+
+def test_miss_on_unknown_token():
+    cache = TokenCache()
+    assert cache.get("unknown") is None
+    assert cache.stats()["misses"] == 1
+
+def test_entry_expires_at_token_exp():
+    cache = TokenCache()
+    cache.put("token-a", claims_for("user1", ttl=1), MagicMock())
+    with patch('app.token_cache.time.time', return_value=time.time() + 2):
+        assert cache.get("token-a") is None
+    assert cache.stats()["size"] == 0
+
+def test_max_ttl_caps_entry_lifetime():
+    cache = TokenCache(max_ttl=10)
+    cache.put("token-a", claims_for("user1", ttl=3600), MagicMock())
+    with patch('app.token_cache.time.time', return_value=time.time() + 11):
+        assert cache.get("token-a") is None
+
+def test_default_ttl_is_short():
+    # Invalidation is per worker, so other workers only drop a user's tokens when they expire here
+    cache = TokenCache()
+    cache.put("token-a", claims_for("user1", ttl=3600), MagicMock())
+    with patch('app.token_cache.time.time', return_value=time.time() + 61):
+        assert cache.get("token-a") is None
+
+def test_expired_or_missing_exp_is_not_cached():
+    cache = TokenCache()
+    cache.put("token-a", claims_for("user1", ttl=-5), MagicMock())
+    cache.put("token-b", {"uid": "user1"}, MagicMock())
+    cache.put("token-c", {"uid": "user1", "exp": MagicMock()}, MagicMock())
+    assert cache.stats()["size"] == 0
+
+def test_lru_eviction():
+    cache = TokenCache(max_size=2)
+    cache.put("token-a", claims_for("user1"), MagicMock())
+    cache.put("token-b", claims_for("user2"), MagicMock())
+    cache.get("token-a")
+    cache.put("token-c", claims_for("user3"), MagicMock())
+    assert cache.get("token-a") is not None
+    assert cache.get("token-b") is None
+    assert cache.get("token-c") is not None
+
+def test_invalidate_user():
+    cache = TokenCache()
+    cache.put("token-a", claims_for("user1"), MagicMock())
+    cache.put("token-b", claims_for("user1"), MagicMock())
+    cache.put("token-c", claims_for("user2"), MagicMock())
+    cache.invalidate_user("user1")
+    assert cache.get("token-a") is None
+    assert cache.get("token-b") is None
+    assert cache.get("token-c") is not None
+
+def test_known_user_entries_expire():
+    cache = KnownUserCache(ttl=30)
+    cache.add("user1", "One")
+    assert cache.get("user1") == "One"
+    with patch('app.token_cache.time.time', return_value=time.time() + 31):
+        assert cache.get("user1") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+def test_known_user_lru_eviction():
+    cache = KnownUserCache(max_size=1)
+    cache.add("user1", "One")
+    cache.add("user2", "Two")
+    assert cache.get("user1") is None
+    assert cache.get("user2") == "Two"
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,195 @@
+import sys
+import os
+import time
+import datetime
+from unittest.mock import MagicMock, patch
+import logging
+import pytest
+import jwt
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+from app.token_verifier import TokenVerifier, StaticKeySource, TokenVerificationError, parse_max_age
+
+PROJECT_ID = "wizdomrun-test"
+
+def make_key_pair():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.system.gserviceaccount.com")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(private_key, hashes.SHA256())
+    )
+    return private_key, certificate.public_bytes(serialization.Encoding.PEM).decode("utf-8")
+
+@pytest.fixture(scope="module")
+def key_pair():
+    return make_key_pair()
+
+@pytest.fixture
+def verifier(key_pair):
+    _, pem = key_pair
+    return TokenVerifier(project_id=PROJECT_ID, key_source=StaticKeySource({"kid-1": pem}))
+
+def make_token(private_key, kid="kid-1", **overrides):
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "test_user",
+        "iat": now,
+        "auth_time": now,
+        "exp": now + 3600
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+def test_verify_valid_token(verifier, key_pair):
+    private_key, _ = key_pair
+    claims = verifier.verify(make_token(private_key))
+    assert claims["uid"] == "test_user"
+    assert verifier.stats()["misses"] == 1
+    assert verifier.stats()["refreshes"] == 1
+
+def test_keys_are_cached_between_verifications(verifier, key_pair):
+    private_key, _ = key_pair
+    token = make_token(private_key)
+    for _ in range(3):
+        verifier.verify(token)
+    stats = verifier.stats()
+    assert stats["refreshes"] == 1
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+def test_refresh_logs_cache_counters(verifier, key_pair, caplog):
+    private_key, _ = key_pair
+    token = make_token(private_key)
+    verifier.verify(token)
+    verifier.verify(token)
+    with caplog.at_level(logging.INFO, logger="app.token_verifier"):
+        verifier.refresh()
+    assert "1 hits, 1 misses, 2 refreshes, 0 refresh errors" in caplog.text
+
+def test_expired_keys_are_refetched(key_pair):
+    private_key, pem = key_pair
+    verifier = TokenVerifier(project_id=PROJECT_ID, key_source=StaticKeySource({"kid-1": pem}, max_age=0))
+    token = make_token(private_key)
+    verifier.verify(token)
+    verifier.verify(token)
+    assert verifier.stats()["refreshes"] == 2
+
+def test_background_refresh_near_expiry(key_pair):
+    private_key, pem = key_pair
+    verifier = TokenVerifier(
+        project_id=PROJECT_ID,
+        key_source=StaticKeySource({"kid-1": pem}, max_age=60),
+        refresh_margin=120
+    )
+    token = make_token(private_key)
+    verifier.verify(token)
+    with patch("app.token_verifier.threading.Thread") as MockThread:
+        verifier.verify(token)
+        MockThread.return_value.start.assert_called_once()
+    assert verifier.stats()["hits"] == 1
+
+def test_unknown_kid_is_rejected(verifier, key_pair):
+    private_key, _ = key_pair
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(private_key, kid="other-kid"))
+
+def test_unknown_kid_does_not_refetch_fresh_keys(verifier, key_pair):
+    private_key, _ = key_pair
+    verifier.verify(make_token(private_key))
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(private_key, kid="other-kid"))
+    assert verifier.stats()["refreshes"] == 1
+
+def test_wrong_signature_is_rejected(verifier):
+    other_private_key, _ = make_key_pair()
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(other_private_key))
+
+def test_expired_token_is_rejected(verifier, key_pair):
+    private_key, _ = key_pair
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(private_key, exp=int(time.time()) - 60))
+
+def test_wrong_audience_is_rejected(verifier, key_pair):
+    private_key, _ = key_pair
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(private_key, aud="another-project"))
+
+def test_wrong_issuer_is_rejected(verifier, key_pair):
+    private_key, _ = key_pair
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(private_key, iss="https://securetoken.google.com/another-project"))
+
+def test_empty_subject_is_rejected(verifier, key_pair):
+    private_key, _ = key_pair
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(make_token(private_key, sub=""))
+
+def test_non_rs256_token_is_rejected(verifier):
+    token = jwt.encode({"sub": "test_user"}, "secret", algorithm="HS256", headers={"kid": "kid-1"})
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(token)
+
+def test_malformed_token_is_rejected(verifier):
+    with pytest.raises(TokenVerificationError):
+        verifier.verify("not-a-jwt")
+
+def test_disabled_without_project_id(key_pair):
+    _, pem = key_pair
+    verifier = TokenVerifier(key_source=StaticKeySource({"kid-1": pem}))
+    assert not verifier.enabled
+    with pytest.raises(TokenVerificationError):
+        verifier.verify("token")
+
+def test_refresh_errors_are_counted(key_pair):
+    private_key, _ = key_pair
+    source = MagicMock()
+    source.fetch.side_effect = Exception("network down")
+    verifier = TokenVerifier(project_id=PROJECT_ID, key_source=source)
+    with pytest.raises(Exception):
+        verifier.verify(make_token(private_key))
+    assert verifier.stats()["refreshErrors"] == 1
+
+def test_parse_max_age():
+    assert parse_max_age("public, max-age=19845, must-revalidate, no-transform") == 19845
+    assert parse_max_age("no-cache") == 3600
+    assert parse_max_age(None) == 3600
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
@@ -29,16 +29,17 @@ os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
 os_getenv_patcher.start()
 
 @pytest.fixture
-def app():
+def app(tmp_path):
     with patch('app.routes.users.verify_firebase_token', return_value={"uid": "test_user_id"}), \
          patch('app.firebase_auth.verify_firebase_token', return_value={"uid": "test_user_id"}):
 
         from app import create_app
-        app = create_app()
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
         app.config["TESTING"] = True
 
         with app.app_context(), \
              patch('app.routes.users.db') as mock_db, \
+             patch('app.routes.users.resource_versions'), \
              patch('app.models.User.query') as mock_user_query:
             
             mock_user = MagicMock()
@@ -139,7 +140,7 @@ def test_get_all_users_success(client):
         mock_user2 = MagicMock()
         mock_user2.userID = "user2"
         mock_user2.screenName = "TestUser2"
-        MockUser.query.all.return_value = [mock_user1, mock_user2]
+        MockUser.query.order_by.return_value.limit.return_value.yield_per.return_value = [mock_user1, mock_user2]
 
         response = client.get("/users/", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 200
@@ -150,7 +151,7 @@ def test_get_all_users_success(client):
 
 def test_get_all_users_empty(client):
     with patch('app.routes.users.User') as MockUser:
-        MockUser.query.all.return_value = []
+        MockUser.query.order_by.return_value.limit.return_value.yield_per.return_value = []
 
         response = client.get("/users/", headers={"Authorization": "Bearer test-token"})
         assert response.status_code == 200
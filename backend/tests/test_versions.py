@@ -0,0 +1,190 @@
+import sys
+import os
+from unittest.mock import MagicMock, patch
+import pytest
+from sqlalchemy import event
+
+# Mock Firebase modules to prevent real initialization
+sys.modules['firebase_admin'] = MagicMock()
+sys.modules['firebase_admin.credentials'] = MagicMock()
+sys.modules['firebase_admin.auth'] = MagicMock()
+
+# Set up sys.path for backend imports from WizdomRun\backend\tests\
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Define mock_getenv for Firebase, OpenAI, and SQLAlchemy credentials
+def mock_getenv(key, default=None):
+    if key == "OPEN_AI_KEY":
+        return "mock-openai-key"
+    if key == "DATABASE_URL":
+        return "sqlite:///test.db"  # Dummy URI for testing
+    return default
+
+# Apply os.getenv patch at module level
+os_getenv_patcher = patch('os.getenv', side_effect=mock_getenv)
+os_getenv_patcher.start()
+
+HEADERS = {"Authorization": "Bearer test-token"}
+
+@pytest.fixture
+def app(tmp_path):
+    from app import create_app
+    from app.config import Config
+    from app.extensions import db, known_users
+    from app.models import User, PlayerCharacter, Campaign, Spell, Achievement
+
+    with patch.object(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://"):
+        app = create_app({"TESTING": True, "JOB_DB_PATH": str(tmp_path / "jobs.sqlite3")})
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(userID="player1", screenName="Player One"),
+            User(userID="player2", screenName="Player Two"),
+            PlayerCharacter(characterID=1, userID="player1", modelID=1),
+            Campaign(campaignID=1, userID="player1", title="Mine", campaignLength="quest", currLevel=1),
+            Campaign(campaignID=2, userID="player2", title="Theirs", campaignLength="quest", currLevel=1),
+            Spell(spellID=1, spellName="Fireball", spellElement="fire"),
+            Spell(spellID=2, spellName="Gust", spellElement="air"),
+            Achievement(achievementID=1, campaignID=1, title="First steps")
+        ])
+        db.session.commit()
+        known_users.add("player1", "Player One")
+
+        with patch('app.firebase_auth.decode_token', return_value={"uid": "player1"}):
+            yield app
+
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def statements(app):
+    from app.extensions import db
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(db.engine, "before_cursor_execute", record)
+
+def revalidate(client, url, etag, **headers):
+    return client.get(url, headers={**HEADERS, "If-None-Match": f'"{etag}"', **headers})
+
+@pytest.mark.parametrize("url", ["/campaigns/player1", "/characters/player1", "/achievements/1", "/stats/spells"])
+def test_unchanged_resource_is_not_modified(client, url):
+    first = client.get(url, headers=HEADERS)
+    assert first.status_code == 200
+    etag, weak = first.get_etag()
+    assert etag and not weak
+    assert "no-cache" in first.headers["Cache-Control"]
+
+    second = revalidate(client, url, etag)
+    assert second.status_code == 304
+    assert second.data == b""
+    assert second.get_etag() == (etag, False)
+
+def test_not_modified_skips_the_resource_query(client, statements):
+    etag, _ = client.get("/campaigns/player1", headers=HEADERS).get_etag()
+    statements.clear()
+    assert revalidate(client, "/campaigns/player1", etag).status_code == 304
+    assert len(statements) == 1 and "resource_versions" in statements[0]
+
+def test_update_changes_the_etag(client):
+    etag, _ = client.get("/campaigns/player1", headers=HEADERS).get_etag()
+    response = client.put("/campaigns/update/1", json={"currLevel": 2}, headers=HEADERS)
+    assert response.status_code == 200
+
+    response = revalidate(client, "/campaigns/player1", etag)
+    assert response.status_code == 200
+    assert response.get_json()[0]["currLevel"] == 2
+    assert response.get_etag()[0] != etag
+
+def test_writes_only_bump_their_own_scopes(app, client):
+    from app.extensions import resource_versions
+    with app.app_context():
+        before = {scope: resource_versions.current(scope) for scope in ("achievements:1", "campaigns:player1", "spells")}
+
+    response = client.post(
+        "/achievements/unlock", json={"campaignID": 1, "title": "Quiz master", "description": ""}, headers=HEADERS
+    )
+    assert response.status_code == 200
+
+    with app.app_context():
+        assert resource_versions.current("achievements:1") == before["achievements:1"] + 1
+        assert resource_versions.current("campaigns:player1") == before["campaigns:player1"]
+        assert resource_versions.current("spells") == before["spells"]
+
+def test_unmodified_rows_do_not_bump(app):
+    from app.extensions import db, resource_versions
+    from app.models import Campaign
+    with app.app_context():
+        version = resource_versions.current("campaigns:player1")
+        campaign = db.session.get(Campaign, 1)
+        campaign.currLevel = campaign.currLevel
+        db.session.commit()
+        assert resource_versions.current("campaigns:player1") == version
+
+def test_deleting_a_user_bumps_their_resources(app):
+    from app.extensions import db, resource_versions
+    from app.models import User
+    with app.app_context():
+        version = resource_versions.current("campaigns:player2")
+        db.session.delete(db.session.get(User, "player2"))
+        db.session.commit()
+        assert resource_versions.current("campaigns:player2") == version + 1
+
+def test_deleting_a_user_bumps_their_achievements(app, client):
+    from app.extensions import resource_versions
+    with app.app_context():
+        version = resource_versions.current("achievements:1")
+    assert client.delete("/users/player1", headers=HEADERS).status_code == 200
+    with app.app_context():
+        assert resource_versions.current("achievements:1") > version
+
+def test_variants_get_their_own_etags(client):
+    json_tag, _ = client.get("/stats/spells", headers=HEADERS).get_etag()
+    msgpack_tag, _ = client.get("/stats/spells", headers={**HEADERS, "Accept": "application/msgpack"}).get_etag()
+    page_tag, _ = client.get("/stats/spells?limit=1", headers=HEADERS).get_etag()
+    assert len({json_tag, msgpack_tag, page_tag}) == 3
+
+def test_compressed_responses_revalidate(app, client):
+    app.extensions["compressor"].min_size = 0
+    response = client.get("/stats/spells", headers={**HEADERS, "Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    etag, weak = response.get_etag()
+    assert etag.endswith("-gzip") and not weak
+
+    response = revalidate(client, "/stats/spells", etag, **{"Accept-Encoding": "gzip"})
+    assert response.status_code == 304
+    # The 304 repeats the tag of the 200 it stands for
+    assert response.get_etag() == (etag, False)
+
+    # A client that no longer accepts gzip would get a different body
+    response = revalidate(client, "/stats/spells", etag, **{"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+
+def test_uncompressed_responses_revalidate_with_their_own_tag(client):
+    etag, _ = client.get("/stats/spells", headers={**HEADERS, "Accept-Encoding": "gzip"}).get_etag()
+    assert not etag.endswith("-gzip")
+
+    response = revalidate(client, "/stats/spells", etag, **{"Accept-Encoding": "gzip"})
+    assert response.status_code == 304
+    assert response.get_etag() == (etag, False)
+
+def test_errors_are_not_tagged(client):
+    response = client.get("/characters/nobody", headers=HEADERS)
+    assert response.status_code == 404
+    assert response.get_etag() == (None, None)
+
+def pytest_sessionfinish():
+    os_getenv_patcher.stop()
+
+if __name__ == '__main__':
+    pytest.main()
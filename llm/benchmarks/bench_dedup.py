@@ -0,0 +1,50 @@
+"""
+Times NearDuplicateIndex against a pairwise Jaccard scan over the same shingles.
+
+Usage:
+    python benchmarks/bench_dedup.py [--questions 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dedup import NearDuplicateIndex, shingles, jaccard
+
+def make_questions(count, seed=0):
+    # Zipf-like vocabulary so questions share common terms the way a lecture's questions do
+    rng = random.Random(seed)
+    vocab = [f"term{n}" for n in range(3000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    return [" ".join(rng.choices(vocab, weights, k=rng.randint(6, 12))) + "?" for _ in range(count)]
+
+def pairwise(questions, threshold):
+    accepted = []
+    for question in questions:
+        shingle_set = shingles(question)
+        if all(jaccard(shingle_set, other) < threshold for other in accepted):
+            accepted.append(shingle_set)
+    return len(accepted)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=2000)
+    args = parser.parse_args()
+    questions = make_questions(args.questions)
+
+    index = NearDuplicateIndex()
+    start = time.perf_counter()
+    kept = sum(index.add(question) for question in questions)
+    elapsed = time.perf_counter() - start
+    print(f"{'NearDuplicateIndex':<20} {elapsed * 1000:>9.1f} ms {elapsed / len(questions) * 1e6:>8.1f} us/question {kept:>6} kept")
+
+    start = time.perf_counter()
+    kept = pairwise(questions, index.threshold)
+    elapsed = time.perf_counter() - start
+    print(f"{'pairwise scan':<20} {elapsed * 1000:>9.1f} ms {elapsed / len(questions) * 1e6:>8.1f} us/question {kept:>6} kept")
+
+if __name__ == "__main__":
+    main()
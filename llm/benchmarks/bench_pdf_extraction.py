@@ -0,0 +1,107 @@
+"""
+Compares PyPDFLoader.load() with the streaming extractor in pdf_text.py, from PDF to prompt chunks.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py [path/to/notes.pdf] [--pages 300] [--num-rounds 5]
+
+Without a path a synthetic text-only PDF with --pages pages is generated.
+Reports wall time and peak Python heap (tracemalloc) for each strategy,
+including the chunking that qa_app.py does on the extracted text.
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chunking import chunk_pages
+from pdf_text import stream_pages
+
+LINES_PER_PAGE = 45
+TEXT_PER_QUESTION = 4000
+DIFFICULTIES = 3
+CHUNK_TOKENS = 3000
+
+def build_pdf(num_pages):
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None]
+    kids = []
+    for page in range(num_pages):
+        lines = " T* ".join(
+            f"(Lecture {page + 1}, point {line}: the quick brown fox studies for the final exam.) Tj"
+            for line in range(LINES_PER_PAGE)
+        )
+        content = f"BT /F1 10 Tf 14 TL 50 760 Td {lines} ET".encode("latin-1")
+        page_number = len(objects) + 1
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {page_number + 1} 0 R "
+            f"/Resources << /Font << /F1 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> >> >> >>".encode("latin-1")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        kids.append(f"{page_number} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("latin-1")
+
+    pdf = io.BytesIO()
+    pdf.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(pdf.tell())
+        pdf.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = pdf.tell()
+    pdf.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        pdf.write(b"%010d 00000 n \n" % offset)
+    pdf.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return pdf.getvalue()
+
+def measure(name, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    chars = sum(len(chunk["text"]) for chunk in chunks)
+    print(f"{name:<32} {elapsed * 1000:>9.1f} ms {peak / 1024 / 1024:>9.2f} MiB peak {len(chunks):>6} chunks {chars:>10} chars")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--num-rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    path = args.path
+    if not path or os.path.getsize(path) == 0:
+        if path:
+            print(f"{path} is empty, using a synthetic PDF instead")
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(fd, "wb") as f:
+            f.write(build_pdf(args.pages))
+    print(f"{path}: {os.path.getsize(path) / 1024:.0f} KiB")
+
+    try:
+        from langchain_community.document_loaders import PyPDFLoader
+        measure("PyPDFLoader.load()", lambda: chunk_pages(
+            [page.page_content for page in PyPDFLoader(path).load()], CHUNK_TOKENS
+        ))
+    except ImportError:
+        print("langchain_community not installed, skipping PyPDFLoader")
+
+    # Pages go straight into the chunker as they are extracted, as in qa_app.read_notes
+    measure("stream_pages (all pages)", lambda: chunk_pages(
+        (page.page_content for page in stream_pages(path)), CHUNK_TOKENS
+    ))
+    target = args.num_rounds * DIFFICULTIES * TEXT_PER_QUESTION
+    measure(f"stream_pages (num_rounds={args.num_rounds})", lambda: chunk_pages(
+        (page.page_content for page in stream_pages(path, target_chars=target)), CHUNK_TOKENS
+    ))
+
+    if not args.path:
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import re
+
+# Rough English average for OpenAI tokenizers; good enough for budgeting prompts
+CHARS_PER_TOKEN = 4
+
+KEYWORD_HEADING = re.compile(r"^(chapter|section|lecture|unit|part|module|topic)\b", re.IGNORECASE)
+NUMBERED_HEADING = re.compile(r"^\d+(\.\d+)*\.?\s+[A-Za-z]")
+CAPS_HEADING = re.compile(r"^[A-Z][A-Z0-9 ,:&()\-]{3,}$")
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def is_heading(line):
+    line = line.strip()
+    if not line or len(line) > 80:
+        return False
+    return bool(KEYWORD_HEADING.match(line) or NUMBERED_HEADING.match(line) or CAPS_HEADING.match(line))
+
+def split_sections(pages):
+    """Groups the lines of all pages into sections that start at heading-like lines, yielding each as it ends."""
+    current = []
+    for page in pages:
+        for line in page.splitlines():
+            if is_heading(line) and current:
+                yield "\n".join(current)
+                current = []
+            if line.strip():
+                current.append(line)
+    if current:
+        yield "\n".join(current)
+
+def split_oversized(text, max_tokens):
+    """Splits a section that does not fit in one chunk at line boundaries, or hard-splits a huge line."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    current = ""
+    for line in text.splitlines():
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            pieces.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return pieces
+
+def chunk_pages(pages, max_tokens):
+    """
+    Packs the text of pages into chunks of at most max_tokens estimated tokens.
+
+    Whole sections are kept together where they fit, so a chunk tends to
+    cover one or a few related topics rather than an arbitrary window of text.
+    pages may be any iterable of page texts and is read once, as chunks fill
+    up, so a lazy extractor never has the whole document in memory twice.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            text = "\n".join(current)
+            chunks.append({"index": len(chunks), "text": text, "tokens": estimate_tokens(text)})
+        current = []
+        current_tokens = 0
+
+    for section in split_sections(pages):
+        pieces = [section] if estimate_tokens(section) <= max_tokens else split_oversized(section, max_tokens)
+        for piece in pieces:
+            tokens = estimate_tokens(piece) + 1
+            if current and current_tokens + tokens > max_tokens:
+                flush()
+            current.append(piece)
+            current_tokens += tokens
+    flush()
+    return chunks
+
+def allocate_questions(chunks, num_questions, max_chunks, offset=0.0):
+    """
+    Picks the chunks to generate from and how many questions each should produce.
+
+    At most min(num_questions, max_chunks) chunks are used, spread evenly over
+    the document; offset (0 <= offset < 1) shifts the picks so different
+    difficulties draw on different parts of the notes. Questions are shared
+    out in proportion to each chunk's size, with at least one per chunk.
+    Returns a list of (chunk, count) pairs.
+    """
+    if not chunks or num_questions <= 0:
+        return []
+
+    k = min(len(chunks), num_questions, max(1, max_chunks))
+    step = len(chunks) / k
+    indices = sorted({min(len(chunks) - 1, int((i + offset) * step)) for i in range(k)})
+    selected = [chunks[i] for i in indices]
+
+    total_tokens = sum(chunk["tokens"] for chunk in selected) or 1
+    spare = num_questions - len(selected)
+    shares = [spare * chunk["tokens"] / total_tokens for chunk in selected]
+    counts = [1 + int(share) for share in shares]
+
+    # Hand out what rounding left over to the chunks with the largest remainders
+    leftover = num_questions - sum(counts)
+    by_remainder = sorted(range(len(selected)), key=lambda i: shares[i] - int(shares[i]), reverse=True)
+    for i in by_remainder[:leftover]:
+        counts[i] += 1
+
+    return list(zip(selected, counts))
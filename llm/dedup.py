@@ -0,0 +1,101 @@
+import re
+import random
+import hashlib
+from collections import defaultdict
+
+# Words that carry no topic on their own; dropping them keeps "What is X?" and "Which of these is X?" close
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "by", "with", "from", "as", "and", "or",
+    "is", "are", "was", "were", "be", "been", "does", "do", "did", "which", "what", "who", "whom",
+    "when", "where", "why", "how", "following", "these", "this", "that", "those", "it", "its",
+    "can", "most", "best", "describe", "explain", "define", "true", "statement", "one"
+}
+TOKEN = re.compile(r"[a-z0-9]+")
+
+def normalize(word):
+    # Crude plural/third-person stemming so "reclaims objects" matches "reclaim object"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+def shingles(text):
+    """Content words of a question plus its ordered pairs of adjacent content words."""
+    words = [normalize(word) for word in TOKEN.findall(text.lower()) if word not in STOPWORDS]
+    words = [word for word in words if word not in STOPWORDS]
+    return set(words) | {" ".join(pair) for pair in zip(words, words[1:])}
+
+def jaccard(first, second):
+    # A question with no content words says nothing to compare, so it never duplicates another
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of question texts for rejecting reworded duplicates.
+
+    Each question is reduced to a set of shingles and a MinHash signature.
+    Signatures are split into bands and bucketed, so a lookup only compares
+    against questions that share a bucket instead of every question seen.
+    Candidates are confirmed with the exact Jaccard similarity of their
+    shingles. Pairs keep their word order, so questions that swap or
+    replace a single key term ("constant pressure" vs "constant
+    temperature", LIFO vs FIFO) stay below the default threshold of 0.75.
+    With the default 24 bands of 3 rows a pair at that threshold becomes a
+    candidate with probability above 0.99.
+    """
+
+    def __init__(self, threshold=0.75, num_perm=72, bands=24, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        # Each permutation XORs the 64-bit shingle hashes with its own random mask, which is much
+        # cheaper in Python than (a * h + b) mod p and still a bijection on the hash space
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._buckets = defaultdict(list)
+        self._shingles = []
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def signature(self, shingle_set):
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingle_set]
+        if not hashes:
+            return [0] * self.num_perm
+        return [min(map(mask.__xor__, hashes)) for mask in self._masks]
+
+    def _band_keys(self, signature):
+        return [(band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def find(self, text):
+        """Returns the index of a stored question near-duplicating text, or None."""
+        shingle_set = shingles(text)
+        return self._find(shingle_set, self._band_keys(self.signature(shingle_set)))
+
+    def _find(self, shingle_set, keys):
+        seen = set()
+        for key in keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if jaccard(shingle_set, self._shingles[candidate]) >= self.threshold:
+                    return candidate
+        return None
+
+    def add(self, text):
+        """Stores text unless it near-duplicates a stored question. Returns True if it was stored."""
+        shingle_set = shingles(text)
+        keys = self._band_keys(self.signature(shingle_set))
+        if self._find(shingle_set, keys) is not None:
+            return False
+
+        position = len(self._shingles)
+        self._shingles.append(shingle_set)
+        for key in keys:
+            self._buckets[key].append(position)
+        return True
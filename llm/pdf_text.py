@@ -0,0 +1,49 @@
+from collections import namedtuple
+from pypdf import PdfReader
+
+PageText = namedtuple("PageText", ["page", "page_content"])
+
+# Pages with less extractable text than this are treated as image-only or blank
+MIN_PAGE_CHARS = 10
+
+def stream_pages(source, max_pages=None, max_bytes=None, min_chars=MIN_PAGE_CHARS, target_chars=None, stats=None):
+    """
+    Yields the text of a PDF one page at a time.
+
+    source may be a path or a binary file object. Pages are parsed only as
+    they are reached, so stopping early (at max_pages, once max_bytes of text
+    has been produced, or once target_chars of text has been collected)
+    skips the rest of the document entirely. Pages without real text are
+    skipped. When a stats dict is passed it receives page and byte counts and
+    the reason extraction stopped.
+    """
+    stats = {} if stats is None else stats
+    stats.update({"pagesRead": 0, "pagesSkipped": 0, "textBytes": 0, "stoppedBy": None})
+
+    reader = PdfReader(source)
+    stats["totalPages"] = len(reader.pages)
+    total_chars = 0
+
+    for index in range(len(reader.pages)):
+        if max_pages is not None and index >= max_pages:
+            stats["stoppedBy"] = "maxPages"
+            return
+
+        text = reader.pages[index].extract_text() or ""
+        stats["pagesRead"] += 1
+        if len(text.strip()) < min_chars:
+            stats["pagesSkipped"] += 1
+            continue
+
+        size = len(text.encode("utf-8"))
+        if max_bytes is not None and stats["textBytes"] + size > max_bytes:
+            stats["stoppedBy"] = "maxBytes"
+            return
+
+        stats["textBytes"] += size
+        total_chars += len(text)
+        yield PageText(index, text)
+
+        if target_chars is not None and total_chars >= target_chars:
+            stats["stoppedBy"] = "enoughText"
+            return
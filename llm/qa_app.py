@@ -2,8 +2,16 @@ import os
 import json
 import openai
 import random
+import time
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader
+from qa_cache import QuestionSetCache
+from chunking import chunk_pages, allocate_questions, estimate_tokens
+from pdf_text import stream_pages
+from qa_schema import RESPONSE_FORMAT, parse_question_set
+from dedup import NearDuplicateIndex
 
 load_dotenv()
 api_key = os.getenv("OPEN_AI_KEY", None)
@@ -12,24 +20,76 @@ if api_key is None:
     raise ValueError("OPEN_AI_KEY environment variable not set.")
 
 client = openai.OpenAI(api_key=api_key)
+logger = logging.getLogger(__name__)
 
-def load_paper(file_path):
-    loader = PyPDFLoader(file_path)
-    docs = loader.load()
-    return docs
+MODEL = "gpt-4o-mini"
+# Bump whenever the prompt or output parsing changes so cached question sets are not reused
+PROMPT_VERSION = "2"
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+# Number of difficulty requests sent to the model at once; 1 runs them sequentially
+QA_CONCURRENCY = int(os.getenv("QA_CONCURRENCY", "3"))
+# Notes are split into chunks of about this many tokens; each difficulty samples at most QA_MAX_CHUNKS of them
+QA_CHUNK_TOKENS = int(os.getenv("QA_CHUNK_TOKENS", "3000"))
+QA_MAX_CHUNKS = int(os.getenv("QA_MAX_CHUNKS", "5"))
+# Limits on how much of an uploaded PDF is read; 0 for QA_TEXT_PER_QUESTION reads it all
+QA_MAX_PAGES = int(os.getenv("QA_MAX_PAGES", "500"))
+QA_MAX_TEXT_BYTES = int(os.getenv("QA_MAX_TEXT_BYTES", str(2 * 1024 * 1024)))
+QA_TEXT_PER_QUESTION = int(os.getenv("QA_TEXT_PER_QUESTION", "4000"))
+# "json" asks the model for schema-validated structured output; "text" keeps the Q1:/A)/Answer: format
+QA_OUTPUT_MODE = os.getenv("QA_OUTPUT_MODE", "json")
+# Follow-up requests per difficulty asking only for questions that were missing or malformed
+QA_TOPUP_ROUNDS = int(os.getenv("QA_TOPUP_ROUNDS", "1"))
+# Questions whose shingle Jaccard similarity to an accepted question reaches this are dropped as reworded repeats
+QA_DEDUP_THRESHOLD = float(os.getenv("QA_DEDUP_THRESHOLD", "0.75"))
+
+question_cache = QuestionSetCache(
+    os.getenv("QA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "wizdomrun_qa_cache")),
+    max_bytes=int(os.getenv("QA_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+)
+
+def load_paper(source, num_rounds=None, stats=None):
+    """Lazily yields the pages of a PDF; each page is parsed only when the consumer reaches it."""
+    # Enough text for every question of every difficulty; later pages are never parsed
+    target_chars = None
+    if num_rounds and QA_TEXT_PER_QUESTION > 0:
+        target_chars = num_rounds * len(DIFFICULTIES) * QA_TEXT_PER_QUESTION
+
+    return stream_pages(
+        source,
+        max_pages=QA_MAX_PAGES,
+        max_bytes=QA_MAX_TEXT_BYTES,
+        target_chars=target_chars,
+        stats=stats
+    )
+
+def read_notes(pages):
+    """
+    Chunks the notes while they are extracted and hashes their text on the way; returns (chunks, text_hash).
+
+    pages is consumed once, page by page, so the chunks are the only copy of
+    the text ever held: no list of pages and no joined string next to them.
+    The hash is the same question_cache.text_hash of the joined page texts.
+    """
+    hasher = question_cache.text_hasher()
+
+    def texts():
+        for page in pages:
+            hasher.update(page.page_content.encode("utf-8"))
+            yield page.page_content
+
+    chunks = chunk_pages(texts(), QA_CHUNK_TOKENS)
+    return chunks, hasher.hexdigest()
 
 def create_qa(context, num_q, difficulty, previous_questions):
     previous_questions_str = "\n".join(previous_questions) if previous_questions else "None"
-    q_a_prompt = f"""
-    Create exactly {num_q} multiple-choice questions (MCQs) based solely on the following notes:\n\n{context}\n\n
-    Each question must have exactly 4 answer choices labeled A, B, C, and D.
-    The difficulty level for all questions is: {difficulty}.
-    Do not generate additional questions beyond the specified number ({num_q}).
-    Ensure the questions:
-    - Cover different topics and sections from the entire document, not just a small portion.
-    - Are completely distinct and not reworded versions of the following previous questions:\n{previous_questions_str}\n
-    - Explore unique aspects of the content that haven’t been addressed yet.
-    - Randomize the position of the correct answer between A, B, C, and D.
+    if QA_OUTPUT_MODE == "json":
+        output_format = f"""
+    Respond with a JSON object whose "questions" array holds precisely {num_q} items. Each item has the
+    question text in "question", the four answer choices in order A to D in "options" (without letters),
+    and the letter of the correct option in "answer".
+    """
+    else:
+        output_format = f"""
     Format the output strictly as follows, with precisely {num_q} questions:
 
     Q1: <question text> ({difficulty})
@@ -41,55 +101,206 @@ def create_qa(context, num_q, difficulty, previous_questions):
 
     Ensure that the correct answer appears randomly in different options A, B, C, or D rather than just at position B. Let's begin:
     """
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": "You are a helpful research and analysis assistant"},
-                  {"role": "user", "content": q_a_prompt}]
-    )
+    q_a_prompt = f"""
+    Create exactly {num_q} multiple-choice questions (MCQs) based solely on the following notes:\n\n{context}\n\n
+    Each question must have exactly 4 answer choices labeled A, B, C, and D.
+    The difficulty level for all questions is: {difficulty}.
+    Do not generate additional questions beyond the specified number ({num_q}).
+    Ensure the questions:
+    - Cover different topics and sections from the entire document, not just a small portion.
+    - Are completely distinct and not reworded versions of the following previous questions:\n{previous_questions_str}\n
+    - Explore unique aspects of the content that haven’t been addressed yet.
+    - Randomize the position of the correct answer between A, B, C, and D.
+    {output_format}"""
+
+    request = {
+        "model": MODEL,
+        "messages": [{"role": "system", "content": "You are a helpful research and analysis assistant"},
+                     {"role": "user", "content": q_a_prompt}]
+    }
+    if QA_OUTPUT_MODE == "json":
+        request["response_format"] = RESPONSE_FORMAT
+    response = client.chat.completions.create(**request)
     return response.choices[0].message.content
 
-def run_qa_session(file_path, num_rounds, campaign_id):
-    docs = load_paper(file_path)
-    difficulties = ["Easy", "Medium", "Hard"]
-    qa_list = []
-    context = "".join([page.page_content for page in docs])
-    previous_questions = []
-
-    for round_num in range(len(difficulties)):
-        difficulty = difficulties[min(round_num, len(difficulties)-1)]
-        q_a = create_qa(context, num_rounds, difficulty, previous_questions)
-        q_a_list = q_a.strip().split("\n\n")[:num_rounds]
-
-        for qa in q_a_list:
-            lines = qa.strip().split("\n")
-            if len(lines) < 6:
-                continue
-
-            question = lines[0].split(f" ({difficulty})")[0].replace("Q", "").replace(":", "").strip()
-            question = ' '.join(question.split()[1:])
-            options = lines[1:5]
-            correct_answer = lines[5].split("Answer:")[-1].strip().upper()
-
-            if question in previous_questions:
-                continue
-
-            random.shuffle(options)
-
-            answers = []
-            for option in options:
-                option_letter = option[0]
-                option_text = option[2:].strip()
-                answers.append({
-                    "answerStr": option_text,
-                    "isCorrect": option_letter == correct_answer
-                })
-
-            qa_list.append({
-                "campaignID": campaign_id,
-                "difficulty": difficulty.lower(),
-                "questionStr": question,
-                "answers": answers
+def timed_create_qa(context, num_q, difficulty, previous_questions, stats):
+    start = time.perf_counter()
+    q_a = create_qa(context, num_q, difficulty, previous_questions)
+    elapsed = time.perf_counter() - start
+    logger.info(f"create_qa ({difficulty}) took {elapsed:.2f}s")
+    stats.setdefault("calls", []).append({
+        "difficulty": difficulty,
+        "questions": num_q,
+        "contextTokens": estimate_tokens(context),
+        "seconds": round(elapsed, 3)
+    })
+    return q_a
+
+def parse_qa(q_a, difficulty, num_rounds):
+    questions = []
+    q_a_list = q_a.strip().split("\n\n")[:num_rounds]
+
+    for qa in q_a_list:
+        lines = qa.strip().split("\n")
+        if len(lines) < 6:
+            continue
+
+        question = lines[0].split(f" ({difficulty})")[0].replace("Q", "").replace(":", "").strip()
+        question = ' '.join(question.split()[1:])
+        options = lines[1:5]
+        correct_answer = lines[5].split("Answer:")[-1].strip().upper()
+
+        random.shuffle(options)
+
+        answers = []
+        for option in options:
+            option_letter = option[0]
+            option_text = option[2:].strip()
+            answers.append({
+                "answerStr": option_text,
+                "isCorrect": option_letter == correct_answer
             })
-            previous_questions.append(question)
 
+        questions.append({
+            "difficulty": difficulty.lower(),
+            "questionStr": question,
+            "answers": answers
+        })
+
+    return questions
+
+def parse_response(q_a, difficulty, num_q):
+    # Structured responses are JSON objects; anything else is the plain text format
+    if q_a.lstrip().startswith("{"):
+        return parse_question_set(q_a, difficulty, num_q)
+    return parse_qa(q_a, difficulty, num_q)
+
+def run_top_ups(requests, chunks, question_sets, concurrency, stats):
+    """Asks for (difficulty, count) more questions each, telling the model what that difficulty already has."""
+    def request(task):
+        difficulty, count = task
+        previous_questions = [q["questionStr"] for q in question_sets[difficulty]]
+        return timed_create_qa(chunks[difficulty]["text"], count, difficulty, previous_questions, stats)
+
+    if concurrency > 1 and len(requests) > 1:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(requests))) as executor:
+            return list(executor.map(request, requests))
+    return [request(task) for task in requests]
+
+def run_qa_session(source, num_rounds, campaign_id, concurrency=None, stats=None, use_cache=True,
+                   existing_questions=None):
+    """
+    Generates num_rounds questions per difficulty from a PDF path or binary file object.
+
+    Question sets already generated for the same notes are served from
+    question_cache, and only the missing difficulties go to the model. The
+    notes are split into token-budgeted chunks and each difficulty spreads
+    its questions over a sample of them, so large PDFs stay within the
+    context limit and short campaigns do not send the whole document three
+    times. With concurrency > 1 the chunk requests are issued in parallel and
+    duplicates are dropped once all results are back. With concurrency == 1
+    they run one after another and each request is told about the questions
+    already generated. Responses are requested as schema-validated JSON (see
+    qa_schema.py).
+
+    Every question passes through a NearDuplicateIndex seeded with
+    existing_questions (the campaign's current question texts), so reworded
+    repeats within the upload or of earlier uploads are rejected. If a
+    difficulty still comes up short, up to QA_TOPUP_ROUNDS follow-up requests
+    ask for only the missing questions. Per-call timings, chunk and token
+    accounting, top-ups, rejected near-duplicates and cache hits are recorded
+    in stats when a stats dict is passed.
+    """
+    concurrency = QA_CONCURRENCY if concurrency is None else concurrency
+    stats = {} if stats is None else stats
+    start = time.perf_counter()
+
+    pages = load_paper(source, num_rounds, stats=stats.setdefault("extraction", {}))
+    chunks, text_hash = read_notes(pages)
+
+    index = NearDuplicateIndex(threshold=QA_DEDUP_THRESHOLD)
+    for question_str in existing_questions or []:
+        index.add(question_str)
+    stats["nearDuplicates"] = 0
+    question_sets = {difficulty: [] for difficulty in DIFFICULTIES}
+
+    def accept(difficulty, questions):
+        for question in questions:
+            if index.add(question["questionStr"]):
+                question_sets[difficulty].append(question)
+            else:
+                stats["nearDuplicates"] += 1
+                logger.info(f"Dropped near-duplicate {difficulty} question: {question['questionStr']}")
+
+    missing = []
+    for difficulty in DIFFICULTIES:
+        cached = question_cache.get(text_hash, num_rounds, difficulty, MODEL, PROMPT_VERSION) if use_cache else None
+        if cached is None:
+            missing.append(difficulty)
+        else:
+            accept(difficulty, cached)
+    stats["cacheHits"] = len(DIFFICULTIES) - len(missing)
+
+    # Map: each missing difficulty asks a few chunks of the notes for a share of its questions
+    allocations = {
+        difficulty: allocate_questions(
+            chunks, num_rounds, QA_MAX_CHUNKS, DIFFICULTIES.index(difficulty) / len(DIFFICULTIES)
+        )
+        for difficulty in DIFFICULTIES
+    }
+    plan = [(difficulty, chunk, count) for difficulty in missing for chunk, count in allocations[difficulty]]
+    stats["chunks"] = {
+        "total": len(chunks),
+        "documentTokens": sum(chunk["tokens"] for chunk in chunks),
+        "requests": len(plan),
+        "promptContextTokens": sum(chunk["tokens"] for _, chunk, _ in plan)
+    }
+
+    # Reduce: collect every chunk's questions under its difficulty
+    if concurrency > 1 and len(plan) > 1:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(plan))) as executor:
+            outputs = list(executor.map(
+                lambda task: timed_create_qa(task[1]["text"], task[2], task[0], None, stats),
+                plan
+            ))
+        for (difficulty, _, count), q_a in zip(plan, outputs):
+            accept(difficulty, parse_response(q_a, difficulty, count))
+    else:
+        for difficulty, chunk, count in plan:
+            previous_questions = [q["questionStr"] for d in DIFFICULTIES for q in question_sets[d]]
+            q_a = timed_create_qa(chunk["text"], count, difficulty, previous_questions, stats)
+            accept(difficulty, parse_response(q_a, difficulty, count))
+
+    # Top up: where responses came back short, malformed or duplicated, ask again for just the missing count
+    top_up_chunks = {
+        difficulty: max((chunk for chunk, _ in allocations[difficulty]), key=lambda chunk: chunk["tokens"])
+        for difficulty in DIFFICULTIES if allocations[difficulty]
+    }
+    stats["topUps"] = 0
+    for _ in range(QA_TOPUP_ROUNDS):
+        requests = [
+            (difficulty, num_rounds - len(question_sets[difficulty]))
+            for difficulty in DIFFICULTIES
+            if len(question_sets[difficulty]) < num_rounds and difficulty in top_up_chunks
+        ]
+        if not requests:
+            break
+
+        stats["topUps"] += len(requests)
+        outputs = run_top_ups(requests, top_up_chunks, question_sets, concurrency, stats)
+        for (difficulty, count), q_a in zip(requests, outputs):
+            accept(difficulty, parse_response(q_a, difficulty, count))
+
+    for difficulty in missing:
+        # Partial sets are not cached so a later upload gets another chance at a full one
+        if use_cache and len(question_sets[difficulty]) == num_rounds:
+            question_cache.put(text_hash, num_rounds, difficulty, MODEL, PROMPT_VERSION, question_sets[difficulty])
+
+    qa_list = [
+        {"campaignID": campaign_id, **question}
+        for difficulty in DIFFICULTIES
+        for question in question_sets[difficulty]
+    ]
+
+    stats["totalSeconds"] = round(time.perf_counter() - start, 3)
     return qa_list
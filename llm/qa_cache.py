@@ -0,0 +1,102 @@
+import os
+import json
+import hashlib
+import random
+import tempfile
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class QuestionSetCache:
+    """
+    On-disk cache of parsed question sets, addressed by the content they came from.
+
+    Entries are keyed by the SHA-256 of the extracted notes plus everything
+    that changes what the model would produce (question count, difficulty,
+    model and prompt version), so the same lecture PDF uploaded by different
+    students only pays for generation once. Each entry is a small JSON file;
+    once the directory grows past max_bytes the least recently used files are
+    removed.
+    """
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return bool(self.directory) and self.max_bytes > 0
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def text_hasher():
+        """Incremental text_hash: update() with the UTF-8 of each piece of the text in order, then hexdigest()."""
+        return hashlib.sha256()
+
+    def _path(self, text_hash, num_rounds, difficulty, model, prompt_version):
+        key = json.dumps([text_hash, num_rounds, difficulty.lower(), model, prompt_version])
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, text_hash, num_rounds, difficulty, model, prompt_version, reshuffle=True):
+        if not self.enabled:
+            return None
+
+        path = self._path(text_hash, num_rounds, difficulty, model, prompt_version)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                questions = json.load(f)
+            os.utime(path)  # Mark as recently used for eviction
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if reshuffle:
+            for question in questions:
+                random.shuffle(question["answers"])
+        return questions
+
+    def put(self, text_hash, num_rounds, difficulty, model, prompt_version, questions):
+        if not self.enabled:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(text_hash, num_rounds, difficulty, model, prompt_version)
+
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(questions, f)
+        os.replace(temp_path, path)
+
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".json"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
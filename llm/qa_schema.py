@@ -0,0 +1,97 @@
+import json
+import random
+import logging
+
+logger = logging.getLogger(__name__)
+
+OPTION_LETTERS = ["A", "B", "C", "D"]
+
+# JSON schema the model is held to in structured output mode
+QUESTION_SET_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "question": {"type": "string"},
+                    "options": {"type": "array", "items": {"type": "string"}},
+                    "answer": {"type": "string", "enum": OPTION_LETTERS}
+                },
+                "required": ["question", "options", "answer"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["questions"],
+    "additionalProperties": False
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "question_set", "strict": True, "schema": QUESTION_SET_SCHEMA}
+}
+
+def validate_item(item):
+    """Returns an error string for a question object that does not match the schema, else None."""
+    if not isinstance(item, dict):
+        return "question is not an object"
+
+    question = item.get("question")
+    if not isinstance(question, str) or not question.strip():
+        return "missing question text"
+
+    options = item.get("options")
+    if not isinstance(options, list) or len(options) != len(OPTION_LETTERS):
+        return f"expected {len(OPTION_LETTERS)} options"
+    if not all(isinstance(option, str) and option.strip() for option in options):
+        return "options must be non-empty strings"
+    if len({option.strip().lower() for option in options}) != len(options):
+        return "options must be distinct"
+
+    answer = item.get("answer")
+    if not isinstance(answer, str) or answer.strip().upper() not in OPTION_LETTERS:
+        return "answer must be one of A, B, C or D"
+
+    return None
+
+def parse_question_set(content, difficulty, limit):
+    """
+    Parses a structured question set response into question dicts.
+
+    Items that fail validation are dropped individually rather than failing
+    the whole response, so the caller can top up just the missing count.
+    Answers are shuffled so the correct option's position carries no signal.
+    """
+    try:
+        items = json.loads(content).get("questions")
+    except (ValueError, AttributeError):
+        logger.warning(f"Discarding unparseable {difficulty} question set")
+        return []
+    if not isinstance(items, list):
+        return []
+
+    questions = []
+    for item in items:
+        if len(questions) >= limit:
+            break
+
+        error = validate_item(item)
+        if error:
+            logger.warning(f"Discarding {difficulty} question: {error}")
+            continue
+
+        correct = OPTION_LETTERS.index(item["answer"].strip().upper())
+        answers = [
+            {"answerStr": option.strip(), "isCorrect": index == correct}
+            for index, option in enumerate(item["options"])
+        ]
+        random.shuffle(answers)
+        questions.append({
+            "difficulty": difficulty.lower(),
+            "questionStr": item["question"].strip(),
+            "answers": answers
+        })
+
+    return questions
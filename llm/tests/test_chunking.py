@@ -0,0 +1,84 @@
+# WizdomRun\llm\tests\test_chunking.py
+import sys
+import os
+import pytest
+
+# Adjust sys.path to import from WizdomRun\llm
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chunking import estimate_tokens, is_heading, split_sections, chunk_pages, allocate_questions
+
+def make_pages(sections, lines_per_section=20):
+    text = []
+    for i in range(sections):
+        text.append(f"{i + 1}. Topic {i + 1}")
+        text.extend(f"Sentence {j} about topic {i + 1} with some filler words." for j in range(lines_per_section))
+    return ["\n".join(text)]
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+def test_is_heading():
+    assert is_heading("Chapter 3: Photosynthesis")
+    assert is_heading("2.1 Light reactions")
+    assert is_heading("CELL STRUCTURE")
+    assert not is_heading("The cell membrane controls what enters the cell.")
+    assert not is_heading("")
+
+def test_split_sections_across_pages():
+    pages = ["Lecture 1\nIntro text", "more intro\nLecture 2\nSecond topic"]
+    assert list(split_sections(pages)) == ["Lecture 1\nIntro text\nmore intro", "Lecture 2\nSecond topic"]
+
+def test_small_document_is_one_chunk():
+    chunks = chunk_pages(["Sample content"], max_tokens=3000)
+    assert len(chunks) == 1
+    assert chunks[0]["text"] == "Sample content"
+
+def test_chunks_respect_budget_and_keep_sections_whole():
+    pages = make_pages(sections=10)
+    chunks = chunk_pages(pages, max_tokens=400)
+    assert len(chunks) > 1
+    assert all(chunk["tokens"] <= 400 for chunk in chunks)
+    for chunk in chunks:
+        assert chunk["text"].split("\n")[0].endswith(tuple(f"Topic {i + 1}" for i in range(10)))
+    assert sum(chunk["text"].count("Sentence") for chunk in chunks) == 200
+
+def test_oversized_section_is_split():
+    pages = make_pages(sections=1, lines_per_section=200)
+    chunks = chunk_pages(pages, max_tokens=300)
+    assert len(chunks) > 1
+    assert all(chunk["tokens"] <= 300 for chunk in chunks)
+
+def test_huge_line_is_hard_split():
+    chunks = chunk_pages(["x" * 10000], max_tokens=500)
+    assert all(chunk["tokens"] <= 500 for chunk in chunks)
+    assert sum(len(chunk["text"]) for chunk in chunks) == 10000
+
+def test_allocate_questions_sums_to_requested():
+    chunks = [{"index": i, "text": "t", "tokens": 100 * (i + 1)} for i in range(20)]
+    for num_questions in (1, 5, 10, 15):
+        allocation = allocate_questions(chunks, num_questions, max_chunks=5)
+        assert sum(count for _, count in allocation) == num_questions
+        assert len(allocation) == min(num_questions, 5)
+        assert all(count >= 1 for _, count in allocation)
+
+def test_allocate_questions_proportional_to_size():
+    chunks = [{"index": 0, "text": "a", "tokens": 900}, {"index": 1, "text": "b", "tokens": 100}]
+    allocation = allocate_questions(chunks, 10, max_chunks=5)
+    assert [count for _, count in allocation] == [8, 2]
+
+def test_allocate_questions_offset_spreads_picks():
+    chunks = [{"index": i, "text": "t", "tokens": 100} for i in range(9)]
+    picks = [
+        [chunk["index"] for chunk, _ in allocate_questions(chunks, 3, max_chunks=3, offset=offset)]
+        for offset in (0, 1 / 3, 2 / 3)
+    ]
+    assert picks == [[0, 3, 6], [1, 4, 7], [2, 5, 8]]
+
+def test_allocate_questions_empty():
+    assert allocate_questions([], 5, max_chunks=5) == []
+
+if __name__ == '__main__':
+    pytest.main()
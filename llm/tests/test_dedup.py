@@ -0,0 +1,78 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dedup import NearDuplicateIndex, shingles, jaccard
+
+def test_shingles_drop_stopwords_and_punctuation():
+    assert shingles("What is the Capital of France?") == {"capital", "france", "capital france"}
+
+def test_jaccard():
+    assert jaccard({"a", "b"}, {"b", "c"}) == pytest.approx(1 / 3)
+    assert jaccard(set(), set()) == 0.0
+    assert jaccard({"a"}, set()) == 0.0
+
+def test_shingles_keep_word_order_in_pairs():
+    assert shingles("Stack before queue") != shingles("Queue before stack")
+
+def test_add_rejects_reworded_question():
+    index = NearDuplicateIndex()
+    assert index.add("Which city is the capital of France?")
+    assert not index.add("What city is the capital of France?")
+    assert not index.add("WHICH CITY IS THE CAPITAL OF FRANCE")
+    assert len(index) == 1
+
+def test_add_keeps_distinct_questions():
+    index = NearDuplicateIndex()
+    questions = [
+        "What is a stack?",
+        "What is a queue?",
+        "What is the time complexity of quicksort?",
+        "What is the time complexity of mergesort?",
+        "Which protocol guarantees in-order delivery?"
+    ]
+    assert all(index.add(question) for question in questions)
+    assert len(index) == len(questions)
+
+def test_add_keeps_contrasting_near_misses():
+    pairs = [
+        ("Which data structure uses LIFO ordering?", "Which data structure uses FIFO ordering?"),
+        ("How are pressure and volume related at constant temperature?",
+         "How are volume and temperature related at constant pressure?"),
+        ("What is the time complexity of quicksort?", "What is the worst-case time complexity of quicksort?")
+    ]
+    for first, second in pairs:
+        index = NearDuplicateIndex()
+        assert index.add(first)
+        assert index.add(second), second
+
+def test_add_keeps_questions_without_content_words():
+    index = NearDuplicateIndex()
+    assert index.add("What is it?")
+    assert index.add("Which one is true?")
+    assert len(index) == 2
+
+def test_find_returns_matching_position():
+    index = NearDuplicateIndex()
+    index.add("What is a stack?")
+    index.add("Explain how garbage collection reclaims unreachable objects.")
+    assert index.find("How does garbage collection reclaim unreachable objects?") == 1
+    assert index.find("What is a heap?") is None
+
+def test_threshold_is_configurable():
+    loose = NearDuplicateIndex(threshold=0.7)
+    assert loose.add("What is the time complexity of quicksort?")
+    assert not loose.add("What is the average time complexity of quicksort?")
+
+    index = NearDuplicateIndex()
+    assert index.add("What is the time complexity of quicksort?")
+    assert index.add("What is the average time complexity of quicksort?")
+
+def test_num_perm_must_split_into_bands():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=10, bands=3)
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,87 @@
+# WizdomRun\llm\tests\test_pdf_text.py
+import sys
+import os
+import io
+import pytest
+
+# Adjust sys.path to import from WizdomRun\llm
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pdf_text import stream_pages
+
+def make_pdf(page_texts):
+    """Builds a minimal PDF with one Helvetica text line per page (None for a page with no text)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None]
+    kids = []
+    for text in page_texts:
+        page_number = len(objects) + 1
+        content = b"" if text is None else f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {page_number + 1} 0 R "
+            f"/Resources << /Font << /F1 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> >> >> >>".encode("latin-1")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        kids.append(f"{page_number} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("latin-1")
+
+    pdf = io.BytesIO()
+    pdf.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(pdf.tell())
+        pdf.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = pdf.tell()
+    pdf.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        pdf.write(b"%010d 00000 n \n" % offset)
+    pdf.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return pdf.getvalue()
+
+def test_stream_pages_yields_text_per_page():
+    pdf = io.BytesIO(make_pdf([f"Page {i} has some notes" for i in range(3)]))
+    pages = list(stream_pages(pdf))
+    assert [page.page for page in pages] == [0, 1, 2]
+    assert "Page 1 has some notes" in pages[1].page_content
+
+def test_stream_pages_accepts_a_path(tmp_path):
+    path = tmp_path / "notes.pdf"
+    path.write_bytes(make_pdf(["Sample content for a path"]))
+    assert len(list(stream_pages(str(path)))) == 1
+
+def test_stream_pages_skips_empty_pages():
+    stats = {}
+    pdf = io.BytesIO(make_pdf(["First page of notes", None, "x", "Fourth page of notes"]))
+    pages = list(stream_pages(pdf, stats=stats))
+    assert [page.page for page in pages] == [0, 3]
+    assert stats["pagesSkipped"] == 2
+
+def test_stream_pages_is_lazy():
+    pdf = io.BytesIO(make_pdf([f"Page {i} has some notes" for i in range(5)]))
+    pages = stream_pages(pdf)
+    assert next(pages).page == 0
+
+def test_stream_pages_page_cap():
+    stats = {}
+    pdf = io.BytesIO(make_pdf([f"Page {i} has some notes" for i in range(5)]))
+    assert len(list(stream_pages(pdf, max_pages=2, stats=stats))) == 2
+    assert stats["stoppedBy"] == "maxPages"
+    assert stats["totalPages"] == 5
+
+def test_stream_pages_byte_cap():
+    stats = {}
+    pdf = io.BytesIO(make_pdf([f"Page {i} has some notes" for i in range(5)]))
+    pages = list(stream_pages(pdf, max_bytes=50, stats=stats))
+    assert len(pages) == 2
+    assert stats["textBytes"] <= 50
+    assert stats["stoppedBy"] == "maxBytes"
+
+def test_stream_pages_stops_once_enough_text():
+    stats = {}
+    pdf = io.BytesIO(make_pdf([f"Page {i} has some notes" for i in range(5)]))
+    pages = list(stream_pages(pdf, target_chars=30, stats=stats))
+    assert len(pages) == 2
+    assert stats["pagesRead"] == 2
+    assert stats["stoppedBy"] == "enoughText"
+
+if __name__ == '__main__':
+    pytest.main()
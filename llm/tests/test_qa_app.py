@@ -49,6 +49,15 @@ def setup_test_pdf():
     if os.path.exists(test_pdf_path):
         os.remove(test_pdf_path)
 
+@pytest.fixture(autouse=True)
+def isolated_question_cache(tmp_path):
+    # Keep generated question sets from leaking between tests through the on-disk cache
+    os.environ.setdefault("OPEN_AI_KEY", "test_key")
+    import qa_app
+    from qa_cache import QuestionSetCache
+    with patch.object(qa_app, "question_cache", QuestionSetCache(str(tmp_path / "qa_cache"))):
+        yield
+
 @pytest.fixture
 def setup_env():
     os.environ["OPEN_AI_KEY"] = "test_key"
@@ -58,7 +67,7 @@ def setup_env():
 def test_load_paper(setup_env, setup_test_pdf):
     from qa_app import load_paper
     test_pdf_path = os.path.join(os.path.dirname(__file__), "test.pdf")
-    result = load_paper(test_pdf_path)
+    result = list(load_paper(test_pdf_path))
     assert len(result) > 0  # Should load at least one page
     assert "Sample content" in result[0].page_content  # Check extracted text
 
@@ -82,11 +91,13 @@ def test_run_qa_session_all_difficulties(setup_env):
     with patch('qa_app.load_paper') as mock_load, \
          patch('qa_app.create_qa') as mock_create:
         mock_load.return_value = [MagicMock(page_content="Test content")]
-        mock_create.side_effect = [
-            "Q1: Easy Q? (Easy)\nA) A\nB) B\nC) C\nD) D\nAnswer: B",
-            "Q1: Med Q? (Medium)\nA) A\nB) B\nC) C\nD) D\nAnswer: C",
-            "Q1: Hard Q? (Hard)\nA) A\nB) B\nC) C\nD) D\nAnswer: D"
-        ]
+        outputs = {
+            "Easy": "Q1: Easy Q? (Easy)\nA) A\nB) B\nC) C\nD) D\nAnswer: B",
+            "Medium": "Q1: Med Q? (Medium)\nA) A\nB) B\nC) C\nD) D\nAnswer: C",
+            "Hard": "Q1: Hard Q? (Hard)\nA) A\nB) B\nC) C\nD) D\nAnswer: D"
+        }
+        # Difficulties may be requested in any order when generated in parallel
+        mock_create.side_effect = lambda context, num_q, difficulty, previous: outputs[difficulty]
         result = run_qa_session("fake_path.pdf", 1, "campaign123")
         assert len(result) == 3
         assert result[0]["difficulty"] == "easy"
@@ -107,5 +118,241 @@ def test_run_qa_session_invalid_output(setup_env):
         result = run_qa_session("fake_path.pdf", 1, "campaign123")
         assert len(result) == 0  # Should skip malformed QA
 
+def test_run_qa_session_parallel_dedups_after_results(setup_env):
+    from qa_app import run_qa_session
+    with patch('qa_app.load_paper') as mock_load, \
+         patch('qa_app.create_qa') as mock_create:
+        mock_load.return_value = [MagicMock(page_content="Test content")]
+        mock_create.side_effect = lambda context, num_q, difficulty, previous: (
+            f"Q1: Same Q? ({difficulty})\nA) A\nB) B\nC) C\nD) D\nAnswer: A"
+        )
+        stats = {}
+        result = run_qa_session("fake_path.pdf", 1, "campaign123", concurrency=3, stats=stats)
+        assert len(result) == 1
+        assert result[0]["difficulty"] == "easy"
+        # Three parallel requests, then a top-up each for the two difficulties whose question was a repeat
+        assert mock_create.call_count == 5
+        assert [call.args[3] for call in mock_create.call_args_list].count(None) == 3
+        assert stats["topUps"] == 2
+        assert stats["nearDuplicates"] == 4
+        assert sorted(call["difficulty"] for call in stats["calls"]) == ["Easy", "Hard", "Hard", "Medium", "Medium"]
+        assert "totalSeconds" in stats
+
+def test_run_qa_session_parallel_overlaps_calls(setup_env):
+    import threading
+    from qa_app import run_qa_session
+    barrier = threading.Barrier(3, timeout=5)
+
+    def create(context, num_q, difficulty, previous):
+        barrier.wait()  # Only returns once all three requests are in flight
+        return f"Q1: {difficulty} Q? ({difficulty})\nA) A\nB) B\nC) C\nD) D\nAnswer: A"
+
+    with patch('qa_app.load_paper') as mock_load, \
+         patch('qa_app.create_qa', side_effect=create):
+        mock_load.return_value = [MagicMock(page_content="Test content")]
+        result = run_qa_session("fake_path.pdf", 1, "campaign123", concurrency=3)
+        assert [q["difficulty"] for q in result] == ["easy", "medium", "hard"]
+
+def test_run_qa_session_sequential_passes_previous_questions(setup_env):
+    from qa_app import run_qa_session
+    seen = []
+
+    def create(context, num_q, difficulty, previous):
+        seen.append((difficulty, list(previous)))
+        return f"Q1: {difficulty} Q? ({difficulty})\nA) A\nB) B\nC) C\nD) D\nAnswer: A"
+
+    with patch('qa_app.load_paper') as mock_load, \
+         patch('qa_app.create_qa', side_effect=create):
+        mock_load.return_value = [MagicMock(page_content="Test content")]
+        result = run_qa_session("fake_path.pdf", 1, "campaign123", concurrency=1)
+        assert len(result) == 3
+        assert seen == [("Easy", []), ("Medium", ["Easy ?"]), ("Hard", ["Easy ?", "Medium ?"])]
+
+def test_run_qa_session_reuses_cached_question_sets(setup_env):
+    from qa_app import run_qa_session
+    with patch('qa_app.load_paper') as mock_load, \
+         patch('qa_app.create_qa') as mock_create:
+        mock_load.return_value = [MagicMock(page_content="Lecture 1 notes")]
+        mock_create.side_effect = lambda context, num_q, difficulty, previous: (
+            f"Q1: {difficulty} Q? ({difficulty})\nA) A\nB) B\nC) C\nD) D\nAnswer: A"
+        )
+        first = run_qa_session("fake_path.pdf", 1, "campaign1")
+        assert mock_create.call_count == 3
+
+        stats = {}
+        second = run_qa_session("other_upload.pdf", 1, "campaign2", stats=stats)
+        assert mock_create.call_count == 3
+        assert stats["cacheHits"] == 3
+        assert [q["questionStr"] for q in second] == [q["questionStr"] for q in first]
+        assert all(q["campaignID"] == "campaign2" for q in second)
+        assert all(sum(a["isCorrect"] for a in q["answers"]) == 1 for q in second)
+
+        run_qa_session("fake_path.pdf", 2, "campaign3")
+        # Different question count is a different cache entry; the mock's single question also triggers a top-up each
+        assert mock_create.call_count == 9
+
+def test_run_qa_session_only_generates_missing_difficulties(setup_env):
+    import qa_app
+    from qa_app import run_qa_session
+    cached = [{"difficulty": "easy", "questionStr": "Cached Q", "answers": [{"answerStr": "A", "isCorrect": True}]}]
+    qa_app.question_cache.put(
+        qa_app.question_cache.text_hash("Lecture 2 notes"), 1, "Easy", qa_app.MODEL, qa_app.PROMPT_VERSION, cached
+    )
+    with patch('qa_app.load_paper') as mock_load, \
+         patch('qa_app.create_qa') as mock_create:
+        mock_load.return_value = [MagicMock(page_content="Lecture 2 notes")]
+        mock_create.side_effect = lambda context, num_q, difficulty, previous: (
+            f"Q1: {difficulty} Q? ({difficulty})\nA) A\nB) B\nC) C\nD) D\nAnswer: A"
+        )
+        result = run_qa_session("fake_path.pdf", 1, "campaign1")
+        assert sorted(call.args[2] for call in mock_create.call_args_list) == ["Hard", "Medium"]
+        assert [q["questionStr"] for q in result] == ["Cached Q", "Medium ?", "Hard ?"]
+
+def test_read_notes_chunks_pages_as_they_are_extracted(setup_env):
+    import qa_app
+    consumed = []
+
+    def pages():
+        for text in ("1. Intro\nFirst page.", "2. Method\nSecond page."):
+            consumed.append(text)
+            yield MagicMock(page_content=text)
+
+    chunks, text_hash = qa_app.read_notes(pages())
+    assert len(consumed) == 2
+    assert "First page." in chunks[0]["text"] and "Second page." in chunks[-1]["text"]
+    # Same cache key as hashing the joined text, so existing cached sets still hit
+    assert text_hash == qa_app.question_cache.text_hash("1. Intro\nFirst page.2. Method\nSecond page.")
+
+def test_run_qa_session_does_not_cache_partial_sets(setup_env):
+    from qa_app import run_qa_session
+    with patch('qa_app.load_paper') as mock_load, \
+         patch('qa_app.create_qa') as mock_create:
+        mock_load.return_value = [MagicMock(page_content="Lecture 3 notes")]
+        mock_create.return_value = "Q1: Bad Q? (Easy)\nA) A\nB) B\n"
+        run_qa_session("fake_path.pdf", 1, "campaign1")
+        run_qa_session("fake_path.pdf", 1, "campaign1")
+        assert mock_create.call_count == 12  # One request plus one top-up per difficulty, each time
+
+def test_run_qa_session_map_reduces_large_notes(setup_env):
+    import re
+    import qa_app
+    from qa_app import run_qa_session
+    sections = []
+    for i in range(12):
+        sections.append(f"{i + 1}. Topic {i + 1}")
+        sections.extend(f"Detail {j} of topic {i + 1}." for j in range(40))
+    pages = [MagicMock(page_content="\n".join(sections))]
+
+    def create(context, num_q, difficulty, previous):
+        topic = re.search(r"Topic (\d+)", context).group(1)
+        return "\n\n".join(
+            f"Q{n + 1}: What explains {difficulty}{topic}x{n} in terms of idea{difficulty}{topic}x{n}? ({difficulty})\nA) A\nB) B\nC) C\nD) D\nAnswer: A"
+            for n in range(num_q)
+        )
+
+    with patch('qa_app.load_paper', return_value=pages), \
+         patch('qa_app.create_qa', side_effect=create) as mock_create, \
+         patch.object(qa_app, "QA_CHUNK_TOKENS", 300):
+        stats = {}
+        result = run_qa_session("fake_path.pdf", 5, "campaign123", stats=stats)
+
+    assert len(result) == 15
+    assert stats["chunks"]["total"] > 5
+    assert stats["chunks"]["requests"] == mock_create.call_count == 15
+    assert stats["chunks"]["promptContextTokens"] < 3 * stats["chunks"]["documentTokens"]
+    assert all(call["contextTokens"] <= 300 for call in stats["calls"])
+    for difficulty in ("easy", "medium", "hard"):
+        assert len({q["questionStr"] for q in result if q["difficulty"] == difficulty}) == 5
+
+def test_create_qa_requests_structured_output(setup_env):
+    import qa_app
+    from qa_app import create_qa
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(message=MagicMock(content='{"questions": []}'))]
+    with patch('qa_app.client.chat.completions.create', return_value=mock_response) as mock_completion, \
+         patch.object(qa_app, "QA_OUTPUT_MODE", "json"):
+        assert create_qa("Test context", 2, "Hard", None) == '{"questions": []}'
+    kwargs = mock_completion.call_args.kwargs
+    assert kwargs["response_format"]["json_schema"]["name"] == "question_set"
+    assert "JSON object" in kwargs["messages"][1]["content"]
+
+def test_run_qa_session_parses_structured_output(setup_env):
+    import json
+    from qa_app import run_qa_session
+
+    def create(context, num_q, difficulty, previous):
+        return json.dumps({"questions": [
+            {"question": f"{difficulty} question {n}?", "options": ["W", "X", "Y", "Z"], "answer": "C"}
+            for n in range(num_q)
+        ]})
+
+    with patch('qa_app.load_paper') as mock_load, \
+         patch('qa_app.create_qa', side_effect=create):
+        mock_load.return_value = [MagicMock(page_content="Lecture 4 notes")]
+        result = run_qa_session("fake_path.pdf", 2, "campaign1")
+    assert [q["questionStr"] for q in result] == [
+        "Easy question 0?", "Easy question 1?", "Medium question 0?", "Medium question 1?",
+        "Hard question 0?", "Hard question 1?"
+    ]
+    assert all([a["answerStr"] for a in q["answers"] if a["isCorrect"]] == ["Y"] for q in result)
+
+def test_run_qa_session_tops_up_missing_questions(setup_env):
+    import json
+    from qa_app import run_qa_session
+    seen = []
+
+    def create(context, num_q, difficulty, previous):
+        seen.append((difficulty, num_q, list(previous or [])))
+        if num_q < 3:
+            items = [{"question": f"{difficulty} extra {n}?", "options": ["A", "B", "C", "D"], "answer": "A"} for n in range(num_q)]
+        else:
+            # Three questions asked for, one malformed and one missing
+            items = [
+                {"question": f"{difficulty} first?", "options": ["A", "B", "C", "D"], "answer": "A"},
+                {"question": f"{difficulty} broken?", "options": ["A", "B"], "answer": "A"}
+            ]
+        return json.dumps({"questions": items})
+
+    with patch('qa_app.load_paper') as mock_load, \
+         patch('qa_app.create_qa', side_effect=create):
+        mock_load.return_value = [MagicMock(page_content="Lecture 5 notes")]
+        stats = {}
+        result = run_qa_session("fake_path.pdf", 3, "campaign1", concurrency=1, stats=stats)
+
+    assert len(result) == 9
+    assert stats["topUps"] == 3
+    assert ("Easy", 2, ["Easy first?"]) in seen
+    assert [q["questionStr"] for q in result if q["difficulty"] == "hard"] == ["Hard first?", "Hard extra 0?", "Hard extra 1?"]
+
+def test_run_qa_session_rejects_reworded_duplicates(setup_env):
+    import json
+    from qa_app import run_qa_session
+    texts = {
+        "Easy": ["Which city is the capital of France?", "What is a stack?"],
+        "Medium": ["What city is the capital of France?", "What is a binary search tree?"],
+        "Hard": ["Why does quicksort degrade on sorted input?", "Explain amortized analysis of dynamic arrays."]
+    }
+
+    def create(context, num_q, difficulty, previous):
+        items = [{"question": text, "options": ["A", "B", "C", "D"], "answer": "A"} for text in texts[difficulty]]
+        return json.dumps({"questions": items[:num_q]})
+
+    with patch('qa_app.load_paper') as mock_load, \
+         patch('qa_app.create_qa', side_effect=create):
+        mock_load.return_value = [MagicMock(page_content="Lecture 6 notes")]
+        stats = {}
+        result = run_qa_session(
+            "fake_path.pdf", 2, "campaign1", stats=stats,
+            existing_questions=["Explain the amortized analysis of a dynamic array."]
+        )
+
+    assert [q["questionStr"] for q in result] == [
+        "Which city is the capital of France?", "What is a stack?",
+        "What is a binary search tree?",
+        "Why does quicksort degrade on sorted input?"
+    ]
+    assert stats["nearDuplicates"] >= 2
+    assert stats["topUps"] == 2
+
 if __name__ == '__main__':
     pytest.main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+# WizdomRun\llm\tests\test_qa_cache.py
+import sys
+import os
+import pytest
+
+# Adjust sys.path to import from WizdomRun\llm
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from qa_cache import QuestionSetCache
+
+def make_questions(n, difficulty="easy"):
+    return [
+        {
+            "difficulty": difficulty,
+            "questionStr": f"Question {i}",
+            "answers": [
+                {"answerStr": "Right", "isCorrect": True},
+                {"answerStr": "Wrong 1", "isCorrect": False},
+                {"answerStr": "Wrong 2", "isCorrect": False},
+                {"answerStr": "Wrong 3", "isCorrect": False}
+            ]
+        }
+        for i in range(n)
+    ]
+
+@pytest.fixture
+def cache(tmp_path):
+    return QuestionSetCache(str(tmp_path))
+
+def test_miss_then_hit(cache):
+    text_hash = cache.text_hash("notes")
+    assert cache.get(text_hash, 5, "Easy", "gpt-4o-mini", "1") is None
+    cache.put(text_hash, 5, "Easy", "gpt-4o-mini", "1", make_questions(5))
+    result = cache.get(text_hash, 5, "Easy", "gpt-4o-mini", "1", reshuffle=False)
+    assert result == make_questions(5)
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+def test_key_includes_every_generation_input(cache):
+    text_hash = cache.text_hash("notes")
+    cache.put(text_hash, 5, "Easy", "gpt-4o-mini", "1", make_questions(5))
+    assert cache.get(cache.text_hash("other notes"), 5, "Easy", "gpt-4o-mini", "1") is None
+    assert cache.get(text_hash, 10, "Easy", "gpt-4o-mini", "1") is None
+    assert cache.get(text_hash, 5, "Hard", "gpt-4o-mini", "1") is None
+    assert cache.get(text_hash, 5, "Easy", "gpt-4o", "1") is None
+    assert cache.get(text_hash, 5, "Easy", "gpt-4o-mini", "2") is None
+
+def test_reshuffle_keeps_correct_answer(cache):
+    text_hash = cache.text_hash("notes")
+    cache.put(text_hash, 20, "Easy", "gpt-4o-mini", "1", make_questions(20))
+    result = cache.get(text_hash, 20, "Easy", "gpt-4o-mini", "1")
+    for question in result:
+        assert sorted(a["answerStr"] for a in question["answers"]) == ["Right", "Wrong 1", "Wrong 2", "Wrong 3"]
+        assert [a["answerStr"] for a in question["answers"] if a["isCorrect"]] == ["Right"]
+
+def test_evicts_least_recently_used(tmp_path):
+    probe = QuestionSetCache(str(tmp_path / "probe"))
+    probe.put("probe", 1, "Easy", "m", "1", make_questions(1))
+    entry_size = os.path.getsize(os.path.join(probe.directory, os.listdir(probe.directory)[0]))
+
+    cache = QuestionSetCache(str(tmp_path / "cache"), max_bytes=entry_size * 2)
+    cache.put("a", 1, "Easy", "m", "1", make_questions(1))
+    cache.put("b", 1, "Easy", "m", "1", make_questions(1))
+    os.utime(cache._path("a", 1, "Easy", "m", "1"), (1, 1))
+    os.utime(cache._path("b", 1, "Easy", "m", "1"), (2, 2))
+    cache.get("a", 1, "Easy", "m", "1")  # Touching "a" makes "b" the oldest entry
+    cache.put("c", 1, "Easy", "m", "1", make_questions(1))
+
+    assert cache.get("a", 1, "Easy", "m", "1") is not None
+    assert cache.get("b", 1, "Easy", "m", "1") is None
+    assert cache.get("c", 1, "Easy", "m", "1") is not None
+
+def test_disabled_cache(tmp_path):
+    cache = QuestionSetCache(str(tmp_path), max_bytes=0)
+    cache.put("a", 1, "Easy", "m", "1", make_questions(1))
+    assert cache.get("a", 1, "Easy", "m", "1") is None
+    assert os.listdir(tmp_path) == []
+
+if __name__ == '__main__':
+    pytest.main()
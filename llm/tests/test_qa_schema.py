@@ -0,0 +1,47 @@
+import sys
+import os
+import json
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from qa_schema import parse_question_set, validate_item
+
+def make_item(**overrides):
+    item = {"question": "What is 2+2?", "options": ["3", "4", "5", "6"], "answer": "B"}
+    item.update(overrides)
+    return item
+
+def test_parse_question_set():
+    content = json.dumps({"questions": [make_item()]})
+    questions = parse_question_set(content, "Easy", 5)
+    assert len(questions) == 1
+    assert questions[0]["difficulty"] == "easy"
+    assert questions[0]["questionStr"] == "What is 2+2?"
+    assert sorted(a["answerStr"] for a in questions[0]["answers"]) == ["3", "4", "5", "6"]
+    assert [a["answerStr"] for a in questions[0]["answers"] if a["isCorrect"]] == ["4"]
+
+def test_parse_question_set_drops_invalid_items():
+    content = json.dumps({"questions": [
+        make_item(options=["3", "4"]),
+        make_item(answer="E"),
+        make_item(question=" "),
+        make_item(options=["4", "4", "5", "6"]),
+        make_item(question="Valid?")
+    ]})
+    assert [q["questionStr"] for q in parse_question_set(content, "Medium", 5)] == ["Valid?"]
+
+def test_parse_question_set_respects_limit():
+    content = json.dumps({"questions": [make_item(question=f"Q{n}?") for n in range(4)]})
+    assert [q["questionStr"] for q in parse_question_set(content, "Hard", 2)] == ["Q0?", "Q1?"]
+
+@pytest.mark.parametrize("content", ["not json", "[]", '{"questions": "none"}', "{}"])
+def test_parse_question_set_malformed_response(content):
+    assert parse_question_set(content, "Easy", 3) == []
+
+def test_validate_item_accepts_lowercase_answer():
+    assert validate_item(make_item(answer="d")) is None
+    assert validate_item("question") == "question is not an object"
+
+if __name__ == '__main__':
+    pytest.main()
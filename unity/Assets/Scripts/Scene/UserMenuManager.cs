@@ -232,12 +232,10 @@ public class UserMenuManager : MonoBehaviour
             {
                 Debug.Log("PDF processed and questions created successfully.");
 
-                StartCoroutine(questionService.GetQuestions(campaignID, firebaseToken, (List<QuestionService.Question> serviceQuestions) =>
+                StartCoroutine(questionService.GetQuestionBundle(campaignID, firebaseToken, (List<QuestionService.Question> serviceQuestions) =>
                 {
-                    StartCoroutine(ProcessQuestions(serviceQuestions, firebaseToken, () =>
-                    {
-                        questionsLoaded = true;
-                    }));
+                    ProcessQuestions(serviceQuestions);
+                    questionsLoaded = true;
                 },
                 (string error) =>
                 {
@@ -262,7 +260,7 @@ public class UserMenuManager : MonoBehaviour
         CampaignManager.Instance.LoadMappedLevel();
     }
 
-    private IEnumerator ProcessQuestions(List<QuestionService.Question> serviceQuestions, string firebaseToken, System.Action onComplete)
+    private void ProcessQuestions(List<QuestionService.Question> serviceQuestions)
     {
         List<Question> globalQuestions = new List<Question>();
 
@@ -275,44 +273,33 @@ public class UserMenuManager : MonoBehaviour
             q.GotCorrect = sq.gotCorrect;
             q.WrongAttempts = sq.wrongAttempts;
             q.QuestionStr = sq.questionStr;
-            q.AnswerList = new List<Answer>();
-
-            yield return StartCoroutine(GetAnswersForQuestion(sq.questionID, firebaseToken, (List<Answer> answers) =>
-            {
-                q.AnswerList = answers;
-            }));
+            q.AnswerList = ConvertAnswers(sq.answerList);
 
             globalQuestions.Add(q);
         }
 
         CampaignManager.Instance.currCampaign.QuestionList = globalQuestions;
         Debug.Log("Campaign populated with " + globalQuestions.Count + " questions.");
-        onComplete?.Invoke();
     }
 
-    /// Helper function that uses the GetAnswers endpoint to fetch answers for a specific question.
-    private IEnumerator GetAnswersForQuestion(int questionID, string firebaseToken, System.Action<List<Answer>> onAnswers)
+    /// Converts the answers nested in a question bundle into game answers.
+    private List<Answer> ConvertAnswers(List<QuestionService.Answer> serviceAnswers)
     {
         List<Answer> globalAnswers = new List<Answer>();
+        if (serviceAnswers == null)
+            return globalAnswers;
 
-        yield return StartCoroutine(questionService.GetAnswers(questionID, firebaseToken, (List<QuestionService.Answer> serviceAnswers) =>
-        {
-            foreach (var sa in serviceAnswers)
-            {
-                Answer a = new Answer();
-                a.AnswerID = sa.answerID;
-                a.QuestionID = sa.questionID;
-                a.AnswerStr = sa.answerStr;
-                a.IsCorrect = sa.isCorrect;
-                globalAnswers.Add(a);
-            }
-        },
-        (string error) =>
+        foreach (var sa in serviceAnswers)
         {
-            Debug.LogError("Error fetching answers for question " + questionID + ": " + error);
-        }));
+            Answer a = new Answer();
+            a.AnswerID = sa.answerID;
+            a.QuestionID = sa.questionID;
+            a.AnswerStr = sa.answerStr;
+            a.IsCorrect = sa.isCorrect;
+            globalAnswers.Add(a);
+        }
 
-        onAnswers?.Invoke(globalAnswers);
+        return globalAnswers;
     }
 
     public void OnQuestSelected() { LengthPress(CampaignLength.QUEST); }
@@ -394,7 +381,7 @@ public class UserMenuManager : MonoBehaviour
         yield return StartCoroutine(CampaignManager.Instance.GetCampaignAndSetCurrent(campaignID));
 
         List<QuestionService.Question> serviceQuestions = null;
-        yield return StartCoroutine(questionService.GetQuestions(campaignID, firebaseToken,
+        yield return StartCoroutine(questionService.GetQuestionBundle(campaignID, firebaseToken,
             (List<QuestionService.Question> questions) =>
             {
                 serviceQuestions = questions;
@@ -405,28 +392,7 @@ public class UserMenuManager : MonoBehaviour
             }
         ));
 
-        List<Question> globalQuestions = new List<Question>();
-        foreach (var sq in serviceQuestions)
-        {
-            Question q = new Question();
-            q.QuestionID = sq.questionID;
-            q.CampaignID = sq.campaignID;
-            q.Difficulty = (QuestionDifficulty)System.Enum.Parse(typeof(QuestionDifficulty), sq.difficulty, true);
-            q.GotCorrect = sq.gotCorrect;
-            q.WrongAttempts = sq.wrongAttempts;
-            q.QuestionStr = sq.questionStr;
-            q.AnswerList = new List<Answer>();
-
-            yield return StartCoroutine(GetAnswersForQuestion(sq.questionID, firebaseToken, (List<Answer> answers) =>
-            {
-                q.AnswerList = answers;
-            }));
-
-            globalQuestions.Add(q);
-        }
-
-        CampaignManager.Instance.currCampaign.QuestionList = globalQuestions;
-        Debug.Log("Campaign populated with " + globalQuestions.Count + " questions.");
+        ProcessQuestions(serviceQuestions);
 
         CampaignManager.Instance.LoadMappedLevel();
     }
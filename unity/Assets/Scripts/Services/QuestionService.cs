@@ -85,6 +85,44 @@ public class QuestionService : BaseService
             onError?.Invoke(lastError);
     }
 
+    // Gets every question of a campaign with its answers nested in answerList, in a single request
+    public IEnumerator GetQuestionBundle(int campaignID, string firebaseToken, System.Action<List<Question>> onSuccess, System.Action<string> onError)
+    {
+        bool requestSuccess = false;
+        string lastError = "";
+
+        while (!requestSuccess)
+        {
+            string url = $"{baseUrl}/questions/{campaignID}/bundle";
+            UnityWebRequest request = UnityWebRequest.Get(url);
+            request.SetRequestHeader("Authorization", "Bearer " + firebaseToken);
+
+            bool done = false;
+            yield return SendRequest(request,
+                response =>
+                {
+                    QuestionListWrapper wrapper = JsonUtility.FromJson<QuestionListWrapper>("{\"questions\":" + response + "}");
+                    onSuccess?.Invoke(wrapper.questions);
+                    requestSuccess = true;
+                    done = true;
+                },
+                error =>
+                {
+                    lastError = error;
+                    done = true;
+                }
+            );
+            yield return new WaitUntil(() => done);
+            if (!requestSuccess)
+            {
+                yield return new WaitForSeconds(1f);
+            }
+        }
+
+        if (!requestSuccess)
+            onError?.Invoke(lastError);
+    }
+
     public IEnumerator AnswerQuestion(int questionID, bool gotCorrect, string firebaseToken, System.Action onSuccess, System.Action<string> onError)
     {
         bool requestSuccess = false;